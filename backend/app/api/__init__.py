@@ -8,8 +8,11 @@ from . import (
     routes_jobs,
     routes_library,
     routes_llm,
+    routes_metrics,
     routes_outputs,
+    routes_pipeline,
     routes_publish,
+    routes_settings,
     routes_transcription,
     routes_video,
 )
@@ -24,3 +27,6 @@ api_router.include_router(routes_outputs.router, prefix="/outputs", tags=["outpu
 api_router.include_router(routes_video.router, prefix="/video", tags=["video"])
 api_router.include_router(routes_library.router, prefix="/library", tags=["library"])
 api_router.include_router(routes_jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(routes_settings.router, prefix="/settings", tags=["settings"])
+api_router.include_router(routes_pipeline.router, prefix="/pipeline", tags=["pipeline"])
+api_router.include_router(routes_metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from typing import Any, Dict, List
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, status
@@ -21,6 +21,7 @@ class JobInfo(BaseModel):
     output_file_path: str | None = None
     error_message: str | None = None
     created_at: datetime
+    metrics: Dict[str, Any] = {}
 
 
 @router.get("", response_model=List[JobInfo])
@@ -37,6 +38,7 @@ async def list_jobs() -> List[JobInfo]:
                 output_file_path=j.output_file_path,
                 error_message=j.error_message,
                 created_at=j.created_at,
+                metrics=j.get_metrics(),
             )
             for j in jobs
         ]
@@ -62,6 +64,7 @@ async def get_job(job_id: int) -> JobInfo:
             output_file_path=job.output_file_path,
             error_message=job.error_message,
             created_at=job.created_at,
+            metrics=job.get_metrics(),
         )
     except HTTPException:
         raise
@@ -19,6 +19,8 @@ class LibraryItem(BaseModel):
     job_type: str
     output_file_path: str
     download_url: str
+    thumbnail_url: str | None = None
+    waveform_url: str | None = None
 
 
 @router.get("", response_model=List[LibraryItem])
@@ -29,6 +31,7 @@ async def list_library_items() -> List[LibraryItem]:
         completed = (
             db.query(ProcessingJob)
             .filter(ProcessingJob.status == JobStatus.COMPLETED)
+            .filter(ProcessingJob.job_type != "video_preview")  # drafts are not library items
             .all()
         )
         items: List[LibraryItem] = []
@@ -36,10 +39,13 @@ async def list_library_items() -> List[LibraryItem]:
             if not job.output_file_path:
                 continue
             rel_path = str(Path(job.output_file_path).relative_to(DATA_ROOT)) if Path(job.output_file_path).is_absolute() else job.output_file_path
+            thumbnail_url = waveform_url = None
             if job.job_type == "audio_processing":
                 download_url = f"/api/audio/download/{job.id}"
             elif job.job_type == "video_generation":
                 download_url = f"/api/video/download/{job.id}"
+                thumbnail_url = f"/api/video/thumbnail/{job.id}/poster"
+                waveform_url = f"/api/video/thumbnail/{job.id}/waveform"
             else:
                 download_url = f"/api/outputs/{Path(job.output_file_path).name}"
             items.append(
@@ -48,6 +54,8 @@ async def list_library_items() -> List[LibraryItem]:
                     job_type=job.job_type,
                     output_file_path=rel_path,
                     download_url=download_url,
+                    thumbnail_url=thumbnail_url,
+                    waveform_url=waveform_url,
                 )
             )
         return items
@@ -5,34 +5,46 @@
 #   Body: {"transcript_id": int, "tone": "clickbaity|formal|casual"}
 
 # Endpoints for generating suggestions via LLM (Ollama).
-from fastapi import APIRouter, Request, HTTPException, status
-from pathlib import Path
+import json
+import logging
+
+from typing import List
+
+from fastapi import APIRouter, Query, Request, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
 from ..db.database import SessionLocal
 from ..models.job import ProcessingJob, JobStatus
 from ..models.llm import LLMSuggestion
-from ..services.llm import generate_suggestions
-from ..utils.storage import DATA_ROOT
-from ..config import settings
+from ..services.llm import (
+    PROMPT_TEMPLATES,
+    generate_suggestion_set,
+    generate_suggestions,
+    prompt_eval_ms,
+    stream_suggestions,
+    suggestion_key,
+)
+from ..services import suggestion_cache
+from ..services.ollama_admission import OllamaBusy, OllamaUnavailable
+from ..services.prompt_budget import job_transcript_text
+from ..utils.storage import DATA_ROOT, LLM_INPUT_DIR, ensure_dir_exists
+from ..workers.tasks import generate_suggestions_task
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-async def read_transcript_from_job(job: ProcessingJob) -> str:
-    """Read the transcript SRT file for a completed transcription job."""
-    transcript_path = DATA_ROOT / job.output_file_path
-    if not Path(transcript_path).exists():
+async def read_transcript_from_job(job: ProcessingJob, db: Session) -> str:
+    """Plain segment text of a completed transcription job (no SRT numbering or timings)."""
+    try:
+        return job_transcript_text(db, job)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Transcript file not found for job {job.id}",
         )
-    # Read file contents
-    content = Path(transcript_path).read_text(encoding="utf-8")
-    return content
 
-@router.post("/suggest/from_job/{job_id}")
-async def suggest_from_job(job_id: int, prompt_type: str = "title_summary") -> dict:
-    """Generate LLM suggestions based on a completed transcription job."""
-    db = SessionLocal()
+def _completed_transcription_job(db: Session, job_id: int) -> ProcessingJob:
     job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
     if not job:
         raise HTTPException(
@@ -49,87 +61,279 @@ async def suggest_from_job(job_id: int, prompt_type: str = "title_summary") -> d
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Job has not yet completed",
         )
-    transcript = await read_transcript_from_job(job)
+    return job
+
+async def _load_job_transcript(db: Session, job_id: int) -> str:
+    """Transcript text of a completed transcription job, or the matching HTTP error."""
+    job = _completed_transcription_job(db, job_id)
+    transcript = await read_transcript_from_job(job, db)
     if not transcript.strip():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Transcript for job {job_id} is empty",
         )
-    try:
-        suggestions = await generate_suggestions(transcript, prompt_type)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate LLM suggestions: {e}",
-        )
-    if isinstance(suggestions, dict) and suggestions.get("error"):
-        detail = suggestions.get("details") or suggestions.get("error")
+    return transcript
+
+async def _read_text_transcript(request: Request, transcript_text: str | None) -> str:
+    """Transcript from the query parameter or, if absent, the raw request body."""
+    if transcript_text is None:
+        body_bytes = await request.body()
+        transcript_text = body_bytes.decode("utf-8")
+    if not transcript_text.strip():
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Error from LLM service: {detail}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Transcript text is empty",
         )
-    # Persist suggestion
+    return transcript_text
+
+def _store_suggestion(db: Session, job_id: int | None, transcript: str, prompt_type: str, suggestions: dict, usage: dict) -> LLMSuggestion:
+    key = suggestion_key(transcript, prompt_type)
     suggestion = LLMSuggestion(
-        job_id=job.id,
+        job_id=job_id,
         prompt_type=prompt_type,
-        model_used=settings.OLLAMA_DEFAULT_MODEL,
+        model_used=key.model,
         titles=suggestions.get("titles"),
         suggested_summary=suggestions.get("summary"),
+        transcript_hash=key.transcript_hash,
+        prompt_version=key.prompt_version,
+        prompt_tokens_estimated=usage.get("prompt_tokens_estimated"),
+        prompt_tokens=usage.get("prompt_tokens"),
+        prompt_eval_ms=prompt_eval_ms(usage),
+        backend=usage.get("backend"),
     )
     db.add(suggestion)
     db.commit()
     db.refresh(suggestion)
+    suggestion_cache.record_stored(key, suggestion.id)
+    return suggestion
+
+def _reuse_or_store_suggestion(db: Session, job_id: int | None, transcript: str, prompt_type: str, suggestions: dict, usage: dict) -> LLMSuggestion:
+    """The row already holding these suggestions for the job (a cache hit, or an
+    identical request in flight that stored it), else a newly stored one."""
+    if usage.get("suggestion_id") is not None:
+        suggestion = db.get(LLMSuggestion, usage["suggestion_id"])
+        if suggestion is not None and suggestion.job_id == job_id:
+            return suggestion
+    return _store_suggestion(db, job_id, transcript, prompt_type, suggestions, usage)
+
+def _suggestion_payload(suggestion: LLMSuggestion) -> dict:
     return {
+        "suggestion_id": suggestion.id,
         "job_id": suggestion.job_id,
+        "llm_job_id": suggestion.llm_job_id,
         "prompt_type": suggestion.prompt_type,
         "titles": suggestion.get_titles(),
         "summary": suggestion.suggested_summary,
         "model_used": suggestion.model_used,
+        "prompt_tokens_estimated": suggestion.prompt_tokens_estimated,
+        "prompt_tokens": suggestion.prompt_tokens,
+        "prompt_eval_ms": suggestion.prompt_eval_ms,
+        "backend": suggestion.backend,
     }
 
-@router.post("/suggest/from_text")
-async def suggest_from_text(request: Request, prompt_type: str = "title_summary", transcript_text: str | None = None) -> dict:
-    """Generate LLM suggestions based on provided raw transcript text."""
-    # Determine transcript text from query or raw body
-    if transcript_text is None:
-        body_bytes = await request.body()
-        transcript_text = body_bytes.decode("utf-8")
-    if not transcript_text.strip():
+def _not_admitted(e: OllamaBusy | OllamaUnavailable) -> HTTPException:
+    """429 (queue full) or 503 (circuit open), both with ``Retry-After``."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS if isinstance(e, OllamaBusy) else status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def _raise_for_llm_error(suggestions: dict) -> None:
+    if isinstance(suggestions, dict) and suggestions.get("error"):
+        detail = suggestions.get("details") or suggestions.get("error")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Transcript text is empty",
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Error from LLM service: {detail}",
         )
+
+async def _generate_and_store(db: Session, job_id: int | None, transcript: str, prompt_type: str, force: bool) -> dict:
+    usage: dict = {}
+
+    def store(suggestions: dict, generation_usage: dict) -> int:
+        return _store_suggestion(db, job_id, transcript, prompt_type, suggestions, generation_usage).id
+
     try:
-        suggestions = await generate_suggestions(transcript_text, prompt_type)
+        suggestions = await generate_suggestions(transcript, prompt_type, force=force, db=db, usage=usage, store=store)
+    except (OllamaBusy, OllamaUnavailable) as e:
+        raise _not_admitted(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate LLM suggestions: {e}",
         )
-    if isinstance(suggestions, dict) and suggestions.get("error"):
-        detail = suggestions.get("details") or suggestions.get("error")
+    _raise_for_llm_error(suggestions)
+    suggestion = _reuse_or_store_suggestion(db, job_id, transcript, prompt_type, suggestions, usage)
+    return _suggestion_payload(suggestion)
+
+async def _generate_set_and_store(db: Session, job_id: int | None, transcript: str, prompt_types: List[str], force: bool) -> dict:
+    for prompt_type in prompt_types:
+        _check_prompt_type(prompt_type)
+    usage: dict = {}
+    try:
+        results = await generate_suggestion_set(transcript, prompt_types, force=force, db=db, usage=usage)
+    except (OllamaBusy, OllamaUnavailable) as e:
+        raise _not_admitted(e)
+    except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Error from LLM service: {detail}",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate LLM suggestions: {e}",
         )
-    # Persist suggestion
-    db = SessionLocal()
-    suggestion = LLMSuggestion(
-        job_id=None,
-        prompt_type=prompt_type,
-        model_used=settings.OLLAMA_DEFAULT_MODEL,
-        titles=suggestions.get("titles"),
-        suggested_summary=suggestions.get("summary"),
+    for suggestions in results.values():
+        _raise_for_llm_error(suggestions)
+    stored = [
+        _reuse_or_store_suggestion(db, job_id, transcript, prompt_type, suggestions, usage[prompt_type])
+        for prompt_type, suggestions in results.items()
+    ]
+    return {"suggestions": [_suggestion_payload(suggestion) for suggestion in stored]}
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _suggestion_stream(db: Session, job_id: int | None, transcript: str, prompt_type: str, force: bool) -> StreamingResponse:
+    """Server-Sent Events: ``token`` events with the model output as it arrives,
+    then one ``result`` event with the stored suggestion (or an ``error`` event)."""
+    try:
+        _check_prompt_type(prompt_type)
+    except HTTPException:
+        db.close()
+        raise
+
+    async def events():
+        usage: dict = {}
+        try:
+            async for event in stream_suggestions(transcript, prompt_type, force=force, db=db, usage=usage):
+                if event["event"] == "token":
+                    yield _sse("token", {"text": event["text"]})
+                elif event["event"] == "result":
+                    suggestion = _reuse_or_store_suggestion(db, job_id, transcript, prompt_type, event["suggestions"], usage)
+                    yield _sse("result", {**_suggestion_payload(suggestion), "first_token_seconds": usage.get("first_token_seconds")})
+                else:
+                    detail = event.get("details") or event.get("error")
+                    yield _sse("error", {"detail": f"Error from LLM service: {detail}"})
+        except (OllamaBusy, OllamaUnavailable) as e:
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            logger.error(f"Streaming LLM suggestions failed: {e}", exc_info=True)
+            yield _sse("error", {"detail": f"Failed to generate LLM suggestions: {e}"})
+        finally:
+            db.close()
+
+    # X-Accel-Buffering stops nginx from holding back the events.
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    db.add(suggestion)
+
+def _check_prompt_type(prompt_type: str) -> None:
+    if prompt_type not in PROMPT_TEMPLATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid prompt_type: {prompt_type}. Available types: {list(PROMPT_TEMPLATES.keys())}",
+        )
+
+def _queue_suggestion_job(
+    db: Session, prompt_type: str, force: bool, transcription_job_id: int | None = None, transcript_text: str | None = None
+) -> dict:
+    """Create an ``llm_suggestion`` job and hand it to the Celery ``llm`` queue.
+
+    Raw text is saved as the job's input file rather than sent through the broker.
+    """
+    job = ProcessingJob(job_type="llm_suggestion", status=JobStatus.PENDING)
+    db.add(job)
+    db.flush()
+    if transcript_text is not None:
+        input_path = ensure_dir_exists(LLM_INPUT_DIR) / f"{job.id}.txt"
+        input_path.write_text(transcript_text, encoding="utf-8")
+        job.input_file_path = str(input_path.relative_to(DATA_ROOT))
     db.commit()
-    db.refresh(suggestion)
-    return {
-        "prompt_type": suggestion.prompt_type,
-        "titles": suggestion.get_titles(),
-        "summary": suggestion.suggested_summary,
-        "model_used": suggestion.model_used,
-    }
+    generate_suggestions_task.delay(
+        job_id=job.id,
+        transcription_job_id=transcription_job_id,
+        prompt_type=prompt_type,
+        force=force,
+    )
+    return {"job_id": job.id, "status": job.status_str, "message": "LLM suggestion job queued. Poll /api/jobs/{job_id}."}
+
+@router.post("/suggest/from_job/{job_id}")
+async def suggest_from_job(job_id: int, prompt_type: str = "title_summary", force: bool = False, background: bool = False) -> dict:
+    """Generate LLM suggestions based on a completed transcription job.
+
+    Repeated requests are served from the suggestion cache; ``force=true``
+    asks the model for fresh suggestions.  With ``background=true`` the
+    generation runs as an ``llm_suggestion`` job on the Celery ``llm`` queue
+    and the response only carries its job ID; the job's metrics name the
+    stored suggestion once it completes.
+    """
+    db = SessionLocal()
+    if background:
+        try:
+            _check_prompt_type(prompt_type)
+            _completed_transcription_job(db, job_id)
+            return _queue_suggestion_job(db, prompt_type, force, transcription_job_id=job_id)
+        finally:
+            db.close()
+    transcript = await _load_job_transcript(db, job_id)
+    return await _generate_and_store(db, job_id, transcript, prompt_type, force)
+
+@router.post("/suggest/from_job/{job_id}/stream")
+async def stream_suggest_from_job(job_id: int, prompt_type: str = "title_summary", force: bool = False) -> StreamingResponse:
+    """Like ``/suggest/from_job/{job_id}``, streamed as Server-Sent Events."""
+    db = SessionLocal()
+    try:
+        transcript = await _load_job_transcript(db, job_id)
+    except HTTPException:
+        db.close()
+        raise
+    return _suggestion_stream(db, job_id, transcript, prompt_type, force)
+
+@router.post("/suggest/from_job/{job_id}/multi")
+async def suggest_many_from_job(job_id: int, prompt_types: List[str] = Query(list(PROMPT_TEMPLATES)), force: bool = False) -> dict:
+    """Generate several prompt types for a transcription job in one request.
+
+    The transcript is evaluated by Ollama once and reused for every prompt
+    type after the first (see ``generate_suggestion_set``), which is much
+    faster than separate requests on a CPU-only host.
+    """
+    db = SessionLocal()
+    try:
+        transcript = await _load_job_transcript(db, job_id)
+        return await _generate_set_and_store(db, job_id, transcript, prompt_types, force)
+    finally:
+        db.close()
+
+@router.post("/suggest/from_text")
+async def suggest_from_text(request: Request, prompt_type: str = "title_summary", transcript_text: str | None = None, force: bool = False, background: bool = False) -> dict:
+    """Generate LLM suggestions based on provided raw transcript text.
+
+    ``background=true`` queues an ``llm_suggestion`` job, as for ``/suggest/from_job``.
+    """
+    transcript_text = await _read_text_transcript(request, transcript_text)
+    db = SessionLocal()
+    if background:
+        try:
+            _check_prompt_type(prompt_type)
+            return _queue_suggestion_job(db, prompt_type, force, transcript_text=transcript_text)
+        finally:
+            db.close()
+    return await _generate_and_store(db, None, transcript_text, prompt_type, force)
+
+@router.post("/suggest/from_text/stream")
+async def stream_suggest_from_text(request: Request, prompt_type: str = "title_summary", transcript_text: str | None = None, force: bool = False) -> StreamingResponse:
+    """Like ``/suggest/from_text``, streamed as Server-Sent Events."""
+    transcript_text = await _read_text_transcript(request, transcript_text)
+    return _suggestion_stream(SessionLocal(), None, transcript_text, prompt_type, force)
+
+@router.post("/suggest/from_text/multi")
+async def suggest_many_from_text(request: Request, prompt_types: List[str] = Query(list(PROMPT_TEMPLATES)), transcript_text: str | None = None, force: bool = False) -> dict:
+    """Like ``/suggest/from_job/{job_id}/multi``, for raw transcript text."""
+    transcript_text = await _read_text_transcript(request, transcript_text)
+    db = SessionLocal()
+    try:
+        return await _generate_set_and_store(db, None, transcript_text, prompt_types, force)
+    finally:
+        db.close()
 
 @router.get("/suggestions/{suggestion_id}")
 async def get_suggestion(suggestion_id: int) -> dict:
@@ -141,14 +345,7 @@ async def get_suggestion(suggestion_id: int) -> dict:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Suggestion not found",
         )
-    return {
-        "suggestion_id": suggestion.id,
-        "job_id": suggestion.job_id,
-        "prompt_type": suggestion.prompt_type,
-        "titles": suggestion.get_titles(),
-        "summary": suggestion.suggested_summary,
-        "model_used": suggestion.model_used,
-    }
+    return _suggestion_payload(suggestion)
 
 @router.get("/suggestions/by_job/{job_id}")
 async def get_suggestions_by_job(job_id: int) -> list:
@@ -0,0 +1,27 @@
+"""Operational metrics of this API process."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from ..services.http_clients import pool_stats
+from ..services.ollama_admission import admission_stats
+from ..services.ollama_pool import backend_stats
+from ..services.single_flight import single_flight_stats
+from ..services.suggestion_cache import cache_stats as suggestion_cache_stats
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics() -> Dict[str, Any]:
+    """Outbound HTTP pool counters, Ollama hosts and admission, LLM suggestion cache hits and coalesced requests."""
+    return {
+        "http_pools": pool_stats(),
+        "ollama_backends": backend_stats(),
+        "ollama_admission": admission_stats(),
+        "llm_cache": suggestion_cache_stats(),
+        "llm_single_flight": single_flight_stats(),
+    }
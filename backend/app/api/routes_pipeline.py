@@ -0,0 +1,181 @@
+"""Endpoints that run an episode through every stage in one submission."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from ..db.database import SessionLocal
+from ..models.job import JobStatus, ProcessingJob
+from ..models.pipeline import Pipeline, aggregate_status
+from ..models.show import Show
+from ..services.frame_renderer import STYLES as ANIMATED_STYLES
+from ..services.llm import PROMPT_TEMPLATES
+from ..services.transcription import normalize_language
+from ..services.video_processing import validate_resolution
+from ..utils.storage import DATA_ROOT, PROCESSED_DIR, UPLOAD_DIR
+from ..workers.tasks import build_pipeline_workflow
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class StageInfo(BaseModel):
+    stage: str
+    job_id: int
+    status: str
+    error_message: str | None = None
+
+
+class PipelineInfo(BaseModel):
+    id: int
+    status: str
+    stages: List[StageInfo]
+    error_message: str | None = None
+    created_at: datetime
+    completed_at: datetime | None = None
+    elapsed_seconds: float | None = None
+
+
+def _new_job(db, job_type: str, input_file_path: str | None = None) -> ProcessingJob:
+    job = ProcessingJob(job_type=job_type, status=JobStatus.PENDING, input_file_path=input_file_path)
+    db.add(job)
+    db.flush()
+    return job
+
+
+@router.post("/{session_id}")
+async def start_pipeline(
+    session_id: str,
+    transcribe: bool = True,
+    suggestions: bool = True,
+    video: bool = True,
+    prompt_type: str = "title_summary",
+    show: str | None = None,
+    language: str | None = None,
+    style: str = "static",
+    resolution: str = "1280x720",
+) -> dict:
+    """Process an upload session and run the later stages without waiting for a client.
+
+    Audio processing runs first; transcription followed by LLM suggestions
+    (``prompt_type``) and the video render then run in parallel.  ``show``
+    selects the artwork for the video and the default transcription language.
+    Poll ``GET /api/pipeline/{pipeline_id}`` for the aggregated status.
+    """
+    session_dir = UPLOAD_DIR / session_id
+    if not session_dir.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if suggestions and not transcribe:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="suggestions require transcribe=true")
+    if prompt_type not in PROMPT_TEMPLATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown prompt_type '{prompt_type}'. Available types: {', '.join(PROMPT_TEMPLATES)}",
+        )
+    if style != "static" and style not in ANIMATED_STYLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown style '{style}'. Available styles: static, {', '.join(ANIMATED_STYLES)}",
+        )
+    try:
+        language = normalize_language(language)
+        validate_resolution(resolution)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    input_paths_str = [str(p.relative_to(DATA_ROOT)) for p in session_dir.glob("*") if p.is_file()]
+
+    db = SessionLocal()
+    try:
+        background_hash = None
+        if show:
+            show_record = db.query(Show).filter(Show.name == show).first()
+            if not show_record:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Show '{show}' not found")
+            background_hash = show_record.artwork_hash
+            language = language or show_record.default_language
+
+        audio_job = _new_job(db, "audio_processing")
+        output_filename = f"{audio_job.id}_processed.mp3"
+        # Known up front, so the later stages can be queued before the audio exists.
+        processed_path = str((PROCESSED_DIR / output_filename).relative_to(DATA_ROOT))
+        pipeline = Pipeline(status=JobStatus.PENDING, upload_session_id=session_id, audio_job_id=audio_job.id)
+        audio_kwargs = {"job_id": audio_job.id, "input_paths_str": input_paths_str, "output_filename": output_filename}
+        transcription_kwargs = suggestion_kwargs = video_kwargs = None
+        if transcribe:
+            transcription_job = _new_job(db, "transcription", processed_path)
+            pipeline.transcription_job_id = transcription_job.id
+            transcription_job.update_metrics(transcription_options={"language": language})
+            transcription_kwargs = {
+                "job_id": transcription_job.id,
+                "audio_input_path_str": processed_path,
+                "output_basename": f"{transcription_job.id}_transcript",
+                "language": language,
+            }
+            if suggestions:
+                suggestion_job = _new_job(db, "llm_suggestion")
+                pipeline.suggestion_job_id = suggestion_job.id
+                suggestion_kwargs = {
+                    "job_id": suggestion_job.id,
+                    "transcription_job_id": transcription_job.id,
+                    "prompt_type": prompt_type,
+                }
+        if video:
+            video_job = _new_job(db, "video_generation", processed_path)
+            pipeline.video_job_id = video_job.id
+            video_kwargs = {
+                "job_id": video_job.id,
+                "audio_input_path_str": processed_path,
+                "output_filename": f"{video_job.id}_waveform.mp4",
+                "resolution": resolution,
+                "fg_color": "white",
+                "bg_color": "black",
+                "background_asset_hash": background_hash,
+                "style": style,
+            }
+        db.add(pipeline)
+        db.commit()
+        db.refresh(pipeline)
+
+        build_pipeline_workflow(pipeline, audio_kwargs, transcription_kwargs, suggestion_kwargs, video_kwargs).apply_async()
+        logger.info("Started pipeline %s for upload session %s: %s", pipeline.id, session_id, pipeline.stage_job_ids())
+        return {"pipeline_id": pipeline.id, "jobs": pipeline.stage_job_ids(), "message": "Pipeline started."}
+    finally:
+        db.close()
+
+
+@router.get("/{pipeline_id}", response_model=PipelineInfo)
+async def get_pipeline(pipeline_id: int) -> PipelineInfo:
+    """Return the pipeline's stages and their aggregated status."""
+    db = SessionLocal()
+    try:
+        pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
+        if not pipeline:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found")
+        job_ids = pipeline.stage_job_ids()
+        jobs = {j.id: j for j in db.query(ProcessingJob).filter(ProcessingJob.id.in_(job_ids.values())).all()}
+        stages = [
+            StageInfo(stage=stage, job_id=job_id, status=jobs[job_id].status_str, error_message=jobs[job_id].error_message)
+            for stage, job_id in job_ids.items()
+            if job_id in jobs
+        ]
+        # Stage jobs are the source of truth while the pipeline is running.
+        current = aggregate_status([jobs[job_id].status for job_id in job_ids.values() if job_id in jobs])
+        elapsed = None
+        if pipeline.completed_at and pipeline.created_at:
+            elapsed = round((pipeline.completed_at - pipeline.created_at).total_seconds(), 3)
+        return PipelineInfo(
+            id=pipeline.id,
+            status=current.value,
+            stages=stages,
+            error_message=pipeline.error_message,
+            created_at=pipeline.created_at,
+            completed_at=pipeline.completed_at,
+            elapsed_seconds=elapsed,
+        )
+    finally:
+        db.close()
@@ -0,0 +1,118 @@
+"""Endpoints for per-show settings such as the artwork used in video renders."""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from pathlib import Path
+from typing import List
+
+from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from ..db.database import SessionLocal
+from ..models.show import Show
+from ..services.background_assets import prepare_background
+from ..services.transcription import normalize_language
+from ..utils.storage import BACKGROUNDS_DIR, ensure_dir_exists
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+
+
+class ShowInfo(BaseModel):
+    id: int
+    name: str
+    artwork_hash: str | None = None
+    default_language: str | None = None
+
+
+def _to_info(show: Show) -> ShowInfo:
+    return ShowInfo(
+        id=show.id, name=show.name, artwork_hash=show.artwork_hash, default_language=show.default_language
+    )
+
+
+@router.get("/shows", response_model=List[ShowInfo])
+async def list_shows() -> List[ShowInfo]:
+    """Return every configured show."""
+    db = SessionLocal()
+    try:
+        return [_to_info(s) for s in db.query(Show).order_by(Show.name).all()]
+    finally:
+        db.close()
+
+
+@router.put("/shows/{show_name}/artwork", response_model=ShowInfo)
+async def register_show_artwork(show_name: str, artwork: UploadFile = File(...)) -> ShowInfo:
+    """Upload the cover image for a show and pre-scale it for every render resolution.
+
+    The show is created if it does not exist yet.  Uploading the same image
+    again (for this or another show) reuses the already prepared frames.
+    """
+    suffix = Path(artwork.filename or "").suffix.lower()
+    if suffix not in ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported artwork type. Allowed extensions are: {', '.join(sorted(ALLOWED_IMAGE_EXTENSIONS))}.",
+        )
+
+    incoming_dir = ensure_dir_exists(BACKGROUNDS_DIR / "_incoming")
+    incoming_path = incoming_dir / f"{uuid.uuid4()}{suffix}"
+    try:
+        with open(incoming_path, "wb") as f:
+            while chunk := await artwork.read(8192):
+                f.write(chunk)
+        content_hash = await run_in_threadpool(prepare_background, incoming_path)
+    except Exception as exc:
+        logger.error("Failed to prepare artwork for show '%s': %s", show_name, exc, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error preparing show artwork.",
+        )
+    finally:
+        incoming_path.unlink(missing_ok=True)
+
+    db = SessionLocal()
+    try:
+        show = db.query(Show).filter(Show.name == show_name).first()
+        if not show:
+            show = Show(name=show_name)
+            db.add(show)
+        show.artwork_hash = content_hash
+        db.commit()
+        db.refresh(show)
+        logger.info("Registered artwork %s for show '%s'", content_hash, show_name)
+        return _to_info(show)
+    finally:
+        db.close()
+
+
+@router.put("/shows/{show_name}/language", response_model=ShowInfo)
+async def set_show_language(show_name: str, language: str | None = None) -> ShowInfo:
+    """Set the spoken language transcriptions of this show default to.
+
+    Omit ``language`` to go back to detecting it per episode.  The show is
+    created if it does not exist yet.
+    """
+    try:
+        code = normalize_language(language)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    db = SessionLocal()
+    try:
+        show = db.query(Show).filter(Show.name == show_name).first()
+        if not show:
+            show = Show(name=show_name)
+            db.add(show)
+        show.default_language = code
+        db.commit()
+        db.refresh(show)
+        logger.info("Default language for show '%s' set to %s", show_name, code)
+        return _to_info(show)
+    finally:
+        db.close()
@@ -1,9 +1,362 @@
 """Endpoints for Whisper/Faster-Whisper transcription tasks."""
 
-# Planned endpoints:
-# * POST /transcription        – start transcription for given audio id.
-# * GET  /transcription/{id}   – get transcript & status.
+import logging
+from datetime import datetime
+from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+
+from ..db.database import SessionLocal
+from ..models.job import ProcessingJob, JobStatus
+from ..models.show import Show
+from ..models.transcript import Transcript
+from ..models.transcript_segment import TranscriptSegment
+from ..services.model_registry import collect_published_stats
+from ..services.segment_store import committed_segments, iter_segments, page_segments
+from ..services.transcription import ENGINES, iter_srt, iter_text, iter_vtt, normalize_language, validate_model
+from ..services.transcript_cache import cache_stats
+from ..services.word_store import WordIndex
+from ..utils.storage import DATA_ROOT
+from ..workers.tasks import transcribe_audio_task
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "srt": (iter_srt, "application/x-subrip"),
+    "vtt": (iter_vtt, "text/vtt"),
+    "txt": (iter_text, "text/plain"),
+}
+
+
+class TranscriptInfo(BaseModel):
+    id: int
+    job_id: int
+    language: str | None = None
+    created_at: datetime
+    segment_count: int
+    duration: float | None = None
+
+
+class SegmentInfo(BaseModel):
+    id: int
+    start: float
+    end: float
+    text: str
+
+
+class WordInfo(BaseModel):
+    start: float
+    end: float
+    word: str
+
+
+class WordPage(BaseModel):
+    transcript_id: int
+    words: List[WordInfo]
+    next_offset: int | None = None
+
+
+class SegmentPage(BaseModel):
+    transcript_id: int
+    segments: List[SegmentInfo]
+    next_cursor: str | None = None
+
+
+@router.post("/start/{audio_job_id}")
+async def start_transcription(
+    audio_job_id: int,
+    chunked: bool | None = None,
+    model: str | None = None,
+    compute_type: str | None = None,
+    engine: str | None = None,
+    batch_size: int | None = None,
+    beam_size: int | None = None,
+    vad: bool | None = None,
+    word_timestamps: bool | None = None,
+    bypass_cache: bool = False,
+    language: str | None = None,
+    show: str | None = None,
+) -> dict:
+    """Create a transcription job for the output of a processed audio job.
+
+    With ``chunked=true`` long recordings are split at silences and the chunks
+    are transcribed in parallel by the worker pool; omitted, the
+    ``TRANSCRIPTION_CHUNKED`` setting decides.
+
+    ``model`` (one of WHISPER_ALLOWED_MODELS) and ``compute_type`` pick the
+    Whisper model; the worker keeps recently used models resident.
+
+    ``engine`` (``batched``/``sequential``), ``batch_size``, ``beam_size`` and
+    ``vad`` (skip non-speech before decoding) override the WHISPER_* settings
+    for this job. ``word_timestamps=true`` also stores word-level timings.
+
+    ``language`` pins the spoken language; without it the ``show``'s default
+    language is used, then WHISPER_LANGUAGE, and otherwise it is detected once
+    on a short excerpt.
+
+    A transcript of identical audio made with the same options is reused
+    unless ``bypass_cache=true``.
+    """
+    if engine is not None and engine not in ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}",
+        )
+    if (batch_size is not None and batch_size < 1) or (beam_size is not None and beam_size < 1):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="batch_size and beam_size must be positive")
+    try:
+        language = normalize_language(language)
+        validate_model(model, compute_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    db = SessionLocal()
+    try:
+        src_job = db.query(ProcessingJob).filter(ProcessingJob.id == audio_job_id).first()
+        if not src_job or not src_job.output_file_path:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source job not found")
+        if not (DATA_ROOT / src_job.output_file_path).exists():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source audio file not found")
+        if show:
+            show_record = db.query(Show).filter(Show.name == show).first()
+            if not show_record:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Show '{show}' not found")
+            language = language or show_record.default_language
+
+        options = {
+            "chunked": chunked,
+            "engine": engine,
+            "batch_size": batch_size,
+            "beam_size": beam_size,
+            "vad": vad,
+            "word_timestamps": word_timestamps,
+            "use_cache": False if bypass_cache else None,
+            "language": language,
+            "model_size": model,
+            "compute_type": compute_type,
+        }
+        new_job = ProcessingJob(
+            job_type="transcription",
+            status=JobStatus.PENDING,
+            input_file_path=src_job.output_file_path,
+        )
+        # Kept on the job so a resumed run decodes exactly like the first one.
+        new_job.update_metrics(transcription_options=options)
+        db.add(new_job)
+        db.commit()
+        db.refresh(new_job)
+
+        transcribe_audio_task.delay(
+            job_id=new_job.id,
+            audio_input_path_str=src_job.output_file_path,
+            output_basename=f"{new_job.id}_transcript",
+            **options,
+        )
+        return {"job_id": new_job.id, "message": "Transcription started."}
+    finally:
+        db.close()
+
+
+@router.get("/{job_id}/partial")
+async def get_partial_transcript(job_id: int, after: float = 0.0) -> dict:
+    """Return the segments committed so far, also while the job is still running.
+
+    Poll with ``after`` set to the previous ``transcribed_until`` to only
+    receive new segments.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job or job.job_type != "transcription":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcription job not found")
+        segments = committed_segments(db, job_id, after=after)
+        return {
+            "job_id": job_id,
+            "status": job.status_str,
+            "transcribed_until": segments[-1].end if segments else after,
+            "segments": [s.to_dict() for s in segments],
+        }
+    finally:
+        db.close()
+
+
+@router.post("/{job_id}/resume")
+async def resume_transcription(job_id: int) -> dict:
+    """Re-queue a failed or interrupted transcription job with its original options.
+
+    Segments committed by the earlier attempt are kept; decoding continues
+    from the end of the last one.  Chunked jobs only re-run the chunks that
+    had not finished.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job or job.job_type != "transcription" or not job.input_file_path:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcription job not found")
+        if job.status == JobStatus.COMPLETED:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job already completed")
+        job.status = JobStatus.PENDING
+        db.commit()
+        transcribe_audio_task.delay(
+            job_id=job.id,
+            audio_input_path_str=job.input_file_path,
+            output_basename=f"{job.id}_transcript",
+            **job.get_metrics().get("transcription_options", {}),
+        )
+        return {"job_id": job.id, "message": "Transcription resumed."}
+    finally:
+        db.close()
+
+
+def _require_transcript(db, transcript_id: int):
+    """Return the transcript's metadata columns (never the text/SRT blobs) or 404."""
+    row = (
+        db.query(Transcript.id, Transcript.processing_job_id, Transcript.language, Transcript.created_at)
+        .filter(Transcript.id == transcript_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcript not found")
+    return row
+
+
+@router.get("/transcripts/{transcript_id}", response_model=TranscriptInfo)
+async def get_transcript_info(transcript_id: int) -> TranscriptInfo:
+    """Transcript metadata: language, number of segments and covered duration."""
+    db = SessionLocal()
+    try:
+        row = _require_transcript(db, transcript_id)
+        segment_count, duration = (
+            db.query(func.count(TranscriptSegment.id), func.max(TranscriptSegment.end))
+            .filter(TranscriptSegment.transcript_id == transcript_id)
+            .one()
+        )
+        return TranscriptInfo(
+            id=row.id,
+            job_id=row.processing_job_id,
+            language=row.language,
+            created_at=row.created_at,
+            segment_count=segment_count,
+            duration=duration,
+        )
+    finally:
+        db.close()
+
+
+@router.get("/transcripts/{transcript_id}/segments", response_model=SegmentPage)
+async def list_transcript_segments(
+    transcript_id: int,
+    start: float | None = Query(None, ge=0, description="Only segments ending after this time (seconds)"),
+    end: float | None = Query(None, ge=0, description="Only segments starting before this time (seconds)"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> SegmentPage:
+    """Page through a transcript's segments in time order, optionally within a time range."""
+    db = SessionLocal()
+    try:
+        _require_transcript(db, transcript_id)
+        try:
+            rows, next_cursor = page_segments(db, transcript_id, start, end, cursor, limit)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return SegmentPage(
+            transcript_id=transcript_id,
+            segments=[SegmentInfo(id=r.id, start=r.start, end=r.end, text=r.text) for r in rows],
+            next_cursor=next_cursor,
+        )
+    finally:
+        db.close()
+
+
+@router.get("/transcripts/{transcript_id}/words", response_model=WordPage)
+async def list_transcript_words(
+    transcript_id: int,
+    start: float | None = Query(None, ge=0, description="Only words ending after this time (seconds)"),
+    end: float | None = Query(None, ge=0, description="Only words starting before this time (seconds)"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+) -> WordPage:
+    """Word-level timestamps within a time range (transcripts made with ``word_timestamps``)."""
+    db = SessionLocal()
+    try:
+        _require_transcript(db, transcript_id)
+        words_path = db.query(Transcript.words_path).filter(Transcript.id == transcript_id).scalar()
+    finally:
+        db.close()
+    if not words_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcript has no word timestamps")
+    try:
+        index = WordIndex(DATA_ROOT / words_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Word timestamp files not found")
+    words = index.words(start, end, offset=offset, limit=limit + 1)
+    return WordPage(
+        transcript_id=transcript_id,
+        words=[WordInfo(**w) for w in words[:limit]],
+        next_offset=offset + limit if len(words) > limit else None,
+    )
+
+
+@router.get("/transcripts/{transcript_id}/export.{fmt}")
+async def export_transcript(
+    transcript_id: int,
+    fmt: str,
+    start: float | None = Query(None, ge=0),
+    end: float | None = Query(None, ge=0),
+) -> StreamingResponse:
+    """Stream the transcript (or a time range of it) as SRT, VTT or plain text.
+
+    Segments are read from the database in batches while the response is
+    written, so large transcripts are never held in memory in full.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format '{fmt}'. Available formats: {', '.join(EXPORT_FORMATS)}",
+        )
+    db = SessionLocal()
+    try:
+        _require_transcript(db, transcript_id)
+    finally:
+        db.close()
+
+    render, media_type = EXPORT_FORMATS[fmt]
+
+    def stream():
+        # A fresh session: the response body is produced after this handler returns.
+        stream_db = SessionLocal()
+        try:
+            yield from render(iter_segments(stream_db, transcript_id, start, end))
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="transcript_{transcript_id}.{fmt}"'},
+    )
+
+
+@router.get("/cache/stats")
+async def transcript_cache_stats() -> dict:
+    """Transcript cache lookups, hits and hit rate."""
+    db = SessionLocal()
+    try:
+        return cache_stats(db)
+    finally:
+        db.close()
+
+
+@router.get("/models")
+async def whisper_model_stats():
+    """Resident Whisper models per worker process, with load time and memory use."""
+    try:
+        workers = await run_in_threadpool(collect_published_stats)
+    except Exception as e:
+        logger.error(f"Could not read Whisper model stats: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Model stats are unavailable.")
+    return {"workers": sorted(workers, key=lambda w: (w["hostname"], w["pid"]))}
@@ -4,9 +4,16 @@ import logging
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 
+from ..config import settings
 from ..db.database import SessionLocal
 from ..models.job import ProcessingJob, JobStatus
+from ..models.show import Show
+from ..services.background_assets import get_prepared_background, is_content_hash
+from ..services.frame_renderer import STYLES as ANIMATED_STYLES
+from ..services.thumbnails import THUMBNAIL_KINDS, ensure_thumbnail
+from ..services.video_processing import preview_output_filename, validate_resolution
 from ..utils.storage import DATA_ROOT, PROCESSED_DIR, ensure_dir_exists
 from ..workers.tasks import generate_video_task
 
@@ -15,30 +22,123 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/process/{audio_job_id}")
-async def process_video(audio_job_id: int) -> dict:
-    """Create a video generation job from a processed audio job."""
+async def process_video(
+    audio_job_id: int,
+    show: str | None = None,
+    background_hash: str | None = None,
+    resolution: str = "1280x720",
+    fg_color: str = "white",
+    bg_color: str = "black",
+    style: str = "static",
+    preview: bool = False,
+    preview_start: float = 0.0,
+) -> dict:
+    """Create a video generation job from a processed audio job.
+
+    ``show`` renders over that show's registered artwork; ``background_hash``
+    selects a prepared background asset directly and takes precedence.
+
+    ``style`` is ``static`` (FFmpeg ``showwavespic``) or one of the animated
+    NumPy rendered styles (``waveform``, ``spectrum``).
+
+    With ``preview=true`` only a short, low resolution excerpt starting at
+    ``preview_start`` seconds is rendered using the fastest encoder preset.
+    Previews are cached: asking again with the same look returns the existing
+    render immediately without queueing any work.
+    """
+    if style != "static" and style not in ANIMATED_STYLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown style '{style}'. Available styles: static, {', '.join(ANIMATED_STYLES)}",
+        )
+    try:
+        validate_resolution(resolution)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if background_hash is not None and not is_content_hash(background_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="background_hash must be a 64 character lowercase hex SHA-256 digest",
+        )
     db = SessionLocal()
     try:
         src_job = db.query(ProcessingJob).filter(ProcessingJob.id == audio_job_id).first()
         if not src_job or not src_job.output_file_path:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source job not found")
 
-        new_job = ProcessingJob(job_type="video_generation", status=JobStatus.PENDING)
+        if show and not background_hash:
+            show_record = db.query(Show).filter(Show.name == show).first()
+            if not show_record:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Show '{show}' not found")
+            background_hash = show_record.artwork_hash
+
+        if preview:
+            resolution = settings.VIDEO_PREVIEW_RESOLUTION
+        if background_hash:
+            # Make sure the frame exists (scaling it once if this resolution was
+            # not prepared up-front) so no job is queued for a missing asset.
+            try:
+                await run_in_threadpool(get_prepared_background, background_hash, resolution)
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Background asset '{background_hash}' not found",
+                )
+
+        if preview:
+            audio_path = DATA_ROOT / src_job.output_file_path
+            if not audio_path.exists():
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source audio file not found")
+            output_filename = preview_output_filename(
+                audio_path,
+                resolution,
+                fg_color,
+                bg_color,
+                background_hash,
+                preview_start,
+                settings.VIDEO_PREVIEW_SECONDS,
+                style=style,
+            )
+            cached_path = PROCESSED_DIR / output_filename
+            if cached_path.exists():
+                cached_job = ProcessingJob(
+                    job_type="video_preview",
+                    status=JobStatus.COMPLETED,
+                    input_file_path=src_job.output_file_path,
+                    output_file_path=str(cached_path.relative_to(DATA_ROOT)),
+                )
+                db.add(cached_job)
+                db.commit()
+                db.refresh(cached_job)
+                logger.info("Serving cached preview %s for audio job %s", output_filename, audio_job_id)
+                return {"job_id": cached_job.id, "message": "Preview served from cache.", "cached": True}
+
+        new_job = ProcessingJob(
+            job_type="video_preview" if preview else "video_generation",
+            status=JobStatus.PENDING,
+            input_file_path=src_job.output_file_path,
+        )
         db.add(new_job)
         db.commit()
         db.refresh(new_job)
 
-        output_filename = f"{new_job.id}_waveform.mp4"
+        if not preview:
+            output_filename = f"{new_job.id}_waveform.mp4"
         generate_video_task.delay(
             job_id=new_job.id,
             audio_input_path_str=src_job.output_file_path,
             output_filename=output_filename,
-            resolution="1280x720",
-            fg_color="white",
-            bg_color="black",
+            resolution=resolution,
+            fg_color=fg_color,
+            bg_color=bg_color,
             background_image_path_str=None,
+            background_asset_hash=background_hash,
+            style=style,
+            preview=preview,
+            preview_start=preview_start,
         )
-        return {"job_id": new_job.id, "message": "Video generation started."}
+        message = "Video preview started." if preview else "Video generation started."
+        return {"job_id": new_job.id, "message": message, "cached": False}
     finally:
         db.close()
 
@@ -60,3 +160,37 @@ async def download_video(job_id: int) -> FileResponse:
     finally:
         db.close()
 
+
+@router.get("/thumbnail/{job_id}/{kind}")
+async def get_video_thumbnail(job_id: int, kind: str) -> FileResponse:
+    """Return a small poster frame or waveform image for a completed video job.
+
+    Thumbnails are normally produced right after rendering; for jobs rendered
+    before that existed they are generated on the first request and cached.
+    """
+    if kind not in THUMBNAIL_KINDS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown thumbnail kind")
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job or job.job_type not in ("video_generation", "video_preview"):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video job not found")
+        if job.status != JobStatus.COMPLETED or not job.output_file_path:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job not completed")
+        video_path = PROCESSED_DIR / Path(job.output_file_path).name
+        audio_path = DATA_ROOT / job.input_file_path if job.input_file_path else None
+    finally:
+        db.close()
+
+    try:
+        thumb = await run_in_threadpool(ensure_thumbnail, job_id, kind, video_path, audio_path)
+    except FileNotFoundError as exc:
+        logger.warning("Cannot build %s thumbnail for job %s: %s", kind, job_id, exc)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source media not found")
+    except Exception as exc:
+        logger.error("Thumbnail generation failed for job %s: %s", job_id, exc, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error generating thumbnail")
+
+    media_type = "image/jpeg" if thumb.suffix == ".jpg" else "image/png"
+    # Thumbnails never change for a given job, so let browsers keep them.
+    return FileResponse(path=thumb, media_type=media_type, headers={"Cache-Control": "public, max-age=86400"})
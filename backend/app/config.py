@@ -34,13 +34,83 @@ class Settings:
     DATABASE_URL: str = os.getenv('DATABASE_URL') or 'postgresql://podcaster:podcaster@db:5432/podcaster'
     CELERY_BROKER_URL: str = os.getenv('CELERY_BROKER_URL') or 'redis://broker:6379/0'
     CELERY_RESULT_BACKEND: str = os.getenv('CELERY_RESULT_BACKEND') or 'redis://broker:6379/0'
+    # Redis used for cross-process coordination/metrics.  Defaults to the
+    # Celery broker, which is a Redis instance in every deployment we ship.
+    REDIS_URL: str = os.getenv('REDIS_URL') or os.getenv('CELERY_BROKER_URL') or 'redis://broker:6379/0'
     OLLAMA_URL: str = os.getenv('OLLAMA_URL') or ''
+    # Several Ollama hosts, comma-separated; requests are balanced between
+    # them (see services/ollama_pool.py).  Empty uses OLLAMA_URL alone.
+    OLLAMA_URLS: list = [url.strip().rstrip('/') for url in (os.getenv('OLLAMA_URLS') or '').split(',') if url.strip()]
+    # Hosts are checked (reachable, models installed) this often: in the
+    # background by the API, and on the next request by Celery workers.
+    OLLAMA_HEALTH_INTERVAL_SECONDS: float = float(os.getenv('OLLAMA_HEALTH_INTERVAL_SECONDS') or '30')
+    # Send a second copy of a request to another host once it has run longer
+    # than this percentile of recent request times (0 disables hedging).
+    OLLAMA_HEDGE_PERCENTILE: float = float(os.getenv('OLLAMA_HEDGE_PERCENTILE') or '0')
     OLLAMA_DEFAULT_MODEL: str = os.getenv('OLLAMA_DEFAULT_MODEL') or ''
+    # How long Ollama keeps the model (and the last evaluated prompt) loaded
+    # after a request, e.g. "30m"; set but empty uses Ollama's default (5m).
+    OLLAMA_KEEP_ALIVE: str = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+    # Context window requested from Ollama; 0 keeps the model's default.  It
+    # must hold LLM_PROMPT_TOKEN_BUDGET plus the template and the answer.
+    OLLAMA_NUM_CTX: int = int(os.getenv('OLLAMA_NUM_CTX') or '0')
     N8N_WEBHOOK_URL: str = os.getenv('N8N_WEBHOOK_URL') or ''
     N8N_API_KEY: str = os.getenv('N8N_API_KEY') or ''
     FRONTEND_PORT: int = int(os.getenv('FRONTEND_PORT') or '80')
     DB_ECHO: bool = (os.getenv('DB_ECHO') or 'false').lower() in ('1', 'true', 'yes')
 
+    # ------------------------------------------------------------------
+    # Outbound HTTP (Ollama, n8n)
+    # ------------------------------------------------------------------
+    # Each backend gets one pooled, keep-alive client per event loop (see
+    # ``app.services.http_clients``).  Timeouts are in seconds; HTTP/2 needs
+    # the optional ``h2`` package and is ignored without it.
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv('HTTP_POOL_MAX_CONNECTIONS') or '20')
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv('HTTP_POOL_MAX_KEEPALIVE') or '10')
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv('HTTP_KEEPALIVE_EXPIRY_SECONDS') or '60')
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv('HTTP_CONNECT_TIMEOUT_SECONDS') or '5')
+    HTTP2_ENABLED: bool = (os.getenv('HTTP2_ENABLED') or 'false').lower() in ('1', 'true', 'yes')
+    # Generation can take minutes on CPU-only hosts.
+    OLLAMA_TIMEOUT_SECONDS: float = float(os.getenv('OLLAMA_TIMEOUT_SECONDS') or '120')
+    # Admission control per process (see services/ollama_admission.py): at
+    # most OLLAMA_MAX_IN_FLIGHT requests per Ollama host run, OLLAMA_MAX_QUEUE wait up to
+    # OLLAMA_QUEUE_TIMEOUT_SECONDS, the rest get 429.  After
+    # OLLAMA_BREAKER_FAILURES consecutive failures requests fail fast (503)
+    # for OLLAMA_BREAKER_COOLDOWN_SECONDS; 0 disables the breaker.
+    OLLAMA_MAX_IN_FLIGHT: int = int(os.getenv('OLLAMA_MAX_IN_FLIGHT') or '2')
+    OLLAMA_MAX_QUEUE: int = int(os.getenv('OLLAMA_MAX_QUEUE') or '8')
+    OLLAMA_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv('OLLAMA_QUEUE_TIMEOUT_SECONDS') or '60')
+    OLLAMA_BREAKER_FAILURES: int = int(os.getenv('OLLAMA_BREAKER_FAILURES') or '3')
+    OLLAMA_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv('OLLAMA_BREAKER_COOLDOWN_SECONDS') or '30')
+    N8N_TIMEOUT_SECONDS: float = float(os.getenv('N8N_TIMEOUT_SECONDS') or '60')
+
+    # ------------------------------------------------------------------
+    # LLM suggestions
+    # ------------------------------------------------------------------
+    # Suggestions are cached per (model, prompt type, template version,
+    # transcript hash); the template version also covers the prompt budget,
+    # map-reduce and OLLAMA_NUM_CTX settings below.  Entries live in an
+    # in-process LRU of LLM_CACHE_SIZE entries and in the llm_suggestions
+    # table.  Requests can bypass it with force=true.
+    LLM_CACHE_ENABLED: bool = (os.getenv('LLM_CACHE_ENABLED') or 'true').lower() in ('1', 'true', 'yes')
+    LLM_CACHE_SIZE: int = int(os.getenv('LLM_CACHE_SIZE') or '256')
+    # Transcripts estimated above LLM_MAP_REDUCE_THRESHOLD_TOKENS are split
+    # into chunks of LLM_CHUNK_TOKENS on segment boundaries, summarised with
+    # at most LLM_MAP_CONCURRENCY requests in flight, and the section
+    # summaries are then used in place of the transcript.
+    LLM_MAP_REDUCE_THRESHOLD_TOKENS: int = int(os.getenv('LLM_MAP_REDUCE_THRESHOLD_TOKENS') or '6000')
+    LLM_CHUNK_TOKENS: int = int(os.getenv('LLM_CHUNK_TOKENS') or '3000')
+    LLM_MAP_CONCURRENCY: int = int(os.getenv('LLM_MAP_CONCURRENCY') or '2')
+    # Hard cap on the (compacted, possibly condensed) transcript in a prompt;
+    # longer ones are sampled evenly across the episode.  0 disables the cap.
+    LLM_PROMPT_TOKEN_BUDGET: int = int(os.getenv('LLM_PROMPT_TOKEN_BUDGET') or '8000')
+    # Identical requests in flight at the same time share one generation, in
+    # a process and across workers (Redis lock); force=true requests always
+    # generate on their own.  Waiters give up and generate themselves after
+    # LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS, which is also the lifetime of the lock.
+    LLM_SINGLE_FLIGHT_ENABLED: bool = (os.getenv('LLM_SINGLE_FLIGHT_ENABLED') or 'true').lower() in ('1', 'true', 'yes')
+    LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS: float = float(os.getenv('LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS') or '600')
+
     # ------------------------------------------------------------------
     # File upload configuration
     # ------------------------------------------------------------------
@@ -51,6 +121,111 @@ class Settings:
     # ------------------------------------------------------------------
     MAX_UPLOAD_SIZE_MB: int = int(os.getenv('MAX_UPLOAD_SIZE_MB') or '500')
 
+    # ------------------------------------------------------------------
+    # Video rendering
+    # ------------------------------------------------------------------
+    # Comma separated list of output resolutions that uploaded show artwork
+    # is pre-scaled to (see ``app.services.background_assets``).  Renders at
+    # any other resolution still work – the frame is prepared on demand.
+    # ------------------------------------------------------------------
+    VIDEO_RESOLUTIONS: str = os.getenv('VIDEO_RESOLUTIONS') or '1280x720,1920x1080,640x360'
+
+    # Draft previews render a short excerpt, small and with the fastest x264
+    # preset so producers can check colours/layout within seconds.
+    VIDEO_PREVIEW_SECONDS: float = float(os.getenv('VIDEO_PREVIEW_SECONDS') or '15')
+    VIDEO_PREVIEW_RESOLUTION: str = os.getenv('VIDEO_PREVIEW_RESOLUTION') or '640x360'
+    VIDEO_PREVIEW_PRESET: str = os.getenv('VIDEO_PREVIEW_PRESET') or 'ultrafast'
+
+    # Animated (NumPy rendered) visualisations: frame rate and how many frames
+    # are computed/rasterised per vectorised batch.  A batch holds
+    # ``batch * width * height * 5`` bytes of buffers, so the batch size is the
+    # largest that fits VIDEO_RENDER_BUFFER_MB, capped at VIDEO_RENDER_BATCH_FRAMES
+    # (3 frames at 1080p, 7 at 720p with the defaults; small batches stay in cache).
+    VIDEO_ANIMATION_FPS: int = int(os.getenv('VIDEO_ANIMATION_FPS') or '25')
+    VIDEO_RENDER_BATCH_FRAMES: int = int(os.getenv('VIDEO_RENDER_BATCH_FRAMES') or '16')
+    VIDEO_RENDER_BUFFER_MB: float = float(os.getenv('VIDEO_RENDER_BUFFER_MB') or '32')
+
+    # Library thumbnails: poster frame width and waveform image size.
+    THUMBNAIL_WIDTH: int = int(os.getenv('THUMBNAIL_WIDTH') or '480')
+    THUMBNAIL_WAVEFORM_SIZE: str = os.getenv('THUMBNAIL_WAVEFORM_SIZE') or '480x96'
+
+    # ------------------------------------------------------------------
+    # Transcription (faster-whisper)
+    # ------------------------------------------------------------------
+    # Default model used when a job does not ask for a specific one.
+    WHISPER_MODEL_SIZE: str = os.getenv('WHISPER_MODEL_SIZE') or 'base.en'
+    WHISPER_DEVICE: str = os.getenv('WHISPER_DEVICE') or 'cpu'
+    WHISPER_COMPUTE_TYPE: str = os.getenv('WHISPER_COMPUTE_TYPE') or 'int8'
+    # Models loaded when a worker process starts, so the first job does not
+    # pay the cold start.  Comma separated ``size[:device[:compute_type]]``
+    # entries; missing parts fall back to the defaults above.
+    WHISPER_PRELOAD_MODELS: str = os.getenv('WHISPER_PRELOAD_MODELS') or ''
+    # Models a job may pick with ``model`` (the default and preloaded models
+    # are always allowed).  Comma separated faster-whisper model names.
+    WHISPER_ALLOWED_MODELS: str = (
+        os.getenv('WHISPER_ALLOWED_MODELS') or 'tiny,tiny.en,base,base.en,small,small.en,medium,medium.en,large-v3'
+    )
+    # Upper bound for the resident memory of all loaded models per worker
+    # process.  Least recently used models are evicted to stay below it.
+    WHISPER_MODEL_MEMORY_CAP_MB: int = int(os.getenv('WHISPER_MODEL_MEMORY_CAP_MB') or '4096')
+    # Decoding engine: "sequential" (default) or "batched"
+    # (BatchedInferencePipeline, opt-in; much higher CPU throughput).  Clips
+    # shorter than WHISPER_BATCHED_MIN_SECONDS always use the sequential engine.
+    WHISPER_ENGINE: str = os.getenv('WHISPER_ENGINE') or 'sequential'
+    WHISPER_BATCH_SIZE: int = int(os.getenv('WHISPER_BATCH_SIZE') or '8')
+    WHISPER_BEAM_SIZE: int = int(os.getenv('WHISPER_BEAM_SIZE') or '5')
+    WHISPER_BATCHED_MIN_SECONDS: float = float(os.getenv('WHISPER_BATCHED_MIN_SECONDS') or '60')
+    # Voice activity detection (opt-in): skip silence and music beds before
+    # decoding.  Threshold is the Silero speech probability; durations in ms.
+    WHISPER_VAD_FILTER: bool = (os.getenv('WHISPER_VAD_FILTER') or 'false').lower() in ('1', 'true', 'yes')
+    WHISPER_VAD_THRESHOLD: float = float(os.getenv('WHISPER_VAD_THRESHOLD') or '0.5')
+    WHISPER_VAD_MIN_SPEECH_MS: int = int(os.getenv('WHISPER_VAD_MIN_SPEECH_MS') or '250')
+    WHISPER_VAD_MIN_SILENCE_MS: int = int(os.getenv('WHISPER_VAD_MIN_SILENCE_MS') or '1000')
+    WHISPER_VAD_SPEECH_PAD_MS: int = int(os.getenv('WHISPER_VAD_SPEECH_PAD_MS') or '400')
+    # Spoken language (e.g. "en"); empty means detect it once per job on the
+    # WHISPER_LANGUAGE_DETECT_SECONDS of audio with the most speech.
+    WHISPER_LANGUAGE: str = os.getenv('WHISPER_LANGUAGE') or ''
+    WHISPER_LANGUAGE_DETECT_SECONDS: float = float(os.getenv('WHISPER_LANGUAGE_DETECT_SECONDS') or '30')
+    # Word-level timestamps (stored as compact arrays, see services/word_store.py)
+    WHISPER_WORD_TIMESTAMPS: bool = (os.getenv('WHISPER_WORD_TIMESTAMPS') or 'false').lower() in ('1', 'true', 'yes')
+    # Segments are committed to the database in batches while a job runs
+    # (whichever limit is reached first), bounding the work lost on a crash.
+    TRANSCRIPT_SEGMENT_COMMIT_EVERY: int = int(os.getenv('TRANSCRIPT_SEGMENT_COMMIT_EVERY') or '20')
+    TRANSCRIPT_SEGMENT_COMMIT_SECONDS: float = float(os.getenv('TRANSCRIPT_SEGMENT_COMMIT_SECONDS') or '10')
+    # Reuse finished transcripts of identical audio + decoding options.
+    TRANSCRIPT_CACHE_ENABLED: bool = (os.getenv('TRANSCRIPT_CACHE_ENABLED') or 'true').lower() in ('1', 'true', 'yes')
+    # Chunked mode: split long recordings at silences and transcribe the
+    # chunks in parallel as a Celery group.
+    TRANSCRIPTION_CHUNKED: bool = (os.getenv('TRANSCRIPTION_CHUNKED') or 'false').lower() in ('1', 'true', 'yes')
+    TRANSCRIPTION_CHUNK_SECONDS: float = float(os.getenv('TRANSCRIPTION_CHUNK_SECONDS') or '600')
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS: float = float(os.getenv('TRANSCRIPTION_CHUNK_OVERLAP_SECONDS') or '2.0')
+    TRANSCRIPTION_SILENCE_DB: float = float(os.getenv('TRANSCRIPTION_SILENCE_DB') or '-35')
+    TRANSCRIPTION_SILENCE_MIN_SECONDS: float = float(os.getenv('TRANSCRIPTION_SILENCE_MIN_SECONDS') or '0.4')
+
+    @property
+    def whisper_preload_models(self) -> list[tuple[str, str, str]]:
+        """Return ``WHISPER_PRELOAD_MODELS`` as ``(size, device, compute_type)`` keys."""
+        keys = []
+        for spec in self.WHISPER_PRELOAD_MODELS.split(','):
+            parts = [p.strip() for p in spec.split(':')]
+            if not parts[0]:
+                continue
+            parts += [''] * (3 - len(parts))
+            keys.append((parts[0], parts[1] or self.WHISPER_DEVICE, parts[2] or self.WHISPER_COMPUTE_TYPE))
+        return keys
+
+    @property
+    def whisper_allowed_models(self) -> list[str]:
+        """Return the model sizes a job may request (see ``WHISPER_ALLOWED_MODELS``)."""
+        sizes = [self.WHISPER_MODEL_SIZE, *(size for size, _, _ in self.whisper_preload_models)]
+        sizes += [m.strip() for m in self.WHISPER_ALLOWED_MODELS.split(',') if m.strip()]
+        return list(dict.fromkeys(sizes))
+
+    @property
+    def video_resolutions(self) -> list[str]:
+        """Return ``VIDEO_RESOLUTIONS`` as a list of ``WxH`` strings."""
+        return [r.strip() for r in self.VIDEO_RESOLUTIONS.split(',') if r.strip()]
+
     @property
     def max_upload_size_bytes(self) -> int:
         """Return the upload size limit in raw bytes (0 == unlimited)."""
@@ -16,6 +16,7 @@ code runs successfully.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -30,6 +31,8 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 # Internal utilities
 from app.logging_config import LOG_DIR as APP_LOG_DIR
 from app.logging_config import setup_logging
+from app.services.http_clients import aclose_clients
+from app.services.ollama_pool import run_health_checks
 from app.utils.storage import (
     DATA_ROOT,
     OUTPUTS_DIR,
@@ -44,8 +47,11 @@ from app.api import (
     routes_llm,
     routes_library,
     routes_jobs,
+    routes_metrics,
     routes_outputs,
+    routes_pipeline,
     routes_publish,
+    routes_settings,
     routes_transcription,
     routes_video,
 )
@@ -101,6 +107,18 @@ def create_app() -> FastAPI:  # noqa: D401 – factory nomenclature is fine
 
         logger.info("Start-up checks finished.")
 
+    @app.on_event("startup")
+    async def _start_ollama_health_checks() -> None:  # noqa: D401
+        app.state.ollama_health_checks = asyncio.create_task(run_health_checks())
+
+    @app.on_event("shutdown")
+    async def _close_http_clients() -> None:  # noqa: D401
+        task = getattr(app.state, "ollama_health_checks", None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await aclose_clients()
+
     # ------------------------------------------------------------------
     # Exception handlers
     # ------------------------------------------------------------------
@@ -119,7 +137,11 @@ def create_app() -> FastAPI:  # noqa: D401 – factory nomenclature is fine
         exc: StarletteHTTPException,
     ) -> JSONResponse:  # type: ignore[valid-type]
         logger.error("HTTP exception %s: %s", exc.status_code, exc.detail)
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers=getattr(exc, "headers", None),
+        )
 
     @app.exception_handler(AppBaseException)
     async def _app_error_handler(  # noqa: D401
@@ -161,6 +183,9 @@ def create_app() -> FastAPI:  # noqa: D401 – factory nomenclature is fine
     app.include_router(routes_video.router, prefix="/api/video", tags=["video"])
     app.include_router(routes_library.router, prefix="/api/library", tags=["library"])
     app.include_router(routes_jobs.router, prefix="/api/jobs", tags=["jobs"])
+    app.include_router(routes_settings.router, prefix="/api/settings", tags=["settings"])
+    app.include_router(routes_pipeline.router, prefix="/api/pipeline", tags=["pipeline"])
+    app.include_router(routes_metrics.router, prefix="/api/metrics", tags=["metrics"])
 
     # ------------------------------------------------------------------
     # Ensure DB schema exists (development convenience only).
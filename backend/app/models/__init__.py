@@ -1,7 +1,10 @@
 # Namespace for Pydantic & ORM models.
 from .audio import AudioFile
 from .job import ProcessingJob
-from .llm import LLMSuggestion
+from .llm import LLMPartialSummary, LLMSuggestion
+from .pipeline import Pipeline
+from .show import Show
 from .transcript import Transcript
+from .transcript_segment import TranscriptSegment
 
-__all__ = ["AudioFile", "ProcessingJob", "LLMSuggestion", "Transcript"]
+__all__ = ["AudioFile", "ProcessingJob", "LLMPartialSummary", "LLMSuggestion", "Pipeline", "Show", "Transcript", "TranscriptSegment"]
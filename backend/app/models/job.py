@@ -6,9 +6,10 @@ Feel free to extend once additional metadata or relations are needed.
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from sqlalchemy import Column, DateTime, Enum as SAEnum, Integer, String, Text
 
@@ -32,10 +33,30 @@ class ProcessingJob(Base):
     id: int = Column(Integer, primary_key=True, autoincrement=True, index=True)
     job_type: str = Column(String(50), nullable=False)
     status: JobStatus = Column(SAEnum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    input_file_path: Optional[str] = Column(String(255), nullable=True)
     output_file_path: Optional[str] = Column(String(255), nullable=True)
     error_message: Optional[str] = Column(Text, nullable=True)
     created_at: datetime = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
 
+    # Performance measurements (timings, realtime factors, ...) as JSON in a
+    # TEXT column for portability across DBs.  Use the helpers below.
+    _metrics_json: Optional[str] = Column("metrics", Text, nullable=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the job's metrics as a dict even if the DB value is NULL/empty."""
+        if not self._metrics_json:
+            return {}
+        try:
+            return json.loads(self._metrics_json)
+        except json.JSONDecodeError:
+            return {}
+
+    def update_metrics(self, **values: Any) -> None:
+        """Merge ``values`` into the stored metrics (top-level keys are replaced)."""
+        metrics = self.get_metrics()
+        metrics.update(values)
+        self._metrics_json = json.dumps(metrics)
+
     # Helper to convert enum to plain string for JSON responses
     @property
     def status_str(self) -> str:
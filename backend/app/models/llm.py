@@ -6,7 +6,7 @@ import json
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 
 from app.db.base import Base
 
@@ -15,12 +15,19 @@ class LLMSuggestion(Base):
     """Persistence model storing the output of the Ollama powered LLM."""
 
     __tablename__ = "llm_suggestions"
+    __table_args__ = (
+        # Suggestion cache lookups (see app.services.suggestion_cache)
+        Index("ix_llm_suggestions_cache", "transcript_hash", "prompt_type", "model_used", "prompt_version"),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True, index=True)
 
     # Optional FK to the job that produced the transcript
     job_id: Optional[int] = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"))
 
+    # The llm_suggestion job that generated it (NULL when generated inline by the API)
+    llm_job_id: Optional[int] = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"), index=True)
+
     prompt_type: str = Column(String(50), nullable=False)
     model_used: Optional[str] = Column(String(100), nullable=True)
 
@@ -29,6 +36,20 @@ class LLMSuggestion(Base):
 
     suggested_summary: Optional[str] = Column(Text, nullable=True)
 
+    # Cache key: SHA-256 of the transcript and version of the prompt template
+    transcript_hash: Optional[str] = Column(String(64), nullable=True)
+    prompt_version: Optional[str] = Column(String(16), nullable=True)
+
+    # Size of the prompt: our estimate and Ollama's prompt_eval_count
+    # (both NULL when the suggestion came from the cache)
+    prompt_tokens_estimated: Optional[int] = Column(Integer, nullable=True)
+    prompt_tokens: Optional[int] = Column(Integer, nullable=True)
+    # Ollama's prompt evaluation time; low when the transcript prefix was
+    # already evaluated for another prompt type
+    prompt_eval_ms: Optional[int] = Column(Integer, nullable=True)
+    # Ollama host that generated it (see app.services.ollama_pool)
+    backend: Optional[str] = Column(String(255), nullable=True)
+
     created_at: datetime = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
 
     # ------------------------------------------------------------------
@@ -73,3 +94,23 @@ class LLMSuggestion(Base):
 
         # Use the helper to ensure correct serialisation
         self.set_titles(titles)
+
+
+class LLMPartialSummary(Base):
+    """Summary of one transcript chunk from a map-reduce run (see services/llm.py).
+
+    Keyed by the chunk's hash, so a failed or repeated run reuses the chunks
+    that were already summarised.
+    """
+
+    __tablename__ = "llm_partial_summaries"
+    __table_args__ = (
+        Index("ix_llm_partial_summaries_chunk", "chunk_hash", "model_used", "prompt_version"),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    chunk_hash: str = Column(String(64), nullable=False)
+    model_used: str = Column(String(100), nullable=False)
+    prompt_version: str = Column(String(16), nullable=False)
+    summary: str = Column(Text, nullable=False)
+    created_at: datetime = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
@@ -0,0 +1,59 @@
+"""SQLAlchemy model for multi-stage episode pipelines."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Column, DateTime, Enum as SAEnum, ForeignKey, Integer, String, Text
+
+from app.db.base import Base
+from app.models.job import JobStatus
+
+
+class Pipeline(Base):
+    """
+    One submission of an episode through every stage: audio processing, then
+    transcription (followed by LLM suggestions) and video rendering in parallel.
+
+    Each stage is an ordinary :class:`ProcessingJob`; the pipeline links them
+    and records the aggregated status once the last stage has finished.
+    """
+
+    __tablename__ = "pipelines"
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    status: JobStatus = Column(SAEnum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    upload_session_id: Optional[str] = Column(String(64), nullable=True, comment="Upload session whose tracks are processed.")
+    audio_job_id: int = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"), nullable=True)
+    transcription_job_id: Optional[int] = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"), nullable=True)
+    suggestion_job_id: Optional[int] = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"), nullable=True)
+    video_job_id: Optional[int] = Column(Integer, ForeignKey("processing_jobs.id", ondelete="SET NULL"), nullable=True)
+    error_message: Optional[str] = Column(Text, nullable=True)
+    created_at: datetime = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    completed_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True, comment="When the last stage finished (set for COMPLETED and FAILED).")
+
+    def stage_job_ids(self) -> Dict[str, int]:
+        """Return ``{stage: job_id}`` for the stages this pipeline runs, in order."""
+        stages = {
+            "audio": self.audio_job_id,
+            "transcription": self.transcription_job_id,
+            "suggestions": self.suggestion_job_id,
+            "video": self.video_job_id,
+        }
+        return {stage: job_id for stage, job_id in stages.items() if job_id is not None}
+
+    @property
+    def status_str(self) -> str:
+        return self.status.value if isinstance(self.status, JobStatus) else str(self.status)
+
+
+def aggregate_status(statuses: list[JobStatus]) -> JobStatus:
+    """Combine stage statuses: any failure fails the pipeline, all done completes it."""
+    if any(s == JobStatus.FAILED for s in statuses):
+        return JobStatus.FAILED
+    if statuses and all(s == JobStatus.COMPLETED for s in statuses):
+        return JobStatus.COMPLETED
+    if all(s == JobStatus.PENDING for s in statuses):
+        return JobStatus.PENDING
+    return JobStatus.PROCESSING
@@ -0,0 +1,22 @@
+"""SQLAlchemy model for per-show settings (artwork, defaults)."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+from app.db.base import Base
+
+
+class Show(Base):
+    """
+    Represents a podcast show (series) and the settings shared by its episodes.
+
+    Episodes of the same show reuse one cover image, so the artwork is stored as
+    the content hash of a prepared background asset rather than a file path.
+    """
+    __tablename__ = "shows"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True, comment="Primary key for the show record.")
+    name = Column(String(255), unique=True, nullable=False, index=True, comment="Unique, human readable show name.")
+    artwork_hash = Column(String(64), nullable=True, comment="Content hash of the prepared background asset used for video renders.")
+    default_language = Column(String(8), nullable=True, comment="Spoken language code pinned for transcriptions of this show's episodes (NULL: detect).")
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, comment="Timestamp of when the show record was created.")
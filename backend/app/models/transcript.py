@@ -20,4 +20,7 @@ class Transcript(Base):
     text_content = Column(Text, nullable=True, comment="The full transcript in plain text format.")
     srt_content = Column(Text, nullable=True, comment="The transcript in SubRip (SRT) format, including timestamps.")
     language = Column(String(50), nullable=True, comment="The detected language of the audio (e.g., 'en', 'es').")
+    cache_key = Column(String(64), nullable=True, index=True, comment="Hash of the audio content and decoding options; identical requests reuse this transcript.")
+    cached_from_id = Column(Integer, ForeignKey("transcripts.id", ondelete="SET NULL"), nullable=True, comment="Transcript this one was copied from on a cache hit (NULL if decoded).")
+    words_path = Column(String(255), nullable=True, comment="Directory of memory-mapped word timestamp arrays, relative to DATA_ROOT (word-level mode only).")
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, comment="Timestamp of when the transcript record was created.")
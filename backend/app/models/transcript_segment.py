@@ -0,0 +1,27 @@
+"""SQLAlchemy model for individual transcript segments."""
+
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, Text
+from app.db.base import Base
+
+
+class TranscriptSegment(Base):
+    """
+    One timed segment of a transcription job's output.
+
+    Segments are committed in small batches while the job runs, so a partial
+    transcript can be read before the job finishes and a restarted job can
+    resume after the last committed segment instead of starting over.
+    """
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        # Time-range reads and keyset pagination walk (owner, start, id).
+        Index("ix_transcript_segments_transcript_start", "transcript_id", "start"),
+        Index("ix_transcript_segments_job_start", "processing_job_id", "start"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="Primary key for the segment record.")
+    processing_job_id = Column(Integer, ForeignKey("processing_jobs.id", ondelete="CASCADE"), nullable=False, comment="Transcription job that produced the segment.")
+    transcript_id = Column(Integer, ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=True, comment="Transcript the segment belongs to; set once the job completes.")
+    start = Column(Float, nullable=False, comment="Segment start, in seconds from the beginning of the audio.")
+    end = Column(Float, nullable=False, comment="Segment end, in seconds from the beginning of the audio.")
+    text = Column(Text, nullable=False, comment="Transcribed text of the segment.")
@@ -0,0 +1,147 @@
+"""Pre-scaled background artwork for waveform video renders.
+
+Show artwork is uploaded once and scaled/padded to every configured output
+resolution straight away.  The prepared frames live under
+``BACKGROUNDS_DIR/<sha256>/<WxH>.png`` so identical uploads are stored once and
+each episode render can reference a frame that already has the right size,
+instead of making FFmpeg decode and scale the original image every time.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+
+import ffmpeg
+
+from app.config import settings
+from app.utils.storage import BACKGROUNDS_DIR, compute_file_hash, ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+SOURCE_BASENAME = "source"
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_content_hash(value: str) -> bool:
+    """True if ``value`` looks like an asset id (a lowercase hex SHA-256 digest)."""
+    return bool(CONTENT_HASH_RE.match(value))
+
+
+def _asset_dir(content_hash: str) -> Path:
+    # Asset ids reach us from query strings; never let one escape BACKGROUNDS_DIR.
+    if not is_content_hash(content_hash):
+        raise ValueError(f"Invalid background asset id '{content_hash}'")
+    return BACKGROUNDS_DIR / content_hash
+
+
+def _parse_resolution(resolution: str) -> tuple[int, int]:
+    try:
+        width, height = (int(v) for v in resolution.lower().split("x"))
+    except ValueError as exc:
+        raise ValueError(f"Invalid resolution '{resolution}', expected WIDTHxHEIGHT") from exc
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid resolution '{resolution}', dimensions must be positive")
+    return width, height
+
+
+def _find_source(content_hash: str) -> Path | None:
+    asset_dir = _asset_dir(content_hash)
+    if not asset_dir.is_dir():
+        return None
+    for candidate in asset_dir.glob(f"{SOURCE_BASENAME}.*"):
+        return candidate
+    return None
+
+
+def _scale_background(source: Path, destination: Path, resolution: str) -> Path:
+    """Scale ``source`` to fit ``resolution`` (letterboxed) and write a PNG frame."""
+    width, height = _parse_resolution(resolution)
+    # Write to a temporary name first so concurrent renders never pick up a
+    # half-written frame.
+    tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp.png")
+    try:
+        stream = (
+            ffmpeg.input(str(source))
+            .filter("scale", width, height, force_original_aspect_ratio="decrease")
+            .filter("pad", width, height, "(ow-iw)/2", "(oh-ih)/2")
+            .output(str(tmp_path), vframes=1)
+        )
+        ffmpeg.run(
+            stream,
+            cmd=getattr(settings, "FFMPEG_PATH", "ffmpeg"),
+            overwrite_output=True,
+            capture_stdout=True,
+            capture_stderr=True,
+        )
+        os.replace(tmp_path, destination)
+    except ffmpeg.Error as exc:
+        stderr = exc.stderr.decode("utf8") if exc.stderr else str(exc)
+        logger.error("FFmpeg error preparing background %s at %s: %s", source, resolution, stderr)
+        raise
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    logger.info("Prepared background frame %s", destination)
+    return destination
+
+
+def prepare_background(image_path: Path, resolutions: list[str] | None = None) -> str:
+    """Register an artwork image and pre-scale it to every supported resolution.
+
+    Args:
+        image_path: Path to the uploaded image.
+        resolutions: Resolutions to prepare. Defaults to ``settings.video_resolutions``.
+
+    Returns:
+        The content hash identifying the prepared asset.
+
+    Raises:
+        FileNotFoundError: If ``image_path`` does not exist.
+        ffmpeg.Error: If scaling fails.
+    """
+    if not image_path.exists():
+        logger.error("Background image %s not found", image_path)
+        raise FileNotFoundError(f"Background image not found: {image_path}")
+
+    content_hash = compute_file_hash(image_path)
+    asset_dir = ensure_dir_exists(_asset_dir(content_hash))
+
+    source = _find_source(content_hash)
+    if source is None:
+        source = asset_dir / f"{SOURCE_BASENAME}{image_path.suffix.lower()}"
+        shutil.copyfile(image_path, source)
+        logger.info("Stored new background asset %s from %s", content_hash, image_path)
+    else:
+        logger.info("Background asset %s already registered, reusing it", content_hash)
+
+    for resolution in resolutions or settings.video_resolutions:
+        frame = asset_dir / f"{resolution}.png"
+        if not frame.exists():
+            _scale_background(source, frame, resolution)
+    return content_hash
+
+
+def get_prepared_background(content_hash: str, resolution: str) -> Path:
+    """Return the prepared frame for ``content_hash`` at ``resolution``.
+
+    Frames for resolutions that were not prepared up-front are generated once
+    on first use and reused afterwards.
+
+    Raises:
+        ValueError: If ``content_hash`` or ``resolution`` is malformed.
+        FileNotFoundError: If no asset with ``content_hash`` was registered.
+    """
+    _parse_resolution(resolution)
+    frame = _asset_dir(content_hash) / f"{resolution}.png"
+    if frame.exists():
+        return frame
+
+    source = _find_source(content_hash)
+    if source is None:
+        logger.error("Background asset %s is not registered", content_hash)
+        raise FileNotFoundError(f"Background asset not found: {content_hash}")
+    return _scale_background(source, frame, resolution)
@@ -0,0 +1,314 @@
+"""Split long recordings at silences and transcribe the pieces in parallel.
+
+A single ``model.transcribe`` call is sequential, so a multi-hour episode keeps
+one core busy for a long time.  The chunked mode
+
+1. runs FFmpeg's ``silencedetect`` over the file and picks cut points in the
+   middle of silences close to every ``TRANSCRIPTION_CHUNK_SECONDS``,
+2. transcribes each chunk (extended by ``TRANSCRIPTION_CHUNK_OVERLAP_SECONDS``
+   on both sides so a word at a cut is heard whole) as its own Celery task,
+3. shifts chunk segments back to episode time and stitches them: every chunk
+   owns the span between its two cut points, and a segment belongs to the
+   chunk whose span contains the segment's midpoint.  Segments heard twice in
+   an overlap are therefore kept exactly once.
+
+The plan and every finished chunk's result are kept in
+``<basename>.chunks/`` next to the segment log, so a resumed job re-dispatches
+only the chunks that never finished instead of skipping gaps.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import ffmpeg
+
+from app.config import settings
+from app.services.transcription import (
+    Segment, detect_language, get_whisper_model, load_audio, probe_duration, speech_dense_window,
+)
+from app.utils.storage import ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+@dataclass
+class Chunk:
+    """A piece of the recording to transcribe.
+
+    ``start``/``end`` delimit the audio that is decoded (cut points widened by
+    the overlap); ``keep_start``/``keep_end`` are the cut points themselves,
+    i.e. the span whose segments this chunk contributes to the transcript.
+    """
+
+    index: int
+    start: float
+    end: float
+    keep_start: float
+    keep_end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Chunk":
+        return cls(**data)
+
+
+def parse_silences(ffmpeg_stderr: str, duration: float) -> list[tuple[float, float]]:
+    """Extract ``(start, end)`` silences from ``silencedetect`` log output."""
+    silences = []
+    start = None
+    for line in ffmpeg_stderr.splitlines():
+        if (m := _SILENCE_START_RE.search(line)) is not None:
+            start = max(0.0, float(m.group(1)))
+        elif (m := _SILENCE_END_RE.search(line)) is not None and start is not None:
+            silences.append((start, float(m.group(1))))
+            start = None
+    if start is not None:  # silence running until the end of the file
+        silences.append((start, duration))
+    return silences
+
+
+def detect_silences(
+    audio_path: Path,
+    duration: float,
+    noise_db: float | None = None,
+    min_silence: float | None = None,
+) -> list[tuple[float, float]]:
+    """Run ``silencedetect`` over ``audio_path`` and return the silent spans."""
+    noise_db = settings.TRANSCRIPTION_SILENCE_DB if noise_db is None else noise_db
+    min_silence = settings.TRANSCRIPTION_SILENCE_MIN_SECONDS if min_silence is None else min_silence
+    stream = (
+        ffmpeg.input(str(audio_path))
+        .filter("silencedetect", noise=f"{noise_db}dB", d=min_silence)
+        .output("-", format="null")
+    )
+    try:
+        _, stderr = ffmpeg.run(
+            stream,
+            cmd=getattr(settings, "FFMPEG_PATH", "ffmpeg"),
+            capture_stdout=True,
+            capture_stderr=True,
+        )
+    except ffmpeg.Error as exc:
+        stderr = exc.stderr.decode("utf8") if exc.stderr else str(exc)
+        logger.error("FFmpeg silencedetect failed for %s: %s", audio_path, stderr)
+        raise
+    return parse_silences(stderr.decode("utf8", errors="replace"), duration)
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    target_seconds: float | None = None,
+    overlap_seconds: float | None = None,
+) -> list[Chunk]:
+    """Choose cut points and return the chunks covering ``[0, duration]``.
+
+    Around every multiple of ``target_seconds`` the silence whose midpoint is
+    closest (within half a chunk) is used as the cut; when no silence is near
+    the cut falls on the target itself and the overlap keeps the word intact.
+    """
+    target = settings.TRANSCRIPTION_CHUNK_SECONDS if target_seconds is None else target_seconds
+    overlap = settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+    midpoints = sorted((s + e) / 2 for s, e in silences)
+
+    cuts = [0.0]
+    while duration - cuts[-1] > 1.5 * target:
+        ideal = cuts[-1] + target
+        window = [m for m in midpoints if cuts[-1] + target / 2 < m < ideal + target / 2]
+        cuts.append(min(window, key=lambda m: abs(m - ideal)) if window else ideal)
+    cuts.append(duration)
+
+    return [
+        Chunk(
+            index=i,
+            start=max(0.0, keep_start - overlap),
+            end=min(duration, keep_end + overlap),
+            keep_start=keep_start,
+            keep_end=keep_end,
+        )
+        for i, (keep_start, keep_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+def extract_chunk_audio(audio_path: Path, chunk: Chunk, output_path: Path) -> Path:
+    """Decode the chunk's span of ``audio_path`` to 16 kHz mono WAV (Whisper's input format)."""
+    stream = ffmpeg.input(str(audio_path), ss=chunk.start, t=chunk.duration).output(
+        str(output_path), ac=1, ar=16000, acodec="pcm_s16le"
+    )
+    try:
+        ffmpeg.run(
+            stream,
+            cmd=getattr(settings, "FFMPEG_PATH", "ffmpeg"),
+            overwrite_output=True,
+            capture_stdout=True,
+            capture_stderr=True,
+        )
+    except ffmpeg.Error as exc:
+        stderr = exc.stderr.decode("utf8") if exc.stderr else str(exc)
+        logger.error("FFmpeg error extracting chunk %s of %s: %s", chunk.index, audio_path, stderr)
+        raise
+    return output_path
+
+
+def chunk_state_dir(output_basename: str, transcript_dir: Path) -> Path:
+    """Directory holding a chunked job's plan and finished chunk results."""
+    return transcript_dir / f"{output_basename}.chunks"
+
+
+def _write_json(path: Path, data: dict) -> None:
+    # Write then rename, so a worker dying mid-write never leaves a torn file.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def save_chunk_plan(state_dir: Path, chunks: list[Chunk], decode_options: dict) -> None:
+    """Record the chunks and the (language-resolved) decode options a job was split with."""
+    ensure_dir_exists(state_dir)
+    _write_json(state_dir / "plan.json", {"chunks": [c.to_dict() for c in chunks], "decode_options": decode_options})
+
+
+def load_chunk_plan(state_dir: Path) -> tuple[list[Chunk], dict] | None:
+    """Return the saved ``(chunks, decode_options)``, or ``None`` if the job was never split."""
+    path = state_dir / "plan.json"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        plan = json.load(f)
+    return [Chunk.from_dict(c) for c in plan["chunks"]], plan["decode_options"]
+
+
+def save_chunk_result(state_dir: Path, result: dict) -> None:
+    """Record a finished chunk (the result ``transcribe_chunk_task`` returns)."""
+    ensure_dir_exists(state_dir)
+    _write_json(state_dir / f"chunk_{result['index']:04d}.json", result)
+
+
+def load_chunk_results(state_dir: Path) -> dict[int, dict]:
+    """Return the finished chunks' results by chunk index."""
+    results = {}
+    for path in sorted(state_dir.glob("chunk_*.json")):
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        results[result["index"]] = result
+    return results
+
+
+def clear_chunk_state(state_dir: Path) -> None:
+    """Remove a job's chunk state once its transcript is stored."""
+    shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def offset_segments(segments: list[Segment], chunk: Chunk) -> list[Segment]:
+    """Shift chunk-relative segments to episode time and keep the ones the chunk owns."""
+    owned = []
+    for segment in segments:
+        segment = segment.shifted(chunk.start)
+        midpoint = (segment.start + segment.end) / 2
+        # Half-open spans so a segment centred exactly on a cut is kept once;
+        # the last chunk also keeps anything that runs past the end.
+        before_end = midpoint < chunk.keep_end or chunk.keep_end >= chunk.end
+        if midpoint >= chunk.keep_start and before_end:
+            owned.append(segment)
+    return owned
+
+
+def offset_speech(speech: list[tuple[float, float]], chunk: Chunk) -> list[list[float]]:
+    """Shift chunk-relative speech spans to episode time, clipped to the chunk's own span."""
+    owned = []
+    for start, end in speech:
+        start = max(start + chunk.start, chunk.keep_start)
+        end = min(end + chunk.start, chunk.keep_end)
+        if end > start:
+            owned.append([start, end])
+    return owned
+
+
+def merge_speech(chunk_speech: list[list[list[float]]]) -> list[tuple[float, float]]:
+    """Combine per-chunk speech spans, joining spans that touch across a cut."""
+    merged: list[tuple[float, float]] = []
+    for start, end in sorted(span for chunk in chunk_speech for span in chunk):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_chunk_segments(chunk_segments: list[list[Segment]]) -> list[Segment]:
+    """Concatenate per-chunk (already offset) segments into one ordered transcript.
+
+    Segment times are clamped to be monotonic so the SRT stays valid where
+    neighbouring chunks disagree slightly about a boundary.
+    """
+    merged: list[Segment] = []
+    for segment in sorted((s for chunk in chunk_segments for s in chunk), key=lambda s: s.start):
+        if not segment.text:
+            continue
+        start = max(segment.start, merged[-1].end) if merged else segment.start
+        merged.append(Segment(start=start, end=max(start, segment.end), text=segment.text, words=segment.words))
+    return merged
+
+
+def speech_between_silences(silences: list[tuple[float, float]], duration: float) -> list[tuple[float, float]]:
+    """Return the non-silent spans of a file of ``duration`` seconds."""
+    speech, position = [], 0.0
+    for start, end in silences:
+        if start > position:
+            speech.append((position, start))
+        position = max(position, end)
+    if position < duration:
+        speech.append((position, duration))
+    return speech
+
+
+def detect_episode_language(
+    audio_path: Path,
+    duration: float,
+    silences: list[tuple[float, float]],
+    tmp_dir: Path,
+    model_size: str | None = None,
+    compute_type: str | None = None,
+) -> tuple[str, float]:
+    """Detect the language once for a chunked job so every chunk decodes with it.
+
+    Only the most speech-dense ``WHISPER_LANGUAGE_DETECT_SECONDS`` between the
+    silences already found for planning are decoded.
+
+    Raises:
+        RuntimeError: If the Whisper model is not available.
+    """
+    model = get_whisper_model(model_size, compute_type=compute_type)
+    if not model:
+        raise RuntimeError("Whisper model is not initialized or failed to load.")
+    start, end = speech_dense_window(
+        speech_between_silences(silences, duration), duration, settings.WHISPER_LANGUAGE_DETECT_SECONDS
+    )
+    excerpt = Chunk(index=-1, start=start, end=end, keep_start=start, keep_end=end)
+    return detect_language(model, load_audio(extract_chunk_audio(audio_path, excerpt, tmp_dir / "language_excerpt.wav")))
+
+
+def majority_language(languages: list[tuple[str | None, float]]) -> str | None:
+    """Return the language detected for most audio, given ``(language, seconds)`` pairs."""
+    totals: dict[str, float] = {}
+    for language, seconds in languages:
+        if language:
+            totals[language] = totals.get(language, 0.0) + seconds
+    return max(totals, key=totals.get) if totals else None
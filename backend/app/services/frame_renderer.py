@@ -0,0 +1,472 @@
+"""Animated waveform / spectrum renderer built on NumPy.
+
+FFmpeg's animated visualisation filters (``showwaves``, ``showspectrum``) are
+slow at HD resolutions and hard to style.  This module renders the frames
+itself instead:
+
+1. the audio is decoded **once** by an FFmpeg subprocess into mono 16-bit PCM
+   and read from its stdout in blocks of ``batch_frames`` video frames, so
+   memory use is bounded no matter how long the episode is;
+2. per-frame waveform envelopes or STFT magnitudes are computed for the whole
+   batch with vectorised NumPy operations;
+3. the batch is rasterised into preallocated buffers that are reused for
+   every batch.  Pixels are packed ``rgb0`` words (one ``uint32`` per pixel),
+   which lets foreground/background selection run as plain bitwise ops over
+   contiguous memory instead of a slow masked copy over a 3-byte axis.  The
+   frame buffer doubles as the selection scratch, so a batch holds
+   ``BYTES_PER_PIXEL`` bytes per pixel and ``batch_frames`` is derived from
+   ``VIDEO_RENDER_BUFFER_MB`` (see :func:`batch_frames_for`); and
+4. the raw frames are piped (zero-copy) to a second FFmpeg process that muxes
+   them with the original audio.
+
+Run ``python -m app.services.frame_renderer <audio>`` to benchmark the renderer
+against the equivalent FFmpeg filters, or ``--raster [WxH] [batch]`` to time the
+rasteriser alone.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.utils.storage import ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+STYLES = ("waveform", "spectrum")
+
+# One little-endian 32-bit word per pixel, byte order R, G, B, 0 (``rgb0``).
+PIXEL_DTYPE = np.dtype("<u4")
+# Per-pixel memory of one batched frame: the packed pixel plus one mask byte.
+BYTES_PER_PIXEL = PIXEL_DTYPE.itemsize + 1
+
+# Only a handful of names are needed by the API; anything else can be given
+# as ``#RRGGBB`` / ``0xRRGGBB`` like FFmpeg accepts.
+NAMED_COLORS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+    "blue": (0, 0, 255),
+    "yellow": (255, 255, 0),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+    "gray": (128, 128, 128),
+    "grey": (128, 128, 128),
+    "orange": (255, 165, 0),
+}
+
+
+def parse_color(color: str) -> tuple[int, int, int]:
+    """Convert an FFmpeg style colour (name, ``#RRGGBB`` or ``0xRRGGBB``) to RGB."""
+    value = color.strip().lower()
+    if value in NAMED_COLORS:
+        return NAMED_COLORS[value]
+    for prefix in ("#", "0x"):
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+            break
+    if len(value) != 6:
+        raise ValueError(f"Unsupported colour '{color}'")
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))  # type: ignore[return-value]
+    except ValueError as exc:
+        raise ValueError(f"Unsupported colour '{color}'") from exc
+
+
+def pack_rgb(rgb: tuple[int, int, int]) -> np.uint32:
+    """Pack an RGB triple into a little-endian ``rgb0`` pixel word."""
+    r, g, b = rgb
+    return np.uint32(r | (g << 8) | (b << 16))
+
+
+def _ffmpeg_bin() -> str:
+    return getattr(settings, "FFMPEG_PATH", "ffmpeg")
+
+
+def batch_frames_for(width: int, height: int, budget_mb: float | None = None, max_frames: int | None = None) -> int:
+    """Return how many frames to render per batch within the buffer budget.
+
+    Defaults to ``VIDEO_RENDER_BUFFER_MB`` capped at ``VIDEO_RENDER_BATCH_FRAMES``;
+    at least one frame is always rendered.
+    """
+    budget_mb = settings.VIDEO_RENDER_BUFFER_MB if budget_mb is None else budget_mb
+    max_frames = max_frames or settings.VIDEO_RENDER_BATCH_FRAMES
+    frame_bytes = width * height * BYTES_PER_PIXEL
+    return max(1, min(max_frames, int(budget_mb * 1024 * 1024) // frame_bytes))
+
+
+class FrameRenderer:
+    """Vectorised rasteriser for batches of visualisation frames.
+
+    The renderer keeps a short history of samples between batches (needed for
+    the STFT window) and owns every large buffer it draws into, so rendering a
+    batch allocates nothing proportional to the frame size.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int,
+        sample_rate: int,
+        style: str = "waveform",
+        fg_color: str = "white",
+        bg_color: str = "black",
+        batch_frames: int = 16,
+        n_fft: int = 2048,
+        background: np.ndarray | None = None,
+    ) -> None:
+        if style not in STYLES:
+            raise ValueError(f"Unknown style '{style}'. Available styles: {STYLES}")
+        if sample_rate % fps:
+            raise ValueError("sample_rate must be a multiple of fps")
+
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.sample_rate = sample_rate
+        self.samples_per_frame = sample_rate // fps
+        self.style = style
+        self.batch_frames = batch_frames
+        self.fg = pack_rgb(parse_color(fg_color))
+        self.n_fft = n_fft
+
+        # History long enough for the widest analysis window of either style.
+        self.window = max(n_fft, 2 * self.samples_per_frame)
+        self._history = np.zeros(self.window, dtype=np.float32)
+
+        # Reused output buffer (packed rgb0 pixels, also the selection scratch)
+        # and the one boolean mask.
+        self.frames = np.empty((batch_frames, height, width), dtype=PIXEL_DTYPE)
+        self._mask = np.empty((batch_frames, height, width), dtype=bool)
+        self._rows = np.arange(height, dtype=np.float32)[None, :, None]
+
+        if background is not None:
+            if background.shape != (height, width):
+                raise ValueError("background must be a HxW array of packed rgb0 pixels matching the output size")
+            self._background = background.astype(PIXEL_DTYPE, copy=False)
+        else:
+            self._background = np.full((height, width), pack_rgb(parse_color(bg_color)), dtype=PIXEL_DTYPE)
+        # XOR trick: bg ^ ((bg ^ fg) & select) picks fg where select is all ones.
+        self._toggle = np.bitwise_xor(self._background, self.fg)
+
+        # Waveform: column boundaries over the analysis window.
+        self._wave_edges = np.linspace(0, self.window, width + 1).astype(np.int64)[:-1]
+
+        # Spectrum: Hann window and log-spaced frequency bins -> one bar per column.
+        self._hann = np.hanning(n_fft).astype(np.float32)
+        n_bins = n_fft // 2 + 1
+        edges = np.unique(np.geomspace(1, n_bins - 1, width + 1).astype(np.int64))
+        self._spec_edges = edges[:-1]
+        # Map every output column to one of the (possibly fewer) bars.
+        self._spec_columns = np.linspace(0, len(self._spec_edges) - 1, width).round().astype(np.int64)
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def _windows(self, samples: np.ndarray) -> np.ndarray:
+        """Return the analysis window ending at each frame of ``samples``.
+
+        ``samples`` holds ``n * samples_per_frame`` new samples; the result has
+        shape ``(n, self.window)``, gathered from a sliding-window view so only
+        the batch's windows are materialised.
+        """
+        n = len(samples) // self.samples_per_frame
+        buffer = np.concatenate((self._history, samples))
+        self._history = buffer[-self.window:].copy()
+        ends = self.window + np.arange(1, n + 1) * self.samples_per_frame
+        view = np.lib.stride_tricks.sliding_window_view(buffer, self.window)
+        return view[ends - self.window]
+
+    def waveform_extents(self, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return per-column (top, bottom) pixel rows for waveform frames."""
+        peaks_hi = np.maximum.reduceat(windows, self._wave_edges, axis=1)
+        peaks_lo = np.minimum.reduceat(windows, self._wave_edges, axis=1)
+        half = self.height / 2.0
+        top = half - np.clip(peaks_hi, 0.0, 1.0) * half
+        bottom = half - np.clip(peaks_lo, -1.0, 0.0) * half
+        return top, bottom
+
+    def spectrum_extents(self, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return per-column (top, bottom) pixel rows for spectrum bar frames."""
+        segment = windows[:, -self.n_fft:] * self._hann
+        magnitude = np.abs(np.fft.rfft(segment, axis=1))
+        bars = np.maximum.reduceat(magnitude, self._spec_edges, axis=1)
+        # Map to a 60 dB range relative to a full-scale sine.
+        db = 20.0 * np.log10(bars / (self.n_fft / 4.0) + 1e-9)
+        level = np.clip((db + 60.0) / 60.0, 0.0, 1.0)[:, self._spec_columns]
+        top = self.height - level * self.height
+        bottom = np.full_like(top, self.height - 1)
+        return top, bottom
+
+    # ------------------------------------------------------------------
+    # Rasterisation
+    # ------------------------------------------------------------------
+
+    def render(self, samples: np.ndarray) -> np.ndarray:
+        """Rasterise the frames covering ``samples`` (float32 mono, [-1, 1]).
+
+        Returns a view into the internal frame buffer; it is overwritten by the
+        next call, so consume (write) it before rendering the next batch.
+        """
+        n = len(samples) // self.samples_per_frame
+        if n == 0:
+            return self.frames[:0]
+        if n > self.batch_frames:
+            raise ValueError("More samples than fit in one batch")
+
+        windows = self._windows(samples[: n * self.samples_per_frame])
+        if self.style == "waveform":
+            top, bottom = self.waveform_extents(windows)
+        else:
+            top, bottom = self.spectrum_extents(windows)
+
+        # Build the all-ones selection in the frame buffer itself: below
+        # ``bottom`` (0/1 words) -> 0/0xFFFFFFFF, then zeroed above ``top``.
+        mask = self._mask[:n]
+        frames = self.frames[:n]
+        np.less_equal(self._rows, bottom[:, None, :], out=frames, casting="unsafe")
+        np.negative(frames, out=frames)
+        np.greater_equal(self._rows, top[:, None, :], out=mask)
+        np.multiply(frames, mask, out=frames, casting="unsafe")
+        np.bitwise_and(frames, self._toggle, out=frames)
+        np.bitwise_xor(frames, self._background, out=frames)
+        return frames
+
+
+def _load_background(image_path: Path, width: int, height: int) -> np.ndarray:
+    """Decode (and fit) a background image once into packed rgb0 pixels via FFmpeg."""
+    result = subprocess.run(
+        [
+            _ffmpeg_bin(), "-hide_banner", "-loglevel", "error",
+            "-i", str(image_path),
+            "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb0", "pipe:1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return np.frombuffer(result.stdout, dtype=PIXEL_DTYPE).reshape(height, width)
+
+
+def render_animated_video(
+    audio_input_path: Path,
+    video_output_path: Path,
+    resolution: str,
+    fg_color: str,
+    bg_color: str,
+    style: str = "waveform",
+    background_image_path: Path | None = None,
+    start: float = 0.0,
+    duration: float | None = None,
+    preset: str | None = None,
+    fps: int | None = None,
+    batch_frames: int | None = None,
+) -> Path:
+    """Render an animated waveform/spectrum video for ``audio_input_path``.
+
+    Accepts the same look parameters as
+    :func:`app.services.video_processing.generate_waveform_video`.
+
+    Raises:
+        FileNotFoundError: If the audio input does not exist.
+        ValueError: For an unknown style, colour or resolution.
+        subprocess.CalledProcessError: If either FFmpeg process fails.
+    """
+    if not audio_input_path.exists():
+        logger.error("Audio input %s not found", audio_input_path)
+        raise FileNotFoundError(f"Audio input not found: {audio_input_path}")
+
+    width, height = (int(v) for v in resolution.lower().split("x"))
+    fps = fps or settings.VIDEO_ANIMATION_FPS
+    batch_frames = batch_frames or batch_frames_for(width, height)
+    # Keep an integral number of samples per frame.
+    sample_rate = fps * max(1, round(22050 / fps))
+    ensure_dir_exists(video_output_path.parent)
+
+    background = _load_background(background_image_path, width, height) if background_image_path else None
+    renderer = FrameRenderer(
+        width, height, fps, sample_rate,
+        style=style, fg_color=fg_color, bg_color=bg_color,
+        batch_frames=batch_frames, background=background,
+    )
+
+    trim_args: list[str] = []
+    if start:
+        trim_args += ["-ss", str(start)]
+    if duration:
+        trim_args += ["-t", str(duration)]
+
+    decode_cmd = [
+        _ffmpeg_bin(), "-hide_banner", "-loglevel", "error",
+        *trim_args, "-i", str(audio_input_path),
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1",
+    ]
+    encode_cmd = [
+        _ffmpeg_bin(), "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "rgb0", "-s", f"{width}x{height}", "-r", str(fps), "-i", "pipe:0",
+        *trim_args, "-i", str(audio_input_path),
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "libx264", "-preset", preset or "veryfast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        str(video_output_path),
+    ]
+
+    bytes_per_batch = renderer.samples_per_frame * batch_frames * 2
+    frames_written = 0
+    started = time.perf_counter()
+    # stderr goes to temp files: an unread pipe could fill up and deadlock.
+    with tempfile.TemporaryFile() as decode_err, tempfile.TemporaryFile() as encode_err:
+        decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, stderr=decode_err)
+        encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE, stderr=encode_err)
+        try:
+            while True:
+                raw = decoder.stdout.read(bytes_per_batch)
+                if not raw:
+                    break
+                usable = len(raw) - len(raw) % 2
+                samples = np.frombuffer(raw[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+                frames = renderer.render(samples)
+                if len(frames):
+                    encoder.stdin.write(memoryview(frames).cast("B"))
+                    frames_written += len(frames)
+        finally:
+            decoder.stdout.close()
+            if encoder.stdin:
+                encoder.stdin.close()
+            decode_rc = decoder.wait()
+            encode_rc = encoder.wait()
+
+        for rc, cmd, err in ((decode_rc, decode_cmd, decode_err), (encode_rc, encode_cmd, encode_err)):
+            if rc != 0:
+                err.seek(0)
+                stderr = err.read().decode("utf8", errors="replace")
+                logger.error("FFmpeg error rendering animated video: %s", stderr)
+                raise subprocess.CalledProcessError(rc, cmd, stderr=stderr)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Rendered %d %s frames (%s @ %d fps) in %.2fs (%.1f fps)",
+        frames_written, style, resolution, fps, elapsed, frames_written / elapsed if elapsed else 0.0,
+    )
+    return video_output_path
+
+
+# ---------------------------------------------------------------------------
+# Benchmark against FFmpeg's native filters
+# ---------------------------------------------------------------------------
+
+FFMPEG_REFERENCE_FILTERS = {
+    "waveform": "showwaves=s={size}:mode=cline:rate={fps}:colors={fg}",
+    "spectrum": "showfreqs=s={size}:mode=bar:rate={fps}:colors={fg}",
+}
+
+
+def _render_with_ffmpeg_filter(
+    audio_input_path: Path, video_output_path: Path, resolution: str, style: str,
+    fg_color: str, duration: float, fps: int, preset: str,
+) -> None:
+    graph = FFMPEG_REFERENCE_FILTERS[style].format(size=resolution, fps=fps, fg=fg_color)
+    subprocess.run(
+        [
+            _ffmpeg_bin(), "-hide_banner", "-loglevel", "error", "-y",
+            "-t", str(duration), "-i", str(audio_input_path),
+            "-filter_complex", f"[0:a]{graph},format=yuv420p[v]",
+            "-map", "[v]", "-map", "0:a",
+            "-c:v", "libx264", "-preset", preset, "-c:a", "aac",
+            str(video_output_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+def benchmark(
+    audio_input_path: Path,
+    duration: float = 60.0,
+    resolution: str = "1920x1080",
+    fps: int = 25,
+    preset: str = "veryfast",
+) -> dict[str, dict[str, float]]:
+    """Time the NumPy renderer against the FFmpeg filters for each style.
+
+    Returns ``{style: {"numpy_s": ..., "ffmpeg_s": ..., "speedup": ...}}``.
+    """
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for style in STYLES:
+            numpy_out = Path(tmp) / f"numpy_{style}.mp4"
+            ffmpeg_out = Path(tmp) / f"ffmpeg_{style}.mp4"
+
+            t0 = time.perf_counter()
+            render_animated_video(
+                audio_input_path, numpy_out, resolution, "white", "black",
+                style=style, duration=duration, preset=preset, fps=fps,
+            )
+            numpy_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            _render_with_ffmpeg_filter(audio_input_path, ffmpeg_out, resolution, style, "white", duration, fps, preset)
+            ffmpeg_s = time.perf_counter() - t0
+
+            results[style] = {"numpy_s": numpy_s, "ffmpeg_s": ffmpeg_s, "speedup": ffmpeg_s / numpy_s}
+    return results
+
+
+def benchmark_rasteriser(
+    resolution: str = "1920x1080",
+    seconds: float = 10.0,
+    fps: int = 25,
+    batch_frames: int | None = None,
+) -> dict[str, float]:
+    """Time :meth:`FrameRenderer.render` alone (no FFmpeg) on random audio.
+
+    Returns rendered frames per second for each style.
+    """
+    width, height = (int(v) for v in resolution.lower().split("x"))
+    batch_frames = batch_frames or batch_frames_for(width, height)
+    sample_rate = fps * max(1, round(22050 / fps))
+    audio = np.random.default_rng(0).uniform(-1, 1, int(sample_rate * seconds)).astype(np.float32)
+    results: dict[str, float] = {}
+    for style in STYLES:
+        renderer = FrameRenderer(width, height, fps, sample_rate, style=style, batch_frames=batch_frames)
+        step = renderer.samples_per_frame * batch_frames
+        frames = 0
+        t0 = time.perf_counter()
+        for offset in range(0, len(audio), step):
+            frames += len(renderer.render(audio[offset:offset + step]))
+        results[style] = frames / (time.perf_counter() - t0)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    if len(sys.argv) < 2:
+        print("Usage: python -m app.services.frame_renderer <audio-file> [seconds] [WxH]")
+        print("       python -m app.services.frame_renderer --raster [WxH] [batch-frames]")
+        sys.exit(1)
+    if sys.argv[1] == "--raster":
+        size = sys.argv[2] if len(sys.argv) > 2 else "1920x1080"
+        batch = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        for name, rate in benchmark_rasteriser(size, batch_frames=batch).items():
+            print(f"{name:>9}: {rate:.1f} frames/s")
+        sys.exit(0)
+    audio = Path(sys.argv[1])
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    size = sys.argv[3] if len(sys.argv) > 3 else "1920x1080"
+    for name, timing in benchmark(audio, duration=seconds, resolution=size).items():
+        print(
+            f"{name:>9}: numpy {timing['numpy_s']:.2f}s | ffmpeg filter {timing['ffmpeg_s']:.2f}s "
+            f"| speed-up x{timing['speedup']:.2f}"
+        )
@@ -0,0 +1,162 @@
+"""Shared, pooled HTTP clients for the services we call (Ollama, n8n).
+
+Opening an ``httpx.AsyncClient`` per call means a new TCP connection, a new
+pool and no keep-alive for every suggestion or publish request.  Instead each
+backend gets one long-lived client with its own timeout and the pool limits
+from settings.
+
+An ``AsyncClient`` belongs to the event loop it is first used on, so clients
+are kept per loop:
+
+* the API process has a single loop; its clients are closed on shutdown
+  (``aclose_clients`` in ``app.main``);
+* Celery tasks run coroutines with :func:`run_in_worker_loop`, which keeps one
+  loop per worker thread alive between tasks so its connections are reused.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("ollama", "n8n")
+
+_clients: dict[tuple[str, int], httpx.AsyncClient] = {}
+_lock = threading.Lock()
+_counters: dict[str, Counter] = {backend: Counter() for backend in BACKENDS}
+_thread_state = threading.local()
+
+
+def _timeout(backend: str) -> httpx.Timeout:
+    read = settings.OLLAMA_TIMEOUT_SECONDS if backend == "ollama" else settings.N8N_TIMEOUT_SECONDS
+    return httpx.Timeout(read, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS)
+
+
+def http2_available() -> bool:
+    """HTTP/2 is used only when enabled and the optional ``h2`` package is installed."""
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _create_client(backend: str) -> httpx.AsyncClient:
+    counters = _counters[backend]
+
+    async def on_request(request: httpx.Request) -> None:
+        counters["requests"] += 1
+
+    async def on_response(response: httpx.Response) -> None:
+        counters["responses"] += 1
+        if response.status_code >= 500:
+            counters["server_errors"] += 1
+
+    if settings.HTTP2_ENABLED and not http2_available():
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1 for %s", backend)
+    counters["clients_created"] += 1
+    return httpx.AsyncClient(
+        timeout=_timeout(backend),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=http2_available(),
+        event_hooks={"request": [on_request], "response": [on_response]},
+    )
+
+
+def get_client(backend: str) -> httpx.AsyncClient:
+    """Return the pooled client for ``backend`` on the running event loop.
+
+    Raises:
+        ValueError: If ``backend`` is unknown.
+        RuntimeError: If called outside a running event loop.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTTP backend '{backend}'. Available backends: {', '.join(BACKENDS)}")
+    key = (backend, id(asyncio.get_running_loop()))
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = _clients[key] = _create_client(backend)
+        return client
+
+
+async def aclose_clients() -> None:
+    """Close the clients that belong to the running event loop."""
+    loop_id = id(asyncio.get_running_loop())
+    with _lock:
+        keys = [key for key in _clients if key[1] == loop_id]
+        clients = [_clients.pop(key) for key in keys]
+    for client in clients:
+        await client.aclose()
+    if clients:
+        logger.info("Closed %d pooled HTTP client(s)", len(clients))
+
+
+def run_in_worker_loop(coro):
+    """Run ``coro`` to completion on this thread's persistent event loop.
+
+    Use instead of ``asyncio.run`` in Celery tasks: ``asyncio.run`` creates and
+    closes a loop per call, which would discard the pooled connections.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+def close_worker_loop() -> None:
+    """Close this thread's clients and event loop (worker shutdown)."""
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        return
+    loop.run_until_complete(aclose_clients())
+    loop.close()
+
+
+def _pool_connections(client: httpx.AsyncClient) -> tuple[int, int]:
+    """Return ``(open, idle)`` connections of a client's pool (0, 0 if unknown)."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    return len(connections), idle
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Per-backend client, request and connection counts for this process."""
+    with _lock:
+        clients = list(_clients.items())
+    stats: Dict[str, Any] = {}
+    for backend in BACKENDS:
+        counters = _counters[backend]
+        open_connections = idle_connections = 0
+        active_clients = 0
+        for (name, _), client in clients:
+            if name != backend or client.is_closed:
+                continue
+            active_clients += 1
+            opened, idle = _pool_connections(client)
+            open_connections += opened
+            idle_connections += idle
+        stats[backend] = {
+            "clients": active_clients,
+            "clients_created": counters["clients_created"],
+            "requests": counters["requests"],
+            "responses": counters["responses"],
+            "in_flight": counters["requests"] - counters["responses"],
+            "server_errors": counters["server_errors"],
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "max_connections": settings.HTTP_POOL_MAX_CONNECTIONS,
+            "http2": http2_available(),
+        }
+    return stats
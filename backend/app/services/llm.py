@@ -1,50 +1,319 @@
 """Abstraction layer around the Ollama REST API."""
 
+import asyncio
+import copy
 import httpx
 import json
 import logging
-from typing import Dict, List, Any # Ensure List and Any are imported
+import time
+from typing import AsyncIterator, Callable, Dict, List, Any # Ensure List and Any are imported
+
+from sqlalchemy.orm import Session
 
 from ..config import settings
+from ..db.database import SessionLocal
+from ..models.llm import LLMPartialSummary
+from . import single_flight, suggestion_cache
+from .ollama_admission import OllamaBusy, OllamaUnavailable, ollama_slot
+from .ollama_pool import get_pool
+from .prompt_budget import CHARS_PER_TOKEN, chunk_transcript, compact_transcript, estimate_tokens, sample_to_budget
+from .suggestion_cache import SuggestionKey
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
 
-PROMPT_TEMPLATES = {
-    "title_summary": """
-Based on the following podcast transcript, please suggest 3 concise and engaging titles and a short 2-3 sentence summary.
-
-Transcript:
+# Every template starts with the same transcript block and puts the task
+# after it.  Ollama keeps the evaluated prompt of a loaded model (see
+# OLLAMA_KEEP_ALIVE), so a second prompt type for the same episode only
+# evaluates the task instructions instead of the whole transcript again.
+TRANSCRIPT_PREFIX = """Podcast transcript:
 {transcript}
 
+"""
+
+PROMPT_TEMPLATES = {
+    "title_summary": TRANSCRIPT_PREFIX + """Based on the podcast transcript above, please suggest 3 concise and engaging titles and a short 2-3 sentence summary.
+
 Suggestions (provide in JSON format with keys "titles": ["title1", "title2", "title3"] and "summary": "your summary"):
 """,
-    "title_only": """
-Based on the following podcast transcript, please suggest 3 concise and engaging titles.
-
-Transcript:
-{transcript}
+    "title_only": TRANSCRIPT_PREFIX + """Based on the podcast transcript above, please suggest 3 concise and engaging titles.
 
 Suggestions (provide in JSON format with key "titles": ["title1", "title2", "title3"]):
 """,
-    "summary_only": """
-Based on the following podcast transcript, please provide a short 2-3 sentence summary.
-
-Transcript:
-{transcript}
+    "summary_only": TRANSCRIPT_PREFIX + """Based on the podcast transcript above, please provide a short 2-3 sentence summary.
 
 Suggestions (provide in JSON format with key "summary": "your summary"):
 """
 }
 
-async def generate_suggestions(transcript: str, prompt_type: str = "title_summary") -> Dict[str, Any]:
+def _prompt_settings() -> str:
+    """The settings that shape the prompt built from a transcript (see ``prepare_transcript``)."""
+    return (
+        f"budget={settings.LLM_PROMPT_TOKEN_BUDGET}|threshold={settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS}"
+        f"|chunk={settings.LLM_CHUNK_TOKENS}|chars_per_token={CHARS_PER_TOKEN}|num_ctx={settings.OLLAMA_NUM_CTX}"
+    )
+
+
+def suggestion_key(transcript: str, prompt_type: str, model: str | None = None) -> SuggestionKey:
+    """Cache key of the suggestions for ``transcript`` (stored on LLMSuggestion rows).
+
+    The prompt version covers the template and the prompt-building settings,
+    so changing the token budget or the map-reduce sizes invalidates the entries.
+    """
+    return SuggestionKey(
+        model=model or settings.OLLAMA_DEFAULT_MODEL,
+        prompt_type=prompt_type,
+        prompt_version=suggestion_cache.prompt_version(PROMPT_TEMPLATES[prompt_type] + _prompt_settings()),
+        transcript_hash=suggestion_cache.text_hash(transcript),
+    )
+
+
+# --- Map-reduce for transcripts longer than the model context ---
+# Each chunk is summarised on its own (map, at most LLM_MAP_CONCURRENCY
+# requests at a time); the section summaries then stand in for the transcript
+# in the normal prompt (reduce).  Partial summaries are stored by chunk hash,
+# so a retried request only summarises the chunks that did not finish.
+MAP_PROMPT = """
+Summarize the following part of a podcast transcript in 3-5 sentences. Keep the names, topics and conclusions.
+
+Transcript part:
+{chunk}
+
+Summary (provide in JSON format with key "summary": "your summary"):
+"""
+
+
+def _ollama_payload(prompt: str, stream: bool = False) -> Dict[str, Any]:
+    """Body of an /api/generate request with the configured keep-alive and context size.
+
+    All requests must use the same ``num_ctx``: Ollama reloads the model (and
+    drops its cached prompt) when it changes.
+    """
+    payload: Dict[str, Any] = {"model": settings.OLLAMA_DEFAULT_MODEL, "prompt": prompt, "stream": stream, "format": "json"}
+    if settings.OLLAMA_KEEP_ALIVE:
+        payload["keep_alive"] = settings.OLLAMA_KEEP_ALIVE
+    if settings.OLLAMA_NUM_CTX > 0:
+        payload["options"] = {"num_ctx": settings.OLLAMA_NUM_CTX}
+    return payload
+
+
+def _record_timings(usage: Dict[str, Any] | None, response_data: Dict[str, Any]) -> None:
+    """Copy Ollama's prompt evaluation statistics (durations in ns) into ``usage``."""
+    if usage is None:
+        return
+    if isinstance(response_data.get("prompt_eval_count"), int):
+        usage["prompt_tokens"] = response_data["prompt_eval_count"]
+    for field, name in (("prompt_eval_duration", "prompt_eval_seconds"), ("load_duration", "load_seconds")):
+        if isinstance(response_data.get(field), (int, float)):
+            usage[name] = round(response_data[field] / 1e9, 3)
+
+
+def prompt_eval_ms(usage: Dict[str, Any]) -> int | None:
+    """Prompt evaluation time in whole milliseconds from a usage dict, as stored on LLMSuggestion."""
+    seconds = usage.get("prompt_eval_seconds")
+    return round(seconds * 1000) if seconds is not None else None
+
+
+async def _generate_json(prompt: str) -> Dict[str, Any]:
+    """Send ``prompt`` to Ollama and return the JSON object the model produced.
+
+    Raises:
+        ValueError: If the model output is not a JSON object.
+    """
+    async with ollama_slot():
+        response, _ = await get_pool().generate(_ollama_payload(prompt))
+    try:
+        result = json.loads(response.json()["response"])
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed response from Ollama: {e}") from e
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object from Ollama, got: {result!r}")
+    return result
+
+
+def _stored_partial_summary(chunk_hash: str, model: str, version: str) -> str | None:
+    db = SessionLocal()
+    try:
+        stored = (
+            db.query(LLMPartialSummary)
+            .filter(
+                LLMPartialSummary.chunk_hash == chunk_hash,
+                LLMPartialSummary.model_used == model,
+                LLMPartialSummary.prompt_version == version,
+            )
+            .first()
+        )
+        return stored.summary if stored is not None else None
+    finally:
+        db.close()
+
+
+def _store_partial_summary(chunk_hash: str, model: str, version: str, summary: str) -> None:
+    db = SessionLocal()
+    try:
+        db.add(LLMPartialSummary(chunk_hash=chunk_hash, model_used=model, prompt_version=version, summary=summary))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def summarize_chunks(chunks: List[str]) -> List[str]:
+    """Summarise ``chunks`` concurrently (map phase), reusing stored partial summaries.
+
+    Every chunk is attempted even if another one fails, so all finished
+    summaries are persisted before the first error is raised.  Partial
+    summaries are read and written in sessions of their own, never in the
+    caller's.
+    """
+    model = settings.OLLAMA_DEFAULT_MODEL
+    version = suggestion_cache.prompt_version(MAP_PROMPT)
+    semaphore = asyncio.Semaphore(max(1, settings.LLM_MAP_CONCURRENCY))
+
+    async def summarize(index: int, chunk: str) -> str:
+        chunk_hash = suggestion_cache.text_hash(chunk)
+        stored = _stored_partial_summary(chunk_hash, model, version)
+        if stored is not None:
+            return stored
+        async with semaphore:
+            result = await _generate_json(MAP_PROMPT.format(chunk=chunk))
+        summary = str(result.get("summary") or "").strip()
+        if not summary:
+            raise ValueError(f"Empty summary for transcript chunk {index + 1}/{len(chunks)}")
+        _store_partial_summary(chunk_hash, model, version, summary)
+        return summary
+
+    results = await asyncio.gather(*(summarize(i, c) for i, c in enumerate(chunks)), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        logger.error(f"{len(errors)} of {len(chunks)} transcript chunks could not be summarised")
+        raise errors[0]
+    return list(results)
+
+
+async def condense_transcript(transcript: str) -> str:
+    """Replace a transcript over the token threshold by its section summaries.
+
+    Repeats on the summaries themselves until they fit, so very long episodes
+    get a summary tree rather than an oversized prompt.
+    """
+    text = transcript
+    while estimate_tokens(text) > settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS:
+        chunks = chunk_transcript(text, settings.LLM_CHUNK_TOKENS)
+        if len(chunks) <= 1:
+            break
+        logger.info(f"Summarising {len(chunks)} transcript chunks (~{estimate_tokens(text)} tokens)")
+        summaries = await summarize_chunks(chunks)
+        condensed = "Summaries of consecutive parts of the episode:\n\n" + "\n\n".join(
+            f"Part {i}: {summary}" for i, summary in enumerate(summaries, start=1)
+        )
+        if estimate_tokens(condensed) >= estimate_tokens(text):
+            break
+        text = condensed
+    return text
+
+
+def _check_prompt_type(prompt_type: str) -> None:
+    if prompt_type not in PROMPT_TEMPLATES:
+        logger.error(f"Invalid prompt_type specified: {prompt_type}")
+        raise ValueError(f"Invalid prompt_type: {prompt_type}. Available types: {list(PROMPT_TEMPLATES.keys())}")
+
+
+def _cached_suggestions(key: SuggestionKey, force: bool, db: Session | None, usage: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if force:
+        suggestion_cache.record_forced()
+        return None
+    cached = suggestion_cache.lookup(key, db, usage=usage)
+    if usage is not None:
+        usage["cached"] = cached is not None
+    if cached is not None:
+        logger.info(f"Suggestion cache hit for prompt type '{key.prompt_type}' (transcript {key.transcript_hash[:12]})")
+    return cached
+
+
+async def prepare_transcript(transcript: str) -> str:
+    """Compact, condense (map-reduce) and cap the transcript for a prompt."""
+    prompt_text = compact_transcript(transcript)
+    if estimate_tokens(prompt_text) > settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS:
+        prompt_text = await condense_transcript(prompt_text)
+    return sample_to_budget(prompt_text, settings.LLM_PROMPT_TOKEN_BUDGET)
+
+
+async def _build_prompt(
+    transcript: str, prompt_type: str, usage: Dict[str, Any] | None, prompt_text: str | None = None
+) -> str:
+    """Fill in the template with the prepared transcript (prepared here unless given)."""
+    if prompt_text is None:
+        prompt_text = await prepare_transcript(transcript)
+
+    prompt = PROMPT_TEMPLATES[prompt_type].format(transcript=prompt_text)
+    if usage is not None:
+        usage["transcript_tokens_estimated"] = estimate_tokens(transcript)
+        usage["prompt_tokens_estimated"] = estimate_tokens(prompt)
+    return prompt
+
+
+def _structure_mismatch(prompt_type: str, suggestions_json: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Return the best-effort result if the model output lacks the expected keys, else None."""
+    # Basic validation of the parsed JSON structure based on prompt_type
+    if prompt_type == "title_summary" and not ("titles" in suggestions_json and isinstance(suggestions_json.get("titles"), list) and "summary" in suggestions_json and isinstance(suggestions_json.get("summary"), str)):
+        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'titles' (list) and 'summary' (str). Received: {suggestions_json}")
+        # Return what we have, or a more specific error structure
+        return {"titles": suggestions_json.get("titles", []), "summary": suggestions_json.get("summary", "LLM output structure mismatch.")}
+    elif prompt_type == "title_only" and not ("titles" in suggestions_json and isinstance(suggestions_json.get("titles"), list)):
+        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'titles' (list). Received: {suggestions_json}")
+        return {"titles": suggestions_json.get("titles", [])}
+    elif prompt_type == "summary_only" and not ("summary" in suggestions_json and isinstance(suggestions_json.get("summary"), str)):
+        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'summary' (str). Received: {suggestions_json}")
+        return {"summary": suggestions_json.get("summary", "LLM output structure mismatch.")}
+    return None
+
+
+async def generate_suggestions(
+    transcript: str,
+    prompt_type: str = "title_summary",
+    force: bool = False,
+    db: Session | None = None,
+    usage: Dict[str, Any] | None = None,
+    prompt_text: str | None = None,
+    store: Callable[[Dict[str, Any], Dict[str, Any]], int] | None = None,
+) -> Dict[str, Any]:
     """
     Generates suggestions (titles, summary) from a transcript using Ollama.
 
+    Identical requests are answered from the suggestion cache (see
+    services/suggestion_cache.py) without calling Ollama, and identical
+    requests that arrive while one is being generated wait for its result
+    (see services/single_flight.py); forced requests are never coalesced.
+    Otherwise the
+    transcript is compacted (see services/prompt_budget.py), condensed by
+    map-reduce if longer than LLM_MAP_REDUCE_THRESHOLD_TOKENS and capped at
+    LLM_PROMPT_TOKEN_BUDGET.
+
     Args:
         transcript: The podcast transcript text.
         prompt_type: The type of prompt to use ("title_summary", "title_only", "summary_only").
                      Defaults to "title_summary".
+        force: Skip the cache lookup and ask the model for fresh suggestions
+            (not shared with identical requests in flight either).
+        db: Session used to find earlier suggestions in the database; without
+            it only the in-process cache is consulted.
+        usage: Optional dict that receives request statistics: "cached",
+            "transcript_tokens_estimated", "prompt_tokens_estimated",
+            "prompt_tokens" (as counted by Ollama), "coalesced" (the
+            result came from an identical request in flight),
+            "prompt_eval_seconds" and "load_seconds" as timed by Ollama,
+            "backend" (the Ollama host that answered) and "suggestion_id"
+            (the stored LLMSuggestion row of a cached or coalesced result,
+            if there is one).
+        prompt_text: The transcript as returned by :func:`prepare_transcript`,
+            to skip preparing it again (see :func:`generate_suggestion_set`).
+        store: Optional ``store(suggestions, usage)`` that persists a
+            generated result and returns its LLMSuggestion ID.  The caller
+            that generates calls it and the ID is shared with coalesced
+            callers as ``usage["suggestion_id"]``, so they reuse that row
+            instead of storing a copy.
 
     Returns:
         A dictionary containing suggestions, e.g., {"titles": [...], "summary": "..."}.
@@ -54,78 +323,225 @@ async def generate_suggestions(transcript: str, prompt_type: str = "title_summar
         ValueError: If an invalid prompt_type is provided.
         httpx.HTTPStatusError: If Ollama returns an HTTP error status.
         httpx.RequestError: For other request-related issues (e.g., connection error).
+        OllamaBusy: If no Ollama slot became free (see services/ollama_admission.py).
+        OllamaUnavailable: If Ollama is failing and the circuit breaker is open.
         Exception: For other unexpected errors during the process.
     """
-    if prompt_type not in PROMPT_TEMPLATES:
-        logger.error(f"Invalid prompt_type specified: {prompt_type}")
-        raise ValueError(f"Invalid prompt_type: {prompt_type}. Available types: {list(PROMPT_TEMPLATES.keys())}")
+    _check_prompt_type(prompt_type)
+    key = suggestion_key(transcript, prompt_type)
+    cached = _cached_suggestions(key, force, db, usage)
+    if cached is not None:
+        return cached
+    if force or not settings.LLM_SINGLE_FLIGHT_ENABLED:
+        return await _request_suggestions(transcript, prompt_type, key, usage, prompt_text)
 
-    prompt = PROMPT_TEMPLATES[prompt_type].format(transcript=transcript)
-    
-    ollama_url = settings.OLLAMA_URL
-    model_name = settings.OLLAMA_DEFAULT_MODEL
+    async def produce() -> Dict[str, Any]:
+        leader_usage: Dict[str, Any] = {}
+        suggestions = await _request_suggestions(transcript, prompt_type, key, leader_usage, prompt_text)
+        if store is not None and "error" not in suggestions:
+            leader_usage["suggestion_id"] = store(suggestions, leader_usage)
+        return {"suggestions": suggestions, "usage": leader_usage}
+
+    # Error results are shared with callers waiting in this process but not
+    # published to other workers, which then retry on their own.
+    shared, joined = await single_flight.coalesce(
+        ":".join(key), produce, shareable=lambda value: "error" not in value["suggestions"]
+    )
+    if usage is not None:
+        usage.update(shared["usage"])
+        usage["coalesced"] = joined
+    return copy.deepcopy(shared["suggestions"])
+
+
+async def _request_suggestions(
+    transcript: str,
+    prompt_type: str,
+    key: SuggestionKey,
+    usage: Dict[str, Any] | None,
+    prompt_text: str | None = None,
+) -> Dict[str, Any]:
+    """Build the prompt and ask Ollama (the uncached part of :func:`generate_suggestions`)."""
+    prompt = await _build_prompt(transcript, prompt_type, usage, prompt_text)
+
+    model_name = key.model
     
-    request_payload = {
-        "model": model_name,
-        "prompt": prompt,
-        "stream": False, # Expect a single JSON response
-        "format": "json"  # Request Ollama to output JSON directly
-    }
-
-    logger.info(f"Sending request to Ollama. URL: {ollama_url}/api/generate, Model: {model_name}, Prompt Type: {prompt_type}")
+    # A single JSON response; Ollama is asked to output JSON directly
+    request_payload = _ollama_payload(prompt)
+
+    logger.info(f"Sending request to Ollama. Hosts: {get_pool().urls}, Model: {model_name}, Prompt Type: {prompt_type}")
     logger.debug(f"Ollama request payload (prompt truncated): {{'model': '{model_name}', 'prompt': '{prompt[:100]}...', 'stream': False, 'format': 'json'}}")
 
-    # Increased timeout for potentially long LLM responses
-    async with httpx.AsyncClient(timeout=120.0) as client: 
-        try:
-            response = await client.post(f"{ollama_url}/api/generate", json=request_payload)
-            # This will raise an HTTPStatusError if the response status is 4xx or 5xx
-            response.raise_for_status() 
+    try:
+        # Waits for a free slot (services/ollama_admission.py), then the pool
+        # picks a host (services/ollama_pool.py).  Requests go through the
+        # pooled keep-alive client, whose timeout is OLLAMA_TIMEOUT_SECONDS.
+        # This raises an HTTPStatusError if the response status is 4xx or 5xx.
+        async with ollama_slot():
+            response, backend = await get_pool().generate(request_payload)
+        if usage is not None:
+            usage["backend"] = backend
 
-            response_data = response.json()
-            logger.debug(f"Raw response data from Ollama: {response_data}")
-            
-            # Ollama with format="json" and stream=False returns a single JSON object.
-            # The 'response' field of this object contains the actual JSON string generated by the model.
-            if 'response' in response_data and isinstance(response_data['response'], str):
-                try:
-                    suggestions_json = json.loads(response_data['response'])
-                    logger.info(f"Successfully received and parsed suggestions from Ollama for prompt type '{prompt_type}'.")
-                    
-                    # Basic validation of the parsed JSON structure based on prompt_type
-                    if prompt_type == "title_summary" and not ("titles" in suggestions_json and isinstance(suggestions_json.get("titles"), list) and "summary" in suggestions_json and isinstance(suggestions_json.get("summary"), str)):
-                        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'titles' (list) and 'summary' (str). Received: {suggestions_json}")
-                        # Return what we have, or a more specific error structure
-                        return {"titles": suggestions_json.get("titles", []), "summary": suggestions_json.get("summary", "LLM output structure mismatch.")}
-                    elif prompt_type == "title_only" and not ("titles" in suggestions_json and isinstance(suggestions_json.get("titles"), list)):
-                        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'titles' (list). Received: {suggestions_json}")
-                        return {"titles": suggestions_json.get("titles", [])}
-                    elif prompt_type == "summary_only" and not ("summary" in suggestions_json and isinstance(suggestions_json.get("summary"), str)):
-                        logger.warning(f"LLM output for '{prompt_type}' did not contain expected 'summary' (str). Received: {suggestions_json}")
-                        return {"summary": suggestions_json.get("summary", "LLM output structure mismatch.")}
-
-                    return suggestions_json
+        response_data = response.json()
+        logger.debug(f"Raw response data from Ollama: {response_data}")
+        _record_timings(usage, response_data)
+        
+        # Ollama with format="json" and stream=False returns a single JSON object.
+        # The 'response' field of this object contains the actual JSON string generated by the model.
+        if 'response' in response_data and isinstance(response_data['response'], str):
+            try:
+                suggestions_json = json.loads(response_data['response'])
+                logger.info(f"Successfully received and parsed suggestions from Ollama for prompt type '{prompt_type}'.")
                 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON from Ollama's 'response' field. Content: '{response_data['response']}'. Error: {e}", exc_info=True)
-                    # Return a structured error that can be handled by the API layer
-                    return {"error": "Failed to parse LLM response JSON", "details": response_data.get('response')}
-            else:
-                logger.error(f"Ollama response did not contain a 'response' field or it wasn't a string. Full response: {response_data}")
-                return {"error": "Ollama response missing or malformed 'response' field", "details": str(response_data)}
-
-        except httpx.HTTPStatusError as e:
-            # Log the detailed error response from Ollama if available
-            error_body = e.response.text if e.response else "No response body."
-            logger.error(f"HTTP error {e.response.status_code} from Ollama: {error_body}", exc_info=True)
-            raise # Re-raise to be handled by the API route or Celery task
-        except httpx.RequestError as e:
-            logger.error(f"Request error occurred while calling Ollama (URL: {e.request.url}): {e}", exc_info=True)
-            raise 
-        except Exception as e:
-            # Catch any other unexpected errors
-            logger.error(f"An unexpected error occurred in generate_suggestions: {e}", exc_info=True)
-            raise
+                mismatch = _structure_mismatch(prompt_type, suggestions_json)
+                if mismatch is not None:
+                    return mismatch
+
+                if settings.LLM_CACHE_ENABLED:
+                    suggestion_cache.remember(key, suggestions_json)
+                return suggestions_json
+            
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON from Ollama's 'response' field. Content: '{response_data['response']}'. Error: {e}", exc_info=True)
+                # Return a structured error that can be handled by the API layer
+                return {"error": "Failed to parse LLM response JSON", "details": response_data.get('response')}
+        else:
+            logger.error(f"Ollama response did not contain a 'response' field or it wasn't a string. Full response: {response_data}")
+            return {"error": "Ollama response missing or malformed 'response' field", "details": str(response_data)}
+
+    except httpx.HTTPStatusError as e:
+        # Log the detailed error response from Ollama if available
+        error_body = e.response.text if e.response else "No response body."
+        logger.error(f"HTTP error {e.response.status_code} from Ollama: {error_body}", exc_info=True)
+        raise # Re-raise to be handled by the API route or Celery task
+    except httpx.RequestError as e:
+        logger.error(f"Request error occurred while calling Ollama (URL: {e.request.url}): {e}", exc_info=True)
+        raise 
+    except (OllamaBusy, OllamaUnavailable) as e:
+        logger.warning(f"Ollama request not admitted: {e}")
+        raise
+    except Exception as e:
+        # Catch any other unexpected errors
+        logger.error(f"An unexpected error occurred in generate_suggestions: {e}", exc_info=True)
+        raise
+
+
+async def generate_suggestion_set(
+    transcript: str,
+    prompt_types: List[str],
+    force: bool = False,
+    db: Session | None = None,
+    usage: Dict[str, Dict[str, Any]] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Generate several prompt types for one transcript (multi-task mode).
+
+    The transcript is prepared (compacted, condensed) once and the prompt
+    types are requested one after another, so every request after the first
+    finds the shared transcript prefix already evaluated by Ollama.  Running
+    them concurrently would spread them over Ollama's parallel slots, each
+    evaluating the transcript on its own.
+
+    Returns the suggestions per prompt type, in the order given; ``usage``
+    receives a usage dict (see :func:`generate_suggestions`) per prompt type.
+
+    Raises:
+        ValueError: If a prompt type is invalid.
+    """
+    for prompt_type in prompt_types:
+        _check_prompt_type(prompt_type)
+    prompt_text: str | None = None
+    results: Dict[str, Dict[str, Any]] = {}
+    for prompt_type in dict.fromkeys(prompt_types):
+        type_usage: Dict[str, Any] = {}
+        cached = None
+        if settings.LLM_CACHE_ENABLED and not force:
+            cached = suggestion_cache.lookup(suggestion_key(transcript, prompt_type), db, record=False)
+        if cached is None and prompt_text is None:
+            prompt_text = await prepare_transcript(transcript)
+        results[prompt_type] = await generate_suggestions(
+            transcript, prompt_type, force=force, db=db, usage=type_usage, prompt_text=prompt_text
+        )
+        if usage is not None:
+            usage[prompt_type] = type_usage
+    return results
+
+
+async def stream_suggestions(
+    transcript: str,
+    prompt_type: str = "title_summary",
+    force: bool = False,
+    db: Session | None = None,
+    usage: Dict[str, Any] | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Like :func:`generate_suggestions`, but yields the model output as it is generated.
+
+    Yields ``{"event": "token", "text": ...}`` for every piece of output and
+    finally either ``{"event": "result", "suggestions": {...}}`` or
+    ``{"event": "error", "error": ..., "details": ...}``.  A cache hit yields
+    the result straight away.  ``usage`` additionally receives
+    "first_token_seconds".
+
+    Raises:
+        ValueError: If an invalid prompt_type is provided.
+        httpx.HTTPStatusError / httpx.RequestError: If the request to Ollama fails.
+        OllamaBusy / OllamaUnavailable: If the request is not admitted.
+    """
+    _check_prompt_type(prompt_type)
+    model_name = settings.OLLAMA_DEFAULT_MODEL
+    key = suggestion_key(transcript, prompt_type, model_name)
+    cached = _cached_suggestions(key, force, db, usage)
+    if cached is not None:
+        yield {"event": "result", "suggestions": cached}
+        return
+
+    prompt = await _build_prompt(transcript, prompt_type, usage)
+    request_payload = _ollama_payload(prompt, stream=True)
+    logger.info(f"Streaming from Ollama. Hosts: {get_pool().urls}, Model: {model_name}, Prompt Type: {prompt_type}")
+
+    started = time.monotonic()
+    parts: List[str] = []
+    # Ollama streams one JSON object per line: {"response": "<piece>", "done": false}, ...
+    # The slot is held until the stream ends.
+    async with ollama_slot(), get_pool().stream(request_payload) as (response, backend):
+        if usage is not None:
+            usage["backend"] = backend
+        if response.is_error:
+            await response.aread()
+            logger.error(f"HTTP error {response.status_code} from Ollama: {response.text}")
+            response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                yield {"event": "error", "error": "Error from Ollama", "details": chunk["error"]}
+                return
+            piece = chunk.get("response") or ""
+            if piece:
+                if not parts:
+                    first_token = time.monotonic() - started
+                    logger.info(f"First token from Ollama after {first_token:.2f}s")
+                    if usage is not None:
+                        usage["first_token_seconds"] = round(first_token, 3)
+                parts.append(piece)
+                yield {"event": "token", "text": piece}
+            if chunk.get("done"):
+                _record_timings(usage, chunk)
+                break
+
+    output = "".join(parts)
+    try:
+        suggestions_json = json.loads(output)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse streamed JSON from Ollama. Content: '{output}'. Error: {e}")
+        yield {"event": "error", "error": "Failed to parse LLM response JSON", "details": output}
+        return
+    if not isinstance(suggestions_json, dict):
+        yield {"event": "error", "error": "LLM response is not a JSON object", "details": output}
+        return
+    mismatch = _structure_mismatch(prompt_type, suggestions_json)
+    if mismatch is None and settings.LLM_CACHE_ENABLED:
+        suggestion_cache.remember(key, suggestions_json)
+    yield {"event": "result", "suggestions": mismatch if mismatch is not None else suggestions_json}
 
 # Example usage (can be run with `python -m backend.app.services.llm` if __main__ block is added)
 # async def main():
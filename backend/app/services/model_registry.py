@@ -0,0 +1,279 @@
+"""Process-wide registry of loaded faster-whisper models.
+
+Loading a Whisper model takes seconds (large models: tens of seconds) and
+hundreds of MB to several GB of memory, so models are kept resident in the
+worker process and shared by every job that asks for the same
+``(size, device, compute_type)``.  The registry
+
+* preloads the models listed in ``WHISPER_PRELOAD_MODELS`` when a Celery
+  worker process starts (see ``app.workers.tasks``),
+* keeps models in least-recently-used order and evicts the oldest ones when
+  loading another model would exceed ``WHISPER_MODEL_MEMORY_CAP_MB``,
+* records per-model load time, resident memory and usage counts, which are
+  logged and published to Redis so the API can report them.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ModelKey = tuple[str, str, str]  # (size, device, compute_type)
+
+STATS_KEY_PREFIX = "podcaster:whisper_models:"
+STATS_TTL_SECONDS = 24 * 3600
+
+# Rough resident sizes (MB) of float32 CTranslate2 Whisper models.  Used to
+# decide what to evict *before* loading a model, and as the recorded size
+# when the RSS delta cannot be measured.
+_FLOAT32_SIZE_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3060,
+    "large": 6200,
+}
+_COMPUTE_TYPE_FACTOR = {"float32": 1.0, "float16": 0.5, "bfloat16": 0.5, "int8": 0.3}
+
+
+def estimate_model_mb(size: str, compute_type: str) -> int:
+    """Return an approximate resident size in MB for a model configuration."""
+    family = size.split(".")[0].split("-")[0]
+    base_mb = _FLOAT32_SIZE_MB.get(family, _FLOAT32_SIZE_MB["large"])
+    factor = next(
+        (f for name, f in _COMPUTE_TYPE_FACTOR.items() if compute_type.startswith(name)),
+        1.0,
+    )
+    return int(base_mb * factor)
+
+
+def current_rss_bytes() -> int | None:
+    """Return the resident set size of this process, or ``None`` if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _load_faster_whisper(size: str, device: str, compute_type: str):
+    from faster_whisper import WhisperModel  # Lazy import to avoid heavy dependency unless needed
+
+    return WhisperModel(size, device=device, compute_type=compute_type)
+
+
+@dataclass
+class LoadedModel:
+    """A resident model together with its bookkeeping."""
+
+    key: ModelKey
+    model: Any
+    load_seconds: float
+    resident_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    last_used_at: float = field(default_factory=time.time)
+    uses: int = 0
+
+    def as_dict(self) -> dict:
+        size, device, compute_type = self.key
+        return {
+            "size": size,
+            "device": device,
+            "compute_type": compute_type,
+            "load_seconds": round(self.load_seconds, 3),
+            "resident_mb": round(self.resident_bytes / (1024 * 1024), 1),
+            "loaded_at": self.loaded_at,
+            "last_used_at": self.last_used_at,
+            "uses": self.uses,
+        }
+
+
+class WhisperModelRegistry:
+    """LRU cache of Whisper models bounded by resident memory.
+
+    Args:
+        memory_cap_mb: Budget for all resident models.  A single model larger
+            than the budget is still loaded (after evicting everything else).
+        loader: ``loader(size, device, compute_type) -> model``; defaults to
+            constructing a :class:`faster_whisper.WhisperModel`.
+        publish: Whether to publish stats to Redis after every change.
+    """
+
+    def __init__(
+        self,
+        memory_cap_mb: int,
+        loader: Callable[[str, str, str], Any] | None = None,
+        publish: bool = True,
+    ):
+        self.memory_cap_bytes = memory_cap_mb * 1024 * 1024
+        self._loader = loader or _load_faster_whisper
+        self._publish_enabled = publish
+        self._models: OrderedDict[ModelKey, LoadedModel] = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    @staticmethod
+    def resolve_key(size: str | None = None, device: str | None = None, compute_type: str | None = None) -> ModelKey:
+        return (
+            size or settings.WHISPER_MODEL_SIZE,
+            device or settings.WHISPER_DEVICE,
+            compute_type or settings.WHISPER_COMPUTE_TYPE,
+        )
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.resident_bytes for entry in self._models.values())
+
+    def __contains__(self, key: ModelKey) -> bool:
+        return key in self._models
+
+    def get(self, size: str | None = None, device: str | None = None, compute_type: str | None = None):
+        """Return the model for the given configuration, loading it if needed.
+
+        Raises:
+            RuntimeError: If the model cannot be loaded.
+        """
+        return self.acquire(self.resolve_key(size, device, compute_type)).model
+
+    def acquire(self, key: ModelKey) -> LoadedModel:
+        """Return the registry entry for ``key``, loading the model if needed."""
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = self._load(key)
+            else:
+                self._models.move_to_end(key)
+            entry.uses += 1
+            entry.last_used_at = time.time()
+        return entry
+
+    def preload(self, keys: list[ModelKey]) -> None:
+        """Load each of ``keys``, logging (not raising) failures."""
+        for key in keys:
+            try:
+                self.acquire(key).uses -= 1  # warming is not a use
+            except RuntimeError as exc:
+                logger.error("Could not preload Whisper model %s: %s", key, exc)
+
+    def evict(self, key: ModelKey) -> bool:
+        """Drop ``key`` from the registry.  Returns whether it was resident."""
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if entry is None:
+                return False
+            self.evictions += 1
+            logger.info(
+                "Evicted Whisper model %s (%.0f MB, used %d times)",
+                key, entry.resident_bytes / (1024 * 1024), entry.uses,
+            )
+            del entry
+            gc.collect()  # CTranslate2 frees its buffers when the model object is collected
+            self._publish()
+            return True
+
+    def stats(self) -> dict:
+        """Return a JSON-serialisable snapshot of the registry."""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "hostname": socket.gethostname(),
+                "memory_cap_mb": round(self.memory_cap_bytes / (1024 * 1024), 1),
+                "resident_mb": round(self.resident_bytes / (1024 * 1024), 1),
+                "evictions": self.evictions,
+                # Most recently used first.
+                "models": [entry.as_dict() for entry in reversed(self._models.values())],
+            }
+
+    def _make_room(self, incoming_bytes: int) -> None:
+        while self._models and self.resident_bytes + incoming_bytes > self.memory_cap_bytes:
+            oldest = next(iter(self._models))
+            self.evict(oldest)
+
+    def _load(self, key: ModelKey) -> LoadedModel:
+        size, device, compute_type = key
+        estimate_bytes = estimate_model_mb(size, compute_type) * 1024 * 1024
+        self._make_room(estimate_bytes)
+        if estimate_bytes > self.memory_cap_bytes:
+            logger.warning(
+                "Whisper model %s (~%d MB) exceeds WHISPER_MODEL_MEMORY_CAP_MB; loading it anyway",
+                key, estimate_bytes // (1024 * 1024),
+            )
+
+        logger.info("Loading Whisper model: Size='%s', Device='%s', Compute='%s'", size, device, compute_type)
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = self._loader(size, device, compute_type)
+        except Exception as exc:
+            logger.error("Failed to load Whisper model %s: %s", key, exc, exc_info=True)
+            raise RuntimeError(f"Whisper model {size} ({device}/{compute_type}) failed to load: {exc}") from exc
+        load_seconds = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+
+        # The RSS delta is the best measure we have of what the model costs;
+        # it can be skewed by allocator reuse (e.g. after an eviction), in
+        # which case fall back to the estimate.
+        measured = (rss_after - rss_before) if rss_before is not None and rss_after is not None else 0
+        resident_bytes = measured if measured > 0.25 * estimate_bytes else estimate_bytes
+
+        entry = LoadedModel(key=key, model=model, load_seconds=load_seconds, resident_bytes=resident_bytes)
+        self._models[key] = entry
+        logger.info(
+            "Whisper model %s loaded in %.2fs, ~%.0f MB resident (%.0f MB across %d models)",
+            key, load_seconds, resident_bytes / (1024 * 1024),
+            self.resident_bytes / (1024 * 1024), len(self._models),
+        )
+        # A model that was larger than its estimate may push us over the cap.
+        while len(self._models) > 1 and self.resident_bytes > self.memory_cap_bytes:
+            self.evict(next(iter(self._models)))
+        self._publish()
+        return entry
+
+    def _publish(self) -> None:
+        """Best-effort publication of :meth:`stats` to Redis for the API."""
+        if not self._publish_enabled:
+            return
+        from app.utils.redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return
+        snapshot = self.stats()
+        try:
+            client.set(
+                f"{STATS_KEY_PREFIX}{snapshot['hostname']}:{snapshot['pid']}",
+                json.dumps(snapshot),
+                ex=STATS_TTL_SECONDS,
+            )
+        except Exception as exc:
+            logger.debug("Could not publish Whisper model stats: %s", exc)
+
+
+def collect_published_stats() -> list[dict]:
+    """Return the stats snapshots published by every worker process."""
+    from app.utils.redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        return []
+    snapshots = []
+    for key in client.scan_iter(match=f"{STATS_KEY_PREFIX}*"):
+        raw = client.get(key)
+        if raw:
+            snapshots.append(json.loads(raw))
+    return snapshots
+
+
+registry = WhisperModelRegistry(settings.WHISPER_MODEL_MEMORY_CAP_MB)
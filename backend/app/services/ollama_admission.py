@@ -0,0 +1,279 @@
+"""Admission control and circuit breaking for requests to Ollama.
+
+A CPU-only Ollama host shares its cores between all running generations, so
+a burst of requests makes every one of them slow until they all hit
+OLLAMA_TIMEOUT_SECONDS together.  Every Ollama call therefore takes a slot:
+
+* at most ``OLLAMA_MAX_IN_FLIGHT`` requests per Ollama host run at a time
+  (hosts are balanced by ``services/ollama_pool.py``);
+* up to ``OLLAMA_MAX_QUEUE`` more wait in FIFO order for at most
+  ``OLLAMA_QUEUE_TIMEOUT_SECONDS``; beyond that requests are rejected with
+  :class:`OllamaBusy` (HTTP 429 with ``Retry-After`` in the API);
+* after ``OLLAMA_BREAKER_FAILURES`` consecutive connection errors, timeouts
+  or 5xx responses the breaker opens and requests fail fast with
+  :class:`OllamaUnavailable` (HTTP 503) for ``OLLAMA_BREAKER_COOLDOWN_SECONDS``;
+  then a single trial request decides whether it closes again.
+
+Limits are per process and work across event loops (the API loop and the
+Celery worker threads, see ``http_clients.run_in_worker_loop``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaBusy(Exception):
+    """Too many requests are running or waiting; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class OllamaUnavailable(Exception):
+    """The circuit breaker is open; Ollama is considered down for ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_backend_failure(exc: BaseException) -> bool:
+    """Errors that count against the breaker: Ollama unreachable, timing out or failing (5xx)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.RequestError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Closed → open after ``failure_threshold`` consecutive failures → half-open after the cooldown."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_running = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown_seconds:
+            return "open"
+        return "half_open"
+
+    def check(self) -> None:
+        """Raise :class:`OllamaUnavailable` unless a request may go through."""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_running:
+                self.trial_running = True  # this request is the trial
+                return
+            remaining = self.cooldown_seconds - (time.monotonic() - self.opened_at)
+        raise OllamaUnavailable(
+            f"Ollama is unavailable after {self.consecutive_failures} consecutive failures",
+            retry_after=max(1, math.ceil(remaining)),
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Ollama circuit breaker closed")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_running = False
+            if self.failure_threshold > 0 and self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Ollama circuit breaker opened after {self.consecutive_failures} consecutive failures; "
+                        f"failing fast for {self.cooldown_seconds:.0f}s"
+                    )
+                self.opened_at = time.monotonic()
+
+    def record_released(self) -> None:
+        """A trial request ended without a verdict (e.g. it was rejected or cancelled)."""
+        with self._lock:
+            self.trial_running = False
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded FIFO wait queue."""
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout_seconds: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.in_flight = 0
+        self._waiters: deque[concurrent.futures.Future] = deque()
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        # Moving average of how long a slot is held, for Retry-After
+        self._service_seconds = settings.OLLAMA_TIMEOUT_SECONDS / 4
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new request."""
+        rounds = len(self._waiters) / self.max_in_flight + 1
+        return max(1, math.ceil(self._service_seconds * rounds))
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in line if necessary.
+
+        Raises:
+            OllamaBusy: If the queue is full or the wait timed out.
+        """
+        started = time.monotonic()
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                self._counters["admitted"] += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise OllamaBusy(
+                    f"Ollama is busy: {self.in_flight} requests running and {len(self._waiters)} waiting",
+                    retry_after=self.retry_after(),
+                )
+            waiter: concurrent.futures.Future = concurrent.futures.Future()
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(waiter), self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    waiter.cancel()
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+            if granted:  # the slot arrived just as we gave up: pass it on
+                self.release()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise OllamaBusy(
+                f"Waited {self.queue_timeout_seconds:.0f}s for a free Ollama slot",
+                retry_after=self.retry_after(),
+            ) from None
+        waited = time.monotonic() - started
+        with self._lock:
+            self._counters["admitted"] += 1
+            self._counters["queued"] += 1
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now, without queueing; return whether it was taken."""
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                self._counters["admitted"] += 1
+                return True
+            return False
+
+    def release(self, held_seconds: float | None = None) -> None:
+        """Free a slot, handing it straight to the next waiter if there is one."""
+        with self._lock:
+            if held_seconds is not None:
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * held_seconds
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(None)  # the slot moves to the waiter; in_flight is unchanged
+                    return
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = self._counters["queued"]
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted": self._counters["admitted"],
+                "queued": queued,
+                "rejected": self._counters["rejected"],
+                "timed_out": self._counters["timed_out"],
+                "wait_seconds_avg": round(self._wait_seconds_total / queued, 3) if queued else None,
+                "wait_seconds_max": round(self._wait_seconds_max, 3),
+                "service_seconds_avg": round(self._service_seconds, 3),
+            }
+
+
+admission = AdmissionController(
+    settings.OLLAMA_MAX_IN_FLIGHT * max(1, len(settings.OLLAMA_URLS)),
+    settings.OLLAMA_MAX_QUEUE,
+    settings.OLLAMA_QUEUE_TIMEOUT_SECONDS,
+)
+breaker = CircuitBreaker(settings.OLLAMA_BREAKER_FAILURES, settings.OLLAMA_BREAKER_COOLDOWN_SECONDS)
+
+
+@asynccontextmanager
+async def ollama_slot() -> AsyncIterator[None]:
+    """Hold an Ollama slot for the duration of one request and report its outcome to the breaker.
+
+    Raises:
+        OllamaUnavailable: If the circuit breaker is open.
+        OllamaBusy: If no slot became free (see :class:`AdmissionController`).
+    """
+    breaker.check()
+    try:
+        await admission.acquire()
+    except BaseException:
+        breaker.record_released()
+        raise
+    started = time.monotonic()
+    try:
+        yield
+    except BaseException as exc:
+        if is_backend_failure(exc):
+            breaker.record_failure()
+        elif isinstance(exc, Exception):  # Ollama answered (4xx, malformed output)
+            breaker.record_success()
+        else:
+            breaker.record_released()
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        admission.release(time.monotonic() - started)
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Slot, queue and breaker counters of this process."""
+    return {
+        **admission.stats(),
+        "breaker_state": breaker.state,
+        "consecutive_failures": breaker.consecutive_failures,
+        "breaker_opened": breaker.times_opened,
+    }
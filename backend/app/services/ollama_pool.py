@@ -0,0 +1,303 @@
+"""Pool of Ollama hosts behind the LLM service.
+
+``OLLAMA_URLS`` lists several CPU boxes running Ollama (``OLLAMA_URL`` alone
+is a pool of one).  For every request the pool picks a host:
+
+* only hosts that passed the last health check and have the requested model
+  installed (``GET /api/tags``) are considered, if there are any.  The API
+  process checks every ``OLLAMA_HEALTH_INTERVAL_SECONDS`` in the background
+  (:func:`run_health_checks`); elsewhere (Celery workers) a request starts a
+  check when the last one is older than that;
+* among them the one with the fewest outstanding requests wins; ties go to
+  the model's preferred host (rendezvous hashing of model and URL), so at low
+  load a model keeps running on the same box and stays loaded there;
+* a host that fails (unreachable, timeout, 5xx) is marked down until the next
+  health check and the request moves to the next host;
+* with ``OLLAMA_HEDGE_PERCENTILE`` set, a request still running after that
+  percentile of recent request times is sent to a second host as well and
+  the first answer wins.  The copy takes an admission slot of its own (see
+  ``services/ollama_admission.py``) and is skipped if none is free.
+
+The serving host is returned with the response and recorded on the
+suggestion.  Streams are balanced but neither retried nor hedged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+from app.config import settings
+from app.services import ollama_admission
+from app.services.http_clients import get_client
+from app.services.ollama_admission import is_backend_failure
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 200
+# Hedging needs enough history for the percentile to mean something.
+HEDGE_MIN_SAMPLES = 20
+HEALTH_TIMEOUT_SECONDS = 5
+
+
+def configured_urls() -> List[str]:
+    return list(settings.OLLAMA_URLS) or [settings.OLLAMA_URL.rstrip("/")]
+
+
+def _model_name(name: str) -> str:
+    """Ollama's name for a model: "llama3" is "llama3:latest"."""
+    return name if ":" in name else f"{name}:latest"
+
+
+@dataclass(eq=False)
+class OllamaBackend:
+    url: str
+    healthy: bool = True
+    models: set | None = None  # installed models; None until the first health check
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    hedged: int = 0  # second copies sent to this host
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def serves(self, model: str) -> bool:
+        return self.models is None or _model_name(model) in self.models
+
+
+class OllamaPool:
+    def __init__(self, urls: List[str]):
+        self.backends = [OllamaBackend(url) for url in urls]
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._checked_at = 0.0
+        self._checking = False
+
+    @property
+    def urls(self) -> List[str]:
+        return [backend.url for backend in self.backends]
+
+    # --- Health and model availability ---
+
+    async def refresh(self, force: bool = False) -> None:
+        """Check every host if the last check is older than OLLAMA_HEALTH_INTERVAL_SECONDS."""
+        if len(self.backends) < 2:
+            return  # nothing to choose from
+        with self._lock:
+            due = force or time.monotonic() - self._checked_at >= settings.OLLAMA_HEALTH_INTERVAL_SECONDS
+            if self._checking or not due:
+                return
+            self._checking = True
+        try:
+            await asyncio.gather(*(self._check(backend) for backend in self.backends))
+        finally:
+            with self._lock:
+                self._checking = False
+                self._checked_at = time.monotonic()
+
+    async def _check(self, backend: OllamaBackend) -> None:
+        try:
+            response = await get_client("ollama").get(f"{backend.url}/api/tags", timeout=HEALTH_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            models = {_model_name(m.get("name") or m.get("model") or "") for m in response.json().get("models", [])}
+        except (httpx.HTTPError, ValueError, AttributeError) as exc:
+            if backend.healthy:
+                logger.warning(f"Ollama host {backend.url} failed its health check: {exc}")
+            backend.healthy = False
+            return
+        if not backend.healthy:
+            logger.info(f"Ollama host {backend.url} is healthy again")
+        backend.healthy = True
+        backend.models = models
+
+    # --- Choosing a host ---
+
+    def choose(self, model: str, exclude: List[OllamaBackend] = ()) -> OllamaBackend:
+        """Reserve the best host for ``model`` (see the module docstring)."""
+        with self._lock:
+            candidates = [b for b in self.backends if b not in exclude] or list(self.backends)
+            candidates = [b for b in candidates if b.healthy] or candidates
+            candidates = [b for b in candidates if b.serves(model)] or candidates
+            backend = min(
+                candidates,
+                key=lambda b: (b.outstanding, hashlib.sha256(f"{model}|{b.url}".encode()).hexdigest()),
+            )
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _finish(self, backend: OllamaBackend, seconds: float | None, failed: bool) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            if failed:
+                backend.failures += 1
+                backend.healthy = False  # until the next health check
+            elif seconds is not None:
+                backend.latencies.append(seconds)
+                self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a request is hedged, or None if hedging is off."""
+        if settings.OLLAMA_HEDGE_PERCENTILE <= 0 or len(self.backends) < 2:
+            return None
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return _percentile(samples, settings.OLLAMA_HEDGE_PERCENTILE)
+
+    # --- Requests ---
+
+    async def _send(self, backend: OllamaBackend, payload: Dict[str, Any]) -> httpx.Response:
+        started = time.monotonic()
+        try:
+            response = await get_client("ollama").post(f"{backend.url}/api/generate", json=payload)
+            response.raise_for_status()
+        except BaseException as exc:
+            self._finish(backend, None, failed=is_backend_failure(exc))
+            raise
+        self._finish(backend, time.monotonic() - started, failed=False)
+        return response
+
+    async def _send_hedge(self, backend: OllamaBackend, payload: Dict[str, Any]) -> httpx.Response:
+        """:meth:`_send` holding the extra admission slot taken for the hedge."""
+        try:
+            return await self._send(backend, payload)
+        finally:
+            ollama_admission.admission.release()
+
+    async def _hedged(
+        self, primary: OllamaBackend, payload: Dict[str, Any], tried: List[OllamaBackend]
+    ) -> Tuple[httpx.Response, str]:
+        tasks = {asyncio.ensure_future(self._send(primary, payload)): primary}
+        delay = self.hedge_delay()
+        if len(tried) >= len(self.backends):
+            delay = None  # no other host left to hedge to
+        pending = set(tasks)
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task].url
+                    error = task.exception()
+                if not done and delay is not None:
+                    if not ollama_admission.admission.try_acquire():
+                        logger.info(f"Ollama request on {primary.url} exceeded {delay:.1f}s; no free slot to hedge it")
+                        delay = None
+                        continue
+                    secondary = self.choose(payload["model"], exclude=tried)
+                    tried.append(secondary)
+                    with self._lock:
+                        secondary.hedged += 1
+                    logger.info(f"Ollama request on {primary.url} exceeded {delay:.1f}s; hedging to {secondary.url}")
+                    hedge = asyncio.ensure_future(self._send_hedge(secondary, payload))
+                    tasks[hedge] = secondary
+                    pending.add(hedge)
+                    delay = None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def generate(self, payload: Dict[str, Any]) -> Tuple[httpx.Response, str]:
+        """POST ``payload`` to ``/api/generate`` on the best host; return the response and the host's URL.
+
+        Raises:
+            httpx.HTTPStatusError / httpx.RequestError: If no host could answer
+                (4xx errors are raised straight away).
+        """
+        await self.refresh()
+        tried: List[OllamaBackend] = []
+        while True:
+            backend = self.choose(payload["model"], exclude=tried)
+            tried.append(backend)
+            try:
+                return await self._hedged(backend, payload, tried)
+            except Exception as exc:
+                if not is_backend_failure(exc) or len(tried) >= len(self.backends):
+                    raise
+                logger.warning(f"Ollama host {backend.url} failed ({exc}); trying another host")
+
+    @asynccontextmanager
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[Tuple[httpx.Response, str]]:
+        """Streaming ``/api/generate`` on the best host, yielding the response and the host's URL."""
+        await self.refresh()
+        backend = self.choose(payload["model"])
+        failed = False
+        try:
+            async with get_client("ollama").stream("POST", f"{backend.url}/api/generate", json=payload) as response:
+                yield response, backend.url
+        except BaseException as exc:
+            failed = is_backend_failure(exc)
+            raise
+        finally:
+            self._finish(backend, None, failed)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "url": backend.url,
+                    "healthy": backend.healthy,
+                    "models": sorted(backend.models) if backend.models is not None else None,
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "hedged": backend.hedged,
+                    "latency_seconds_p50": _percentile(backend.latencies, 50),
+                    "latency_seconds_p95": _percentile(backend.latencies, 95),
+                }
+                for backend in self.backends
+            ]
+
+
+def _percentile(samples, percentile: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))], 3)
+
+
+_pool: OllamaPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> OllamaPool:
+    """The process-wide pool, rebuilt if the configured hosts changed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.urls != configured_urls():
+            _pool = OllamaPool(configured_urls())
+        return _pool
+
+
+async def run_health_checks() -> None:
+    """Check the pool every OLLAMA_HEALTH_INTERVAL_SECONDS until cancelled.
+
+    Run by the API process, so hosts marked down come back (and the health in
+    ``backend_stats`` stays current) without waiting for LLM traffic.
+    """
+    while True:
+        try:
+            await get_pool().refresh()
+        except Exception as exc:  # keep checking; one bad round is not fatal
+            logger.warning(f"Ollama health check failed: {exc}")
+        await asyncio.sleep(max(1.0, settings.OLLAMA_HEALTH_INTERVAL_SECONDS))
+
+
+def backend_stats() -> List[Dict[str, Any]]:
+    """Per-host health, load and latency of this process."""
+    return get_pool().stats()
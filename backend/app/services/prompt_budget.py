@@ -0,0 +1,167 @@
+"""Compaction and token budgeting of transcripts sent to the LLM.
+
+Prompt tokens dominate LLM latency on CPU, so transcripts are compacted before
+prompting: one line of plain text per segment (no SRT indices or timestamps),
+filler words dropped and stuttered repeats collapsed.  A transcript that is
+still over ``LLM_PROMPT_TOKEN_BUDGET`` is sampled: evenly spaced excerpts
+across the whole episode rather than just its beginning.
+
+Ollama truncates prompts longer than the model context, so long transcripts
+are also split into chunks that each fit a token budget (map-reduce, see
+``services/llm.py``).  Chunks end on segment boundaries: SRT cues, lines or
+paragraphs, never mid-sentence unless a single segment is larger than the
+budget.
+
+Token counts are estimates (about four characters per token for English with
+the tokenizers of the models we run); they only need to be conservative.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+
+from sqlalchemy.orm import Session
+
+from app.models.job import ProcessingJob
+from app.models.transcript import Transcript
+from app.services.segment_store import iter_segments
+from app.utils.storage import DATA_ROOT
+
+CHARS_PER_TOKEN = 4
+
+_BLOCK_SEPARATOR = re.compile(r"\n\s*\n")
+_SRT_INDEX = re.compile(r"^\d+$")
+_SRT_TIMING = re.compile(r"^\d{1,2}:\d{2}:\d{2}[,.]\d{3}\s*-->")
+_FILLERS = re.compile(r"\b(?:u+m+|u+h+m*|e+r+m+|h+m+|m+h+m+|mm-hmm)\b[,.]?[ \t]*", re.IGNORECASE)
+_REPEATS = re.compile(r"\b(\w+)(?:,?[ \t]+\1\b)+", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t]{2,}")
+SAMPLE_MARKER = "[...]"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def srt_to_text(transcript: str) -> str:
+    """Drop SRT cue numbers and timing lines, keeping one line of text per cue."""
+    lines = [line.strip() for line in transcript.splitlines()]
+    if not any(_SRT_TIMING.match(line) for line in lines):
+        return transcript
+    return "\n".join(line for line in lines if line and not _SRT_INDEX.match(line) and not _SRT_TIMING.match(line))
+
+
+def collapse_fillers(text: str) -> str:
+    """Remove filler words ("um", "uh", ...) and collapse repeated words ("the the")."""
+    text = _FILLERS.sub("", text)
+    text = _REPEATS.sub(r"\1", text)
+    return "\n".join(_SPACES.sub(" ", line).strip() for line in text.splitlines() if line.strip())
+
+
+def compact_transcript(transcript: str) -> str:
+    return collapse_fillers(srt_to_text(transcript))
+
+
+def sample_to_budget(text: str, max_tokens: int, windows: int = 8) -> str:
+    """Fit ``text`` into ``max_tokens`` by keeping ``windows`` evenly spaced excerpts.
+
+    The segments are divided into ``windows`` consecutive groups and each
+    contributes its leading segments up to an equal share of the budget, so
+    the beginning, middle and end of the episode are all represented.
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+    segments = split_segments(text)
+    windows = max(1, min(windows, len(segments)))
+    share = max_tokens // windows - estimate_tokens(SAMPLE_MARKER) - 1
+    excerpts: list[str] = []
+    for w in range(windows):
+        group = segments[w * len(segments) // windows:(w + 1) * len(segments) // windows]
+        taken: list[str] = []
+        size = 0
+        for segment in group:
+            cost = estimate_tokens(segment) + 1
+            if size + cost > share:
+                if not taken:  # segment larger than the share: keep its start
+                    taken.append(segment[: max(share, 0) * CHARS_PER_TOKEN])
+                break
+            taken.append(segment)
+            size += cost
+        excerpts.append("\n".join(taken))
+    return f"\n{SAMPLE_MARKER}\n".join(excerpts)
+
+
+def job_transcript_text(db: Session, job: ProcessingJob) -> str:
+    """Plain text of a transcription job for prompting, one line per segment.
+
+    Prefers the stored segments, then ``Transcript.text_content``, then the
+    job's SRT file (stripped of cue numbers and timings).
+
+    Raises:
+        FileNotFoundError: If nothing is stored and the SRT file is missing.
+    """
+    transcript = (
+        db.query(Transcript)
+        .filter(Transcript.processing_job_id == job.id)
+        .order_by(Transcript.id.desc())
+        .first()
+    )
+    if transcript is not None:
+        lines = [segment.text.strip() for segment in iter_segments(db, transcript.id)]
+        if any(lines):
+            return "\n".join(line for line in lines if line)
+        if transcript.text_content and transcript.text_content.strip():
+            return transcript.text_content
+    path = DATA_ROOT / (job.output_file_path or "")
+    if not job.output_file_path or not path.exists():
+        raise FileNotFoundError(f"Transcript file not found for job {job.id}")
+    return srt_to_text(path.read_text(encoding="utf-8"))
+
+
+def split_segments(transcript: str) -> list[str]:
+    """Split a transcript into segments: blank-line separated blocks, else lines, else sentences."""
+    blocks = [b.strip() for b in _BLOCK_SEPARATOR.split(transcript) if b.strip()]
+    if len(blocks) <= 1:
+        blocks = [line.strip() for line in transcript.splitlines() if line.strip()]
+    if len(blocks) <= 1:
+        blocks = [s.strip() for s in re.split(r"(?<=[.!?])\s+", transcript) if s.strip()]
+    return blocks
+
+
+def _split_words(segment: str, max_tokens: int) -> list[str]:
+    """Split one oversized segment at word boundaries."""
+    pieces: list[str] = []
+    current: list[str] = []
+    size = 0
+    for word in segment.split():
+        cost = estimate_tokens(word + " ")
+        if current and size + cost > max_tokens:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += cost
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_transcript(transcript: str, max_tokens: int) -> list[str]:
+    """Pack consecutive segments into chunks of at most ``max_tokens`` (estimated)."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for segment in split_segments(transcript):
+        if estimate_tokens(segment) + 1 > max_tokens:
+            pieces = _split_words(segment, max_tokens - 1)
+        else:
+            pieces = [segment]
+        for piece in pieces:
+            cost = estimate_tokens(piece) + 1  # + separator
+            if current and size + cost > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += cost
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
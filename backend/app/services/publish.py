@@ -10,6 +10,7 @@ from backend.app.config import settings # N8N_WEBHOOK_URL and N8N_API_KEY
 from backend.app.models.job import ProcessingJob, JobStatus # For type hinting
 from backend.app.models.llm import LLMSuggestion # For fetching suggestions
 from backend.app.utils.storage import DATA_ROOT # To construct full paths if needed
+from .http_clients import get_client
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
@@ -114,39 +115,41 @@ async def trigger_n8n_workflow(job: ProcessingJob, db: Session) -> Dict[str, Any
         headers["X-N8N-API-KEY"] = settings.N8N_API_KEY 
         logger.debug(f"Job {job.id}: Using API key for n8n request.")
 
-    async with httpx.AsyncClient(timeout=60.0) as client: # Increased timeout
-        try:
-            logger.info(f"Job {job.id}: Sending POST request to n8n webhook: {settings.N8N_WEBHOOK_URL}")
-            response = await client.post(settings.N8N_WEBHOOK_URL, json=payload, headers=headers)
-            response.raise_for_status() # Raises HTTPStatusError for 4xx/5xx responses
-            
-            n8n_response_data = response.json()
-            logger.info(f"n8n workflow triggered successfully for job_id: {job.id}. n8n response: {n8n_response_data}")
-            return {
-                "success": True,
-                "message": "n8n workflow triggered successfully.",
-                "n8n_response": n8n_response_data
-            }
-        except httpx.HTTPStatusError as e:
-            error_body = e.response.text if e.response else "No response body."
-            logger.error(f"HTTP error {e.response.status_code} from n8n for job_id {job.id}: {error_body}", exc_info=True)
-            # Return a structured error instead of re-raising directly, to be handled by API layer
-            return {
-                "success": False,
-                "message": f"HTTP error from n8n: {e.response.status_code}",
-                "details": error_body
-            }
-        except httpx.RequestError as e:
-            logger.error(f"Request error for n8n (URL: {e.request.url}) for job_id {job.id}: {e}", exc_info=True)
-            return {
-                "success": False,
-                "message": "Request to n8n failed.",
-                "details": str(e)
-            }
-        except Exception as e:
-            logger.error(f"An unexpected error occurred in trigger_n8n_workflow for job_id {job.id}: {e}", exc_info=True)
-            return {
-                "success": False,
-                "message": "An unexpected error occurred while triggering n8n workflow.",
-                "details": str(e)
-            }
+    # Pooled keep-alive client (see services/http_clients.py); its timeout is
+    # N8N_TIMEOUT_SECONDS.
+    client = get_client("n8n")
+    try:
+        logger.info(f"Job {job.id}: Sending POST request to n8n webhook: {settings.N8N_WEBHOOK_URL}")
+        response = await client.post(settings.N8N_WEBHOOK_URL, json=payload, headers=headers)
+        response.raise_for_status() # Raises HTTPStatusError for 4xx/5xx responses
+        
+        n8n_response_data = response.json()
+        logger.info(f"n8n workflow triggered successfully for job_id: {job.id}. n8n response: {n8n_response_data}")
+        return {
+            "success": True,
+            "message": "n8n workflow triggered successfully.",
+            "n8n_response": n8n_response_data
+        }
+    except httpx.HTTPStatusError as e:
+        error_body = e.response.text if e.response else "No response body."
+        logger.error(f"HTTP error {e.response.status_code} from n8n for job_id {job.id}: {error_body}", exc_info=True)
+        # Return a structured error instead of re-raising directly, to be handled by API layer
+        return {
+            "success": False,
+            "message": f"HTTP error from n8n: {e.response.status_code}",
+            "details": error_body
+        }
+    except httpx.RequestError as e:
+        logger.error(f"Request error for n8n (URL: {e.request.url}) for job_id {job.id}: {e}", exc_info=True)
+        return {
+            "success": False,
+            "message": "Request to n8n failed.",
+            "details": str(e)
+        }
+    except Exception as e:
+        logger.error(f"An unexpected error occurred in trigger_n8n_workflow for job_id {job.id}: {e}", exc_info=True)
+        return {
+            "success": False,
+            "message": "An unexpected error occurred while triggering n8n workflow.",
+            "details": str(e)
+        }
@@ -0,0 +1,222 @@
+"""Incremental persistence of transcript segments.
+
+While a job runs every segment is appended to ``<basename>.segments.jsonl``
+(one JSON object per line, flushed as it is written) and buffered for the
+``transcript_segments`` table, which is committed every
+``TRANSCRIPT_SEGMENT_COMMIT_EVERY`` segments or
+``TRANSCRIPT_SEGMENT_COMMIT_SECONDS`` seconds.  The last committed segment is
+the resume point for a job that is restarted after its worker died.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.transcript_segment import TranscriptSegment
+from app.services.transcription import Segment
+from app.utils.storage import ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+
+def segment_log_path(output_basename: str, transcript_dir: Path) -> Path:
+    """Location of a job's append-only segment log."""
+    return transcript_dir / f"{output_basename}.segments.jsonl"
+
+
+def read_segment_log(path: Path) -> list[Segment]:
+    """Read a segment log, ignoring a torn last line and anything before a later
+    entry's start (the part of the log a resumed run transcribed again)."""
+    segments: list[Segment] = []
+    if not path.exists():
+        return segments
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                segment = Segment.from_dict(json.loads(line))
+            except (json.JSONDecodeError, KeyError):
+                continue
+            while segments and segments[-1].start >= segment.start:
+                segments.pop()
+            segments.append(segment)
+    return segments
+
+
+def committed_segments(db: Session, job_id: int, after: float = 0.0) -> list[Segment]:
+    """Return the job's committed segments starting at or after ``after`` seconds."""
+    rows = (
+        db.query(TranscriptSegment)
+        .filter(TranscriptSegment.processing_job_id == job_id, TranscriptSegment.start >= after)
+        .order_by(TranscriptSegment.start)
+        .all()
+    )
+    return [Segment(start=r.start, end=r.end, text=r.text) for r in rows]
+
+
+def resume_point(db: Session, job_id: int) -> float:
+    """Return the end of the job's last committed segment (0.0 if none)."""
+    last = (
+        db.query(TranscriptSegment)
+        .filter(TranscriptSegment.processing_job_id == job_id)
+        .order_by(TranscriptSegment.start.desc())
+        .first()
+    )
+    return last.end if last else 0.0
+
+
+def store_chunk_segments(db: Session, job_id: int, segments: list[Segment], keep_start: float, keep_end: float) -> None:
+    """Commit one chunk's segments, replacing any from an earlier attempt at the chunk."""
+    db.query(TranscriptSegment).filter(
+        TranscriptSegment.processing_job_id == job_id,
+        TranscriptSegment.start >= keep_start,
+        TranscriptSegment.start < keep_end,
+    ).delete()
+    db.add_all(
+        TranscriptSegment(processing_job_id=job_id, start=s.start, end=s.end, text=s.text) for s in segments
+    )
+    db.commit()
+
+
+def replace_segments(db: Session, job_id: int, segments: list[Segment]) -> None:
+    """Replace the job's segments (used once chunked transcripts are stitched)."""
+    db.query(TranscriptSegment).filter(TranscriptSegment.processing_job_id == job_id).delete()
+    db.add_all(
+        TranscriptSegment(processing_job_id=job_id, start=s.start, end=s.end, text=s.text) for s in segments
+    )
+
+
+def attach_segments(db: Session, job_id: int, transcript_id: int) -> None:
+    """Link the job's segments to the transcript stored for it."""
+    db.query(TranscriptSegment).filter(TranscriptSegment.processing_job_id == job_id).update(
+        {TranscriptSegment.transcript_id: transcript_id}, synchronize_session=False
+    )
+
+
+# Whisper never emits a segment longer than its 30 s window; bounding the
+# range scan by it keeps time-range reads on the (transcript_id, start) index.
+MAX_SEGMENT_SECONDS = 30.0
+
+
+def segments_in_range(db: Session, transcript_id: int, start: float | None = None, end: float | None = None):
+    """Query for a transcript's segments overlapping ``[start, end)``, ordered by time."""
+    query = db.query(TranscriptSegment).filter(TranscriptSegment.transcript_id == transcript_id)
+    if start is not None:
+        query = query.filter(
+            TranscriptSegment.start >= start - MAX_SEGMENT_SECONDS, TranscriptSegment.end > start
+        )
+    if end is not None:
+        query = query.filter(TranscriptSegment.start < end)
+    return query.order_by(TranscriptSegment.start, TranscriptSegment.id)
+
+
+def encode_cursor(row: TranscriptSegment) -> str:
+    return f"{row.start!r}:{row.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Parse a cursor from :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    start, _, row_id = cursor.partition(":")
+    return float(start), int(row_id)
+
+
+def page_segments(
+    db: Session,
+    transcript_id: int,
+    start: float | None = None,
+    end: float | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[TranscriptSegment], str | None]:
+    """Return one page of segments and the cursor of the next page (``None`` at the end)."""
+    query = segments_in_range(db, transcript_id, start, end)
+    if cursor:
+        after_start, after_id = decode_cursor(cursor)
+        query = query.filter(
+            (TranscriptSegment.start > after_start)
+            | ((TranscriptSegment.start == after_start) & (TranscriptSegment.id > after_id))
+        )
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def iter_segments(db: Session, transcript_id: int, start: float | None = None, end: float | None = None, batch: int = 500):
+    """Yield a transcript's segments in time order, fetching ``batch`` rows at a time."""
+    for row in segments_in_range(db, transcript_id, start, end).yield_per(batch):
+        yield Segment(start=row.start, end=row.end, text=row.text)
+
+
+class SegmentWriter:
+    """Stream segments of one job to the segment log and, in batches, to the DB.
+
+    Use as a context manager; leaving the block commits what is still buffered,
+    even when transcription failed, so the work done so far is kept.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        job_id: int,
+        log_path: Path | None,
+        commit_every: int | None = None,
+        commit_seconds: float | None = None,
+    ):
+        self.db = db
+        self.job_id = job_id
+        self.log_path = log_path
+        self.commit_every = commit_every or settings.TRANSCRIPT_SEGMENT_COMMIT_EVERY
+        self.commit_seconds = commit_seconds if commit_seconds is not None else settings.TRANSCRIPT_SEGMENT_COMMIT_SECONDS
+        self.committed = 0
+        self._pending: list[TranscriptSegment] = []
+        self._last_commit = time.monotonic()
+        self._log = None
+
+    def __enter__(self) -> "SegmentWriter":
+        if self.log_path is not None:
+            ensure_dir_exists(self.log_path.parent)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.flush()
+        except Exception as flush_exc:  # don't mask the original error
+            logger.error("Could not persist buffered segments for job %s: %s", self.job_id, flush_exc)
+            if exc is None:
+                raise
+        finally:
+            if self._log is not None:
+                self._log.close()
+
+    def append(self, segment: Segment) -> None:
+        if self._log is not None:
+            self._log.write(json.dumps(segment.to_dict()) + "\n")
+            self._log.flush()
+        self._pending.append(
+            TranscriptSegment(processing_job_id=self.job_id, start=segment.start, end=segment.end, text=segment.text)
+        )
+        if len(self._pending) >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Make the log durable and commit buffered segments."""
+        if self._log is not None:
+            os.fsync(self._log.fileno())
+        if self._pending:
+            self.db.add_all(self._pending)
+            self.db.commit()
+            self.committed += len(self._pending)
+            logger.debug("Committed %d segments for job %s (up to %.1fs)", len(self._pending), self.job_id, self._pending[-1].end)
+            self._pending = []
+        self._last_commit = time.monotonic()
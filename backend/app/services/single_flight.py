@@ -0,0 +1,169 @@
+"""Single-flight coalescing of identical LLM requests.
+
+A generation on a CPU-only Ollama host takes minutes, so identical requests
+that arrive while one is running (several producers opening the same
+episode, frontend retries) wait for that generation instead of starting
+their own:
+
+* within a process, the first caller (the leader) registers a
+  ``concurrent.futures.Future`` under the request key and the others await
+  it.  The future is thread-safe, so callers on other event loops (Celery
+  worker threads, see ``http_clients.run_in_worker_loop``) can join too;
+* across processes, the leader holds the Redis lock ``llm:inflight:<key>``
+  and publishes a successful result under ``llm:result:<key>`` before
+  releasing it.  Other processes poll for the result while the lock is held;
+  if the lock disappears without a result (the leader failed) the next one
+  takes over.
+
+Redis is best effort: if it is unavailable every process generates on its
+own, as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "llm:inflight:"
+RESULT_PREFIX = "llm:result:"
+# Followers poll this often; results stay long enough for every poller to see them.
+POLL_SECONDS = 0.5
+RESULT_TTL_SECONDS = 60
+
+_calls: dict[str, concurrent.futures.Future] = {}
+_lock = threading.Lock()
+_counters: Counter = Counter()
+
+
+async def coalesce(
+    key: str,
+    produce: Callable[[], Awaitable[Any]],
+    shareable: Callable[[Any], bool] = lambda value: True,
+) -> Tuple[Any, bool]:
+    """Run ``produce()`` once for concurrent callers with the same ``key``.
+
+    Returns ``(value, joined)`` where ``joined`` is true if the value was
+    produced by another caller.  Values are shared, not copied, and must be
+    JSON-serialisable to be shared across processes; only values accepted by
+    ``shareable`` are published there.  An exception raised by the leader is
+    raised in the in-process followers as well.  Followers wait at most
+    ``LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS`` and then produce the value themselves.
+    """
+    with _lock:
+        future = _calls.get(key)
+        leader = future is None
+        if leader:
+            future = _calls[key] = concurrent.futures.Future()
+    if not leader:
+        logger.info(f"Joining in-flight LLM request {key[:24]}")
+        try:
+            # Shielded: a follower giving up must not cancel the leader's future.
+            value = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), settings.LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Gave up waiting for in-flight LLM request {key[:24]}; generating it here")
+            _counters["leaders"] += 1
+            return await produce(), False
+        _counters["joined_local"] += 1
+        return value, True
+
+    try:
+        value, joined = await _across_processes(key, produce, shareable)
+    except BaseException as exc:
+        if not isinstance(exc, Exception):  # cancellation of the leader only
+            exc = RuntimeError("The coalesced LLM request was cancelled")
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value, joined
+    finally:
+        with _lock:
+            _calls.pop(key, None)
+
+
+async def _across_processes(key: str, produce, shareable) -> Tuple[Any, bool]:
+    client = get_redis()
+    if client is None:
+        _counters["leaders"] += 1
+        return await produce(), False
+
+    def call(method: str, *args, **kwargs):
+        # The Redis client blocks; keep it off the event loop.
+        return asyncio.to_thread(getattr(client, method), *args, **kwargs)
+
+    lock_key, result_key = LOCK_PREFIX + key, RESULT_PREFIX + key
+    token = uuid.uuid4().hex
+    timeout = settings.LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS
+    deadline = time.monotonic() + timeout
+    acquired = waited = False
+    try:
+        while True:
+            acquired = bool(await call("set", lock_key, token, nx=True, ex=max(1, int(timeout))))
+            # A leader publishes its result before releasing the lock, so a
+            # waiter that just got the lock still looks for the result.
+            raw = await call("get", result_key) if waited or not acquired else None
+            if raw:
+                if acquired:
+                    await _release(call, lock_key, token)
+                _counters["joined_remote"] += 1
+                logger.info(f"Received result of LLM request {key[:24]} from another worker")
+                return json.loads(raw), True
+            if acquired:
+                break
+            if time.monotonic() > deadline:
+                logger.warning(f"Gave up waiting for in-flight LLM request {key[:24]}; generating it here")
+                break
+            waited = True
+            await asyncio.sleep(POLL_SECONDS)
+    except Exception as exc:
+        logger.warning(f"Redis unavailable for LLM request coalescing: {exc}")
+        acquired = False
+
+    _counters["leaders"] += 1
+    try:
+        value = await produce()
+        if acquired and shareable(value):
+            try:
+                await call("set", result_key, json.dumps(value), ex=RESULT_TTL_SECONDS)
+            except Exception as exc:
+                logger.warning(f"Could not publish LLM result {key[:24]}: {exc}")
+        return value, False
+    finally:
+        if acquired:
+            await _release(call, lock_key, token)
+
+
+async def _release(call, lock_key: str, token: str) -> None:
+    """Delete ``lock_key`` if it still holds ``token`` (it may have expired and been re-taken)."""
+    try:
+        held = await call("get", lock_key)
+        if held is not None and (held.decode() if isinstance(held, bytes) else held) == token:
+            await call("delete", lock_key)
+    except Exception as exc:
+        logger.warning(f"Could not release LLM request lock {lock_key}: {exc}")
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Coalescing counters of this process."""
+    with _lock:
+        in_flight = len(_calls)
+    return {
+        "in_flight": in_flight,
+        "leaders": _counters["leaders"],
+        "joined_local": _counters["joined_local"],
+        "joined_remote": _counters["joined_remote"],
+    }
@@ -0,0 +1,173 @@
+"""Two-level cache of LLM suggestions.
+
+A suggestion is determined by the model, the prompt type, the prompt template
+and the transcript, so those form the key (the template and transcript as
+hashes).  Lookups go to an in-process LRU first and then to the
+``llm_suggestions`` table, whose rows carry the same key columns; a database
+hit is promoted to the LRU.  Only complete, successful results are cached.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, NamedTuple, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.llm import LLMSuggestion
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestionKey(NamedTuple):
+    model: str
+    prompt_type: str
+    prompt_version: str
+    transcript_hash: str
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def prompt_version(template: str) -> str:
+    """Version of a prompt template: editing the template invalidates its cache entries."""
+    return text_hash(template)[:12]
+
+
+class SuggestionLRU:
+    """Thread-safe LRU of suggestion dicts (entries are copied in and out).
+
+    Each entry also remembers the ID of the LLMSuggestion row holding it, once
+    there is one, so a hit can be answered with that row instead of a copy.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[SuggestionKey, Tuple[Dict[str, Any], int | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: SuggestionKey) -> Dict[str, Any] | None:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: SuggestionKey) -> Tuple[Dict[str, Any], int | None] | None:
+        """The suggestions for ``key`` and the ID of their stored row (None if not stored yet)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry[0]), entry[1]
+
+    def put(self, key: SuggestionKey, value: Dict[str, Any], suggestion_id: int | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), suggestion_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_suggestion_id(self, key: SuggestionKey, suggestion_id: int) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], suggestion_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+memory_cache = SuggestionLRU(settings.LLM_CACHE_SIZE)
+_counters: Counter = Counter()
+
+
+def find_stored_suggestion(db: Session, key: SuggestionKey) -> LLMSuggestion | None:
+    """Return the most recent stored suggestion for ``key``, if any."""
+    return (
+        db.query(LLMSuggestion)
+        .filter(
+            LLMSuggestion.transcript_hash == key.transcript_hash,
+            LLMSuggestion.prompt_type == key.prompt_type,
+            LLMSuggestion.model_used == key.model,
+            LLMSuggestion.prompt_version == key.prompt_version,
+        )
+        .order_by(LLMSuggestion.id.desc())
+        .first()
+    )
+
+
+def _payload(row: LLMSuggestion) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {}
+    if row.prompt_type != "summary_only":
+        payload["titles"] = row.get_titles()
+    if row.prompt_type != "title_only":
+        payload["summary"] = row.suggested_summary
+    return payload
+
+
+def lookup(
+    key: SuggestionKey, db: Session | None = None, record: bool = True, usage: Dict[str, Any] | None = None
+) -> Dict[str, Any] | None:
+    """Return cached suggestions for ``key`` from memory or, given ``db``, the database.
+
+    ``record=False`` leaves the hit counters alone (a peek before the real lookup).
+    On a hit ``usage["suggestion_id"]`` receives the ID of the stored row, if known.
+    """
+    counters = _counters if record else Counter()
+    entry = memory_cache.get_entry(key)
+    if entry is not None:
+        counters["memory_hits"] += 1
+        cached, suggestion_id = entry
+        if usage is not None and suggestion_id is not None:
+            usage["suggestion_id"] = suggestion_id
+        return cached
+    if db is not None:
+        row = find_stored_suggestion(db, key)
+        if row is not None:
+            counters["database_hits"] += 1
+            cached = _payload(row)
+            memory_cache.put(key, cached, row.id)
+            if usage is not None:
+                usage["suggestion_id"] = row.id
+            return cached
+    counters["misses"] += 1
+    return None
+
+
+def remember(key: SuggestionKey, suggestions: Dict[str, Any]) -> None:
+    memory_cache.put(key, suggestions)
+
+
+def record_stored(key: SuggestionKey, suggestion_id: int) -> None:
+    """Note the row that now holds the cached suggestions for ``key``."""
+    memory_cache.set_suggestion_id(key, suggestion_id)
+
+
+def record_forced() -> None:
+    _counters["forced"] += 1
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit counts of this process (the database level is shared by all processes)."""
+    hits = _counters["memory_hits"] + _counters["database_hits"]
+    lookups = hits + _counters["misses"]
+    return {
+        "entries": len(memory_cache),
+        "max_entries": memory_cache.max_entries,
+        "memory_hits": _counters["memory_hits"],
+        "database_hits": _counters["database_hits"],
+        "misses": _counters["misses"],
+        "forced": _counters["forced"],
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+    }
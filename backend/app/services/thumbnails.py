@@ -0,0 +1,110 @@
+"""Poster frame and waveform thumbnails for library items.
+
+Thumbnails are small images cached under ``THUMBNAIL_DIR`` so the library can
+show artwork for a video without the browser downloading the MP4.  They are
+produced right after a render and, for older jobs, lazily on first request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+import ffmpeg
+
+from app.config import settings
+from app.utils.storage import THUMBNAIL_DIR, ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_KINDS = ("poster", "waveform")
+
+
+def thumbnail_path(job_id: int, kind: str) -> Path:
+    """Return the cache location of a job's thumbnail of the given ``kind``."""
+    if kind == "poster":
+        return THUMBNAIL_DIR / f"{job_id}_poster.jpg"
+    if kind == "waveform":
+        return THUMBNAIL_DIR / f"{job_id}_waveform.png"
+    raise ValueError(f"Unknown thumbnail kind '{kind}'. Available kinds: {THUMBNAIL_KINDS}")
+
+
+def _run_to(stream_factory, output_path: Path) -> Path:
+    """Run an FFmpeg graph into a temp file and atomically move it in place."""
+    ensure_dir_exists(output_path.parent)
+    tmp_path = output_path.with_name(f".{output_path.stem}.{os.getpid()}.tmp{output_path.suffix}")
+    try:
+        ffmpeg.run(
+            stream_factory(str(tmp_path)),
+            cmd=getattr(settings, "FFMPEG_PATH", "ffmpeg"),
+            overwrite_output=True,
+            capture_stdout=True,
+            capture_stderr=True,
+        )
+        os.replace(tmp_path, output_path)
+    except ffmpeg.Error as exc:
+        stderr = exc.stderr.decode("utf8") if exc.stderr else str(exc)
+        logger.error("FFmpeg error generating thumbnail %s: %s", output_path, stderr)
+        raise
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return output_path
+
+
+def generate_poster(video_path: Path, output_path: Path) -> Path:
+    """Extract a representative, downscaled frame from ``video_path``."""
+    if not video_path.exists():
+        raise FileNotFoundError(f"Video not found: {video_path}")
+    return _run_to(
+        lambda out: (
+            ffmpeg.input(str(video_path))
+            .filter("thumbnail")
+            .filter("scale", settings.THUMBNAIL_WIDTH, -2)
+            .output(out, vframes=1)
+        ),
+        output_path,
+    )
+
+
+def generate_waveform_image(audio_path: Path, output_path: Path) -> Path:
+    """Draw a small static waveform of the whole of ``audio_path``."""
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio not found: {audio_path}")
+    return _run_to(
+        lambda out: (
+            ffmpeg.input(str(audio_path))
+            .filter("showwavespic", s=settings.THUMBNAIL_WAVEFORM_SIZE, colors="white")
+            .output(out, vframes=1)
+        ),
+        output_path,
+    )
+
+
+def ensure_thumbnail(job_id: int, kind: str, video_path: Path, audio_path: Path | None) -> Path:
+    """Return the cached thumbnail, generating it first if it does not exist.
+
+    Raises:
+        FileNotFoundError: If the media needed to generate the thumbnail is missing.
+        ffmpeg.Error: If generation fails.
+    """
+    target = thumbnail_path(job_id, kind)
+    if target.exists():
+        return target
+    if kind == "poster":
+        return generate_poster(video_path, target)
+    if audio_path is None:
+        raise FileNotFoundError(f"No source audio recorded for job {job_id}")
+    return generate_waveform_image(audio_path, target)
+
+
+def ensure_thumbnails(job_id: int, video_path: Path, audio_path: Path | None) -> dict[str, Path]:
+    """Generate every missing thumbnail for a video job, logging (not raising) failures."""
+    generated: dict[str, Path] = {}
+    for kind in THUMBNAIL_KINDS:
+        try:
+            generated[kind] = ensure_thumbnail(job_id, kind, video_path, audio_path)
+        except Exception as exc:  # thumbnails are a convenience, never fail the render
+            logger.warning("Could not generate %s thumbnail for job %s: %s", kind, job_id, exc)
+    return generated
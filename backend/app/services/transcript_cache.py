@@ -0,0 +1,94 @@
+"""Reuse of finished transcripts for identical audio and decoding settings.
+
+The cache key is a SHA-256 over the audio content hash and every option that
+changes the decoded text (model, compute type, language, engine, beam size,
+VAD parameters, word timestamps, chunking).  ``Transcript.cache_key`` stores
+it, so the cache is simply the transcripts table: a hit copies the earlier
+transcript to the new job instead of running Whisper again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.transcript import Transcript
+from app.services.transcription import vad_parameters
+
+logger = logging.getLogger(__name__)
+
+
+def cache_options(
+    model_size: str | None = None,
+    compute_type: str | None = None,
+    language: str | None = None,
+    engine: str | None = None,
+    beam_size: int | None = None,
+    vad: bool | None = None,
+    word_timestamps: bool | None = None,
+    chunked: bool = False,
+) -> dict:
+    """Resolve the decoding options that determine a transcript, filling in settings defaults.
+
+    ``batch_size`` is deliberately not part of the key: it changes throughput,
+    not the decoded text.
+    """
+    vad = settings.WHISPER_VAD_FILTER if vad is None else vad
+    options = {
+        "model_size": model_size or settings.WHISPER_MODEL_SIZE,
+        "compute_type": compute_type or settings.WHISPER_COMPUTE_TYPE,
+        "language": language or settings.WHISPER_LANGUAGE or None,
+        "engine": engine or settings.WHISPER_ENGINE,
+        "beam_size": beam_size or settings.WHISPER_BEAM_SIZE,
+        "vad": vad_parameters() if vad else None,
+        "word_timestamps": settings.WHISPER_WORD_TIMESTAMPS if word_timestamps is None else word_timestamps,
+        "chunked": None,
+    }
+    if chunked:
+        options["chunked"] = {
+            "seconds": settings.TRANSCRIPTION_CHUNK_SECONDS,
+            "overlap": settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+            "silence_db": settings.TRANSCRIPTION_SILENCE_DB,
+            "silence_min": settings.TRANSCRIPTION_SILENCE_MIN_SECONDS,
+        }
+    return options
+
+
+def transcription_cache_key(audio_hash: str, options: dict) -> str:
+    """Return the cache key for audio with content hash ``audio_hash`` decoded with ``options``."""
+    payload = json.dumps({"audio": audio_hash, **options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def find_cached_transcript(db: Session, key: str) -> Transcript | None:
+    """Return the most recent transcript stored under ``key``, if any."""
+    return (
+        db.query(Transcript)
+        .filter(Transcript.cache_key == key)
+        .order_by(Transcript.id.desc())
+        .first()
+    )
+
+
+def cache_stats(db: Session) -> dict:
+    """Hit rate of the transcript cache, counted from the transcripts table.
+
+    Every transcript made with a cache key is a lookup: copies are hits and
+    transcripts that were decoded are misses (including bypassed lookups).
+    """
+    lookups, hits = (
+        db.query(func.count(Transcript.id), func.count(Transcript.cached_from_id))
+        .filter(Transcript.cache_key.isnot(None))
+        .one()
+    )
+    return {
+        "lookups": lookups,
+        "hits": hits,
+        "misses": lookups - hits,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+    }
@@ -1,47 +1,34 @@
+from bisect import bisect_right
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 import logging
-import time # For SRT timestamp formatting
+import time # For processing time measurements
+from dataclasses import asdict, dataclass, field
+
+import ffmpeg
+
+from app.config import settings
+from app.services.model_registry import registry
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
 
 # --- Configuration for Whisper Model ---
-# These could be moved to a central config (e.g., backend.app.config.settings) if dynamic configuration is needed.
-MODEL_SIZE = "base.en"  # Examples: "base.en", "small.en", "medium.en", "large-v2"
-DEVICE_TYPE = "cpu"     # "cpu" or "cuda" (if GPU is available and CUDA-enabled PyTorch is installed)
-COMPUTE_TYPE = "int8"   # Examples: "int8", "float16" (for GPU), "float32" (CPU default if not specified)
-
-# --- Whisper Model Initialization ---
-# Initialize the model once when the module is loaded.
-# This is generally suitable for Celery workers where each worker process loads the model once.
-# For a FastAPI app with multiple Uvicorn workers, this might load the model in each worker process.
-# Consider lazy loading or a shared model instance if memory is a concern for many Uvicorn workers.
-_model_instance = None
-
-def get_whisper_model():
-    """Initializes and returns the Whisper model instance. Caches the instance."""
-    global _model_instance
-    if _model_instance is None:
-        try:
-            logger.info(
-                "Initializing Whisper model: Size='%s', Device='%s', Compute='%s'",
-                MODEL_SIZE,
-                DEVICE_TYPE,
-                COMPUTE_TYPE,
-            )
-            from faster_whisper import WhisperModel  # Lazy import to avoid heavy dependency unless needed
+# Defaults come from settings (WHISPER_MODEL_SIZE / WHISPER_DEVICE / WHISPER_COMPUTE_TYPE).
+MODEL_SIZE = settings.WHISPER_MODEL_SIZE  # Examples: "base.en", "small.en", "medium.en", "large-v2"
+DEVICE_TYPE = settings.WHISPER_DEVICE     # "cpu" or "cuda" (if GPU is available and CUDA-enabled PyTorch is installed)
+COMPUTE_TYPE = settings.WHISPER_COMPUTE_TYPE  # Examples: "int8", "float16" (for GPU), "float32"
 
-            _model_instance = WhisperModel(
-                MODEL_SIZE, device=DEVICE_TYPE, compute_type=COMPUTE_TYPE
-            )
-            logger.info("Whisper model initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize Whisper model (Size: {MODEL_SIZE}, Device: {DEVICE_TYPE}): {e}", exc_info=True)
-            # Depending on desired behavior, could raise an error here or let it be None,
-            # causing transcribe_audio to fail if the model isn't available.
-            # For now, let it be None, and transcribe_audio will handle it.
-            _model_instance = None # Explicitly set to None on failure
-    return _model_instance
+# --- Whisper Model Access ---
+# Models live in the process-wide registry (app.services.model_registry), which
+# preloads configured models at worker start and keeps them resident between jobs.
+def get_whisper_model(model_size: str | None = None, device: str | None = None, compute_type: str | None = None):
+    """Returns a resident Whisper model for the configuration, or None if it cannot be loaded."""
+    try:
+        return registry.get(model_size, device, compute_type)
+    except RuntimeError as e:
+        logger.error(f"Failed to initialize Whisper model (Size: {model_size or MODEL_SIZE}): {e}")
+        return None
 
 # --- SRT Timestamp Formatting ---
 def format_timestamp_srt(seconds: float) -> str:
@@ -60,26 +47,304 @@ def format_timestamp_srt(seconds: float) -> str:
 
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
 
-# --- Transcription Function ---
-def transcribe_audio(audio_input_path: Path) -> tuple[str, str, str | None]:
+# --- Segments and Rendering ---
+@dataclass
+class Segment:
+    """A transcribed span of audio, with times in seconds from the start of the file."""
+    start: float
+    end: float
+    text: str
+    # ``[start, end, word]`` triples when word timestamps were requested
+    words: list[list] | None = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        if self.words is None:
+            del data["words"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Segment":
+        return cls(start=data["start"], end=data["end"], text=data["text"], words=data.get("words"))
+
+    def shifted(self, offset: float) -> "Segment":
+        """Return a copy with every time moved by ``offset`` seconds."""
+        words = None if self.words is None else [[s + offset, e + offset, w] for s, e, w in self.words]
+        return Segment(start=self.start + offset, end=self.end + offset, text=self.text, words=words)
+
+
+def format_timestamp_vtt(seconds: float) -> str:
+    """Converts seconds to WebVTT time format (HH:MM:SS.mmm)"""
+    return format_timestamp_srt(seconds).replace(",", ".")
+
+
+def iter_text(segments: Iterable[Segment]) -> Iterator[str]:
+    """Yields the plain-text transcript piece by piece."""
+    for idx, segment in enumerate(segments):
+        yield segment.text if idx == 0 else f" {segment.text}"
+
+
+def iter_srt(segments: Iterable[Segment], first_index: int = 1) -> Iterator[str]:
+    """Yields SRT cues one at a time, numbered from ``first_index``."""
+    for idx, segment in enumerate(segments, start=first_index):
+        separator = "" if idx == first_index else "\n" # Blank line separator for SRT entries
+        yield f"{separator}{idx}\n{format_timestamp_srt(segment.start)} --> {format_timestamp_srt(segment.end)}\n{segment.text}\n"
+
+
+def iter_vtt(segments: Iterable[Segment]) -> Iterator[str]:
+    """Yields a WebVTT document: the header, then one cue at a time."""
+    yield "WEBVTT\n"
+    for segment in segments:
+        yield f"\n{format_timestamp_vtt(segment.start)} --> {format_timestamp_vtt(segment.end)}\n{segment.text}\n"
+
+
+def render_text(segments: list[Segment]) -> str:
+    """Joins segment texts into a plain-text transcript."""
+    return "".join(iter_text(segments))
+
+
+def render_srt(segments: list[Segment]) -> str:
+    """Renders segments as SRT cues numbered from 1."""
+    return "".join(iter_srt(segments))
+
+@dataclass
+class TranscriptionResult:
+    """Segments plus the settings and timing of the run that produced them."""
+    segments: list[Segment]
+    language: str | None
+    duration: float            # seconds of audio
+    engine: str                # "batched" or "sequential"
+    beam_size: int
+    batch_size: int | None
+    processing_seconds: float
+    vad: bool = False
+    speech: list[tuple[float, float]] = field(default_factory=list)  # speech spans in seconds
+    start_at: float = 0.0      # seconds skipped because a previous run transcribed them
+    language_source: str | None = None  # "requested" or "detected"
+    language_detection_seconds: float = 0.0
+
+    @property
+    def realtime_factor(self) -> float | None:
+        """Processing time per second of decoded audio (lower is faster)."""
+        decoded = self.duration - self.start_at
+        return self.processing_seconds / decoded if decoded > 0 else None
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.speech)
+
+    def metrics(self) -> dict:
+        return {
+            "engine": self.engine,
+            "beam_size": self.beam_size,
+            "batch_size": self.batch_size,
+            "audio_seconds": round(self.duration, 3),
+            "processing_seconds": round(self.processing_seconds, 3),
+            "realtime_factor": round(self.realtime_factor, 4) if self.realtime_factor is not None else None,
+            "vad": self.vad,
+            "speech_seconds": round(self.speech_seconds, 3),
+            "skipped_seconds": round(max(0.0, self.duration - self.speech_seconds), 3),
+            "resumed_from": round(self.start_at, 3),
+            "language": self.language,
+            "language_source": self.language_source,
+            "language_detection_seconds": round(self.language_detection_seconds, 3),
+        }
+
+
+# --- Transcription Functions ---
+ENGINES = ("batched", "sequential")
+SAMPLE_RATE = 16000  # faster-whisper decodes everything to 16 kHz mono
+BATCH_WINDOW_SECONDS = 30  # Whisper's context window
+
+
+def probe_duration(audio_path: Path) -> float:
+    """Return the duration of ``audio_path`` in seconds."""
+    info = ffmpeg.probe(str(audio_path), cmd=getattr(settings, "FFPROBE_PATH", "ffprobe"))
+    return float(info["format"]["duration"])
+
+
+def validate_engine(requested: str | None) -> str:
+    """Return the requested engine, or WHISPER_ENGINE if none was requested.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    engine = requested or settings.WHISPER_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+    return engine
+
+
+def choose_engine(requested: str | None, duration: float) -> str:
+    """Resolve the engine for a clip: batching only pays off for longer audio,
+    so short clips fall back to sequential decoding."""
+    engine = validate_engine(requested)
+    if engine == "batched" and duration < settings.WHISPER_BATCHED_MIN_SECONDS:
+        logger.info(f"Audio is {duration:.1f}s long; using sequential engine")
+        return "sequential"
+    return engine
+
+
+def vad_parameters() -> dict:
+    """Silero VAD options from settings, in faster-whisper's ``vad_parameters`` form."""
+    return {
+        "threshold": settings.WHISPER_VAD_THRESHOLD,
+        "min_speech_duration_ms": settings.WHISPER_VAD_MIN_SPEECH_MS,
+        "min_silence_duration_ms": settings.WHISPER_VAD_MIN_SILENCE_MS,
+        "speech_pad_ms": settings.WHISPER_VAD_SPEECH_PAD_MS,
+    }
+
+
+def load_audio(audio_input_path: Path):
+    """Decode a file to the 16 kHz mono float32 array Whisper consumes."""
+    from faster_whisper.audio import decode_audio  # Lazy import, as for the model itself
+
+    return decode_audio(str(audio_input_path), sampling_rate=SAMPLE_RATE)
+
+
+def detect_speech(audio, parameters: dict) -> list[tuple[float, float]]:
+    """Return the speech spans (seconds) the VAD finds in ``audio``."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    spans = get_speech_timestamps(audio, VadOptions(**parameters))
+    return [(span["start"] / SAMPLE_RATE, span["end"] / SAMPLE_RATE) for span in spans]
+
+
+# CTranslate2 compute types a job may request.
+COMPUTE_TYPES = ("int8", "int8_float16", "int8_float32", "int8_bfloat16", "int16", "float16", "bfloat16", "float32")
+
+
+def validate_model(model_size: str | None, compute_type: str | None) -> None:
+    """Check a requested model size / compute type (``None`` means the default).
+
+    Raises:
+        ValueError: If the model is not in WHISPER_ALLOWED_MODELS or the compute
+            type is unknown.
+    """
+    if model_size is not None and model_size not in settings.whisper_allowed_models:
+        raise ValueError(
+            f"Unknown model '{model_size}'. Available models: {', '.join(settings.whisper_allowed_models)}"
+        )
+    if compute_type is not None and compute_type not in COMPUTE_TYPES:
+        raise ValueError(f"Unknown compute type '{compute_type}'. Available types: {', '.join(COMPUTE_TYPES)}")
+
+
+def speech_windows(
+    speech: list[tuple[float, float]], start_at: float = 0.0, max_seconds: float | None = None
+) -> list[tuple[float, float]]:
+    """Return the speech spans after ``start_at``, in seconds relative to ``start_at``.
+
+    With ``max_seconds`` neighbouring spans are packed into windows of at most
+    that length (longer spans are split), one per batched decoding item.
+    """
+    spans = [(max(start, start_at) - start_at, end - start_at) for start, end in speech if end > start_at]
+    if max_seconds is None:
+        return spans
+    windows: list[tuple[float, float]] = []
+    for start, end in spans:
+        if windows and end - windows[-1][0] <= max_seconds:
+            windows[-1] = (windows[-1][0], end)
+            continue
+        while end - start > max_seconds:
+            windows.append((start, start + max_seconds))
+            start += max_seconds
+        windows.append((start, end))
+    return windows
+
+
+def normalize_language(language: str | None) -> str | None:
+    """Return a lower-cased Whisper language code, or ``None`` (detect) for an empty value.
+
+    Raises:
+        ValueError: If ``language`` is not a two or three letter code.
+    """
+    if not language or not language.strip():
+        return None
+    code = language.strip().lower()
+    if not (code.isascii() and code.isalpha() and 2 <= len(code) <= 3):
+        raise ValueError(f"Invalid language code '{language}'")
+    return code
+
+
+def speech_dense_window(speech: list[tuple[float, float]], duration: float, seconds: float) -> tuple[float, float]:
+    """Return the ``seconds`` long window of the file that contains the most speech.
+
+    The best window can always be moved to start at a speech span, so only
+    those starts (clamped to the end of the file) are tried.
     """
-    Transcribes an audio file using the pre-loaded Whisper model.
+    if duration <= seconds or not speech:
+        return 0.0, min(seconds, duration)
+    ends = [end for _, end in speech]
+    best_start, best_covered = 0.0, -1.0
+    for span_start, _ in speech:
+        start = min(span_start, duration - seconds)
+        end = start + seconds
+        covered = 0.0
+        for s, e in speech[bisect_right(ends, start):]:
+            if s >= end:
+                break
+            covered += min(e, end) - max(s, start)
+        if covered > best_covered:
+            best_start, best_covered = start, covered
+    return best_start, best_start + seconds
+
+
+def detect_language(model, audio) -> tuple[str, float]:
+    """Detect the spoken language of ``audio`` (a short excerpt) with ``model``.
+
+    English-only models (``*.en``) need no detection.
+    """
+    if not model.is_multilingual:
+        return "en", 1.0
+    language, probability, _ = model.detect_language(audio=audio)
+    return language, probability
+
+
+def transcribe_segments(
+    audio_input_path: Path,
+    model_size: str | None = None,
+    engine: str | None = None,
+    batch_size: int | None = None,
+    beam_size: int | None = None,
+    vad: bool | None = None,
+    start_at: float = 0.0,
+    on_segment: Callable[[Segment], None] | None = None,
+    word_timestamps: bool | None = None,
+    language: str | None = None,
+    compute_type: str | None = None,
+) -> TranscriptionResult:
+    """
+    Transcribes an audio file into segments using a resident Whisper model.
 
     Args:
-        audio_input_path: Path to the input audio file.
+        model_size / compute_type: Whisper model to use; default to
+            WHISPER_MODEL_SIZE / WHISPER_COMPUTE_TYPE. Each combination is
+            loaded once into the model registry and kept resident.
+        engine: "batched" (faster-whisper's BatchedInferencePipeline) or
+            "sequential"; defaults to WHISPER_ENGINE. Clips shorter than
+            WHISPER_BATCHED_MIN_SECONDS are always decoded sequentially.
+        batch_size: Decoding windows per batch (batched engine only).
+        beam_size: Beam search width.
+        vad: Skip non-speech (silence, music beds) found by the Silero VAD
+            before decoding; defaults to WHISPER_VAD_FILTER. The speech map
+            is returned in ``TranscriptionResult.speech``.
+        start_at: Only transcribe from this many seconds in (resuming a run
+            that already transcribed the beginning). Segment times stay
+            relative to the start of the file.
+        on_segment: Called with every segment as soon as it is decoded.
+        word_timestamps: Also align individual words (``Segment.words``);
+            defaults to WHISPER_WORD_TIMESTAMPS.
+        language: Spoken language code; defaults to WHISPER_LANGUAGE. When
+            neither is set it is detected once on the most speech-dense
+            WHISPER_LANGUAGE_DETECT_SECONDS of the file (found by the VAD,
+            even with ``vad`` off) and pinned for the whole decode.
 
-    Returns:
-        A tuple containing:
-            - plain_text_transcript (str): The full transcript as plain text.
-            - srt_transcript (str): The transcript in SRT format.
-            - detected_language (str | None): The detected language code (e.g., "en", "es") or None if detection fails.
-    
     Raises:
         FileNotFoundError: If the audio input file does not exist.
+        ValueError: If the engine is unknown.
         RuntimeError: If the Whisper model failed to initialize or transcription fails.
-        Exception: For other unexpected errors during transcription.
     """
-    model = get_whisper_model()
+    model = get_whisper_model(model_size, compute_type=compute_type)
     if not model:
         logger.error("Whisper model is not available. Cannot transcribe.")
         # This error will be caught by the Celery task and job status updated.
@@ -89,33 +354,92 @@ def transcribe_audio(audio_input_path: Path) -> tuple[str, str, str | None]:
         logger.error(f"Audio input file for transcription not found: {audio_input_path}")
         raise FileNotFoundError(f"Audio input file not found: {audio_input_path}")
 
+    # Validated here rather than in the try block below, so a bad setting is
+    # reported as such and not as a failed transcription.
+    engine = validate_engine(engine)
+    vad = settings.WHISPER_VAD_FILTER if vad is None else vad
+    word_timestamps = settings.WHISPER_WORD_TIMESTAMPS if word_timestamps is None else word_timestamps
+    beam_size = beam_size or settings.WHISPER_BEAM_SIZE
+    language = language or settings.WHISPER_LANGUAGE or None
+    language_source = "requested" if language else None
+    language_detection_seconds = 0.0
     logger.info(f"Starting transcription for: {audio_input_path}")
-    
-    plain_text_parts = []
-    srt_parts = []
-    segment_idx = 1
-    detected_language: str | None = None
 
+    result: list[Segment] = []
+    started = time.perf_counter()
     try:
-        # beam_size can be adjusted. word_timestamps=True can provide word-level detail if needed.
-        # For longer audio, consider parameters like `vad_filter=True` if VAD support is robust.
-        segments, info = model.transcribe(str(audio_input_path), beam_size=5)
-        
-        detected_language = info.language
-        logger.info(f"Transcription details - Detected language: '{detected_language}' (Prob: {info.language_probability:.2f}), Duration: {info.duration:.2f}s")
-
-        for segment in segments:
-            plain_text_parts.append(segment.text.strip())
-            
-            start_time_srt = format_timestamp_srt(segment.start)
-            end_time_srt = format_timestamp_srt(segment.end)
-            srt_parts.append(str(segment_idx))
-            srt_parts.append(f"{start_time_srt} --> {end_time_srt}")
-            srt_parts.append(segment.text.strip())
-            srt_parts.append("") # Blank line separator for SRT entries
-            segment_idx += 1
-            
-            logger.debug(f"Segment {segment_idx-1}: [{start_time_srt} --> {end_time_srt}] \"{segment.text.strip()}\"")
+        # Decode once and hand the array to faster-whisper, so the VAD pass
+        # and the model share a single decode of the file.
+        full_audio = load_audio(audio_input_path)
+        duration = len(full_audio) / SAMPLE_RATE
+        start_at = min(max(0.0, start_at), duration)
+        audio = full_audio[int(start_at * SAMPLE_RATE):]
+        engine = choose_engine(engine, duration - start_at)
+        batch_size = (batch_size or settings.WHISPER_BATCH_SIZE) if engine == "batched" else None
+        parameters = vad_parameters() if vad else None
+        # The speech map always covers the whole file so it can be reused later.
+        speech = detect_speech(full_audio, parameters) if vad else [(0.0, duration)]
+        has_speech = any(end > start_at for _, end in speech)
+        if language is None and has_speech:
+            detect_started = time.perf_counter()
+            # Without VAD filtering the speech map is the whole file, whose
+            # start is often an intro music bed: the excerpt is then chosen
+            # on a VAD pass of its own.
+            detect_map = speech if vad else detect_speech(full_audio, vad_parameters()) or speech
+            window = speech_dense_window(detect_map, duration, settings.WHISPER_LANGUAGE_DETECT_SECONDS)
+            language, probability = detect_language(
+                model, full_audio[int(window[0] * SAMPLE_RATE):int(window[1] * SAMPLE_RATE)]
+            )
+            language_source = "detected"
+            language_detection_seconds = time.perf_counter() - detect_started
+            logger.info(
+                f"Detected language '{language}' (Prob: {probability:.2f}) on {window[0]:.1f}s - {window[1]:.1f}s "
+                f"in {language_detection_seconds:.2f}s"
+            )
+        del full_audio
+        logger.info(
+            f"Decoding {duration - start_at:.1f}s from {start_at:.1f}s ({sum(e - s for s, e in speech):.1f}s speech in file) "
+            f"with engine={engine}, beam_size={beam_size}, batch_size={batch_size}, vad={vad}"
+        )
+
+        if has_speech:
+            # The speech map above is the only VAD pass: both engines decode
+            # just its spans (as clip timestamps) with their own VAD off.
+            if engine == "batched":
+                from faster_whisper import BatchedInferencePipeline  # Lazy import, as for the model itself
+
+                windows = speech_windows(speech, start_at, BATCH_WINDOW_SECONDS)
+                segments, info = BatchedInferencePipeline(model=model).transcribe(
+                    audio, language=language, beam_size=beam_size, batch_size=batch_size,
+                    word_timestamps=word_timestamps, vad_filter=False,
+                    clip_timestamps=[
+                        {"start": int(start * SAMPLE_RATE), "end": min(int(end * SAMPLE_RATE), len(audio))}
+                        for start, end in windows
+                    ],
+                )
+            else:
+                options = {}
+                if vad:
+                    options["clip_timestamps"] = [t for span in speech_windows(speech, start_at) for t in span]
+                segments, info = model.transcribe(
+                    audio, language=language, beam_size=beam_size, vad_filter=False,
+                    word_timestamps=word_timestamps, **options
+                )
+            logger.info(f"Transcription details - Language: '{info.language}' (Prob: {info.language_probability:.2f}), Duration: {info.duration:.2f}s")
+
+            # Segments are generated lazily; decoding happens while iterating.
+            for segment in segments:
+                words = None
+                if word_timestamps:
+                    words = [[w.start, w.end, w.word.strip()] for w in (segment.words or [])]
+                result.append(
+                    Segment(start=segment.start, end=segment.end, text=segment.text.strip(), words=words).shifted(start_at)
+                )
+                logger.debug(f"Segment {len(result)}: [{result[-1].start:.2f} --> {result[-1].end:.2f}] \"{result[-1].text}\"")
+                if on_segment is not None:
+                    on_segment(result[-1])
+        else:
+            logger.info(f"No speech detected in {audio_input_path}; skipping the model")
 
     except Exception as e:
         # Catching a broad Exception as errors from faster-whisper might not always be specific custom errors.
@@ -123,11 +447,49 @@ def transcribe_audio(audio_input_path: Path) -> tuple[str, str, str | None]:
         # Re-raise as a RuntimeError to indicate a problem during the transcription process itself.
         raise RuntimeError(f"Transcription failed for {audio_input_path}: {str(e)}")
 
-    plain_text_transcript = " ".join(plain_text_parts)
-    srt_transcript = "\n".join(srt_parts)
+    transcription = TranscriptionResult(
+        segments=result,
+        language=language,
+        duration=duration,
+        engine=engine,
+        beam_size=beam_size,
+        batch_size=batch_size,
+        processing_seconds=time.perf_counter() - started,
+        vad=vad,
+        speech=speech,
+        start_at=start_at,
+        language_source=language_source,
+        language_detection_seconds=language_detection_seconds,
+    )
+    logger.info(
+        f"Successfully transcribed {audio_input_path}. Total segments: {len(result)}. Language: {language}. "
+        f"Skipped {transcription.metrics()['skipped_seconds']:.1f}s of non-speech. "
+        f"Realtime factor ({engine}): {transcription.realtime_factor or 0:.3f}"
+    )
+    return transcription
+
+
+def transcribe_audio(audio_input_path: Path, model_size: str | None = None) -> tuple[str, str, str | None]:
+    """
+    Transcribes an audio file using a resident Whisper model.
+
+    Args:
+        audio_input_path: Path to the input audio file.
+        model_size: Whisper model to use; defaults to WHISPER_MODEL_SIZE.
+
+    Returns:
+        A tuple containing:
+            - plain_text_transcript (str): The full transcript as plain text.
+            - srt_transcript (str): The transcript in SRT format.
+            - detected_language (str | None): The detected language code (e.g., "en", "es") or None if detection fails.
     
-    logger.info(f"Successfully transcribed {audio_input_path}. Total segments: {segment_idx-1}. Language: {detected_language}")
-    return plain_text_transcript, srt_transcript, detected_language
+    Raises:
+        FileNotFoundError: If the audio input file does not exist.
+        RuntimeError: If the Whisper model failed to initialize or transcription fails.
+        Exception: For other unexpected errors during transcription.
+    """
+    result = transcribe_segments(audio_input_path, model_size)
+    return render_text(result.segments), render_srt(result.segments), result.language
 
 # Example of how to test this service (can be commented out or removed for production)
 if __name__ == "__main__":
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+import hashlib
 import logging
+import re
 import ffmpeg
 
 from app.utils.storage import ensure_dir_exists
@@ -11,6 +13,29 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+RESOLUTION_RE = re.compile(r"^(\d+)x(\d+)$")
+# libx264 with yuv420p needs even dimensions; 4096 covers DCI 4K.
+MIN_DIMENSION = 16
+MAX_DIMENSION = 4096
+
+
+def validate_resolution(resolution: str) -> str:
+    """Return ``resolution`` if it is a ``WIDTHxHEIGHT`` size the encoder accepts.
+
+    Raises:
+        ValueError: If it is malformed, odd or outside MIN_DIMENSION..MAX_DIMENSION.
+    """
+    match = RESOLUTION_RE.match(resolution)
+    if not match:
+        raise ValueError(f"Invalid resolution '{resolution}', expected WIDTHxHEIGHT (e.g. 1280x720)")
+    for dimension in (int(match.group(1)), int(match.group(2))):
+        if not MIN_DIMENSION <= dimension <= MAX_DIMENSION or dimension % 2:
+            raise ValueError(
+                f"Invalid resolution '{resolution}', width and height must be even "
+                f"and between {MIN_DIMENSION} and {MAX_DIMENSION}"
+            )
+    return resolution
+
 
 def generate_waveform_video(
     audio_input_path: Path,
@@ -19,8 +44,16 @@ def generate_waveform_video(
     fg_color: str,
     bg_color: str,
     background_image_path: Path | None = None,
+    start: float = 0.0,
+    duration: float | None = None,
+    preset: str | None = None,
 ) -> Path:
-    """Generate a simple waveform video using FFmpeg."""
+    """Generate a simple waveform video using FFmpeg.
+
+    ``start``/``duration`` restrict the render to an excerpt of the audio and
+    ``preset`` selects the x264 speed preset; together they power the cheap
+    draft previews (see :func:`preview_output_filename`).
+    """
 
     if not audio_input_path.exists():
         logger.error("Audio input %s not found", audio_input_path)
@@ -29,7 +62,12 @@ def generate_waveform_video(
     ensure_dir_exists(video_output_path.parent)
 
     try:
-        audio_stream = ffmpeg.input(str(audio_input_path))
+        input_kwargs = {}
+        if start:
+            input_kwargs["ss"] = start
+        if duration:
+            input_kwargs["t"] = duration
+        audio_stream = ffmpeg.input(str(audio_input_path), **input_kwargs)
 
         wave = audio_stream.filter(
             "showwavespic", s=resolution, colors=fg_color
@@ -44,12 +82,10 @@ def generate_waveform_video(
 
         overlaid = ffmpeg.overlay(background, wave)
 
-        video_stream = ffmpeg.output(
-            overlaid,
-            str(video_output_path),
-            vcodec="libx264",
-            pix_fmt="yuv420p",
-        )
+        output_kwargs = {"vcodec": "libx264", "pix_fmt": "yuv420p"}
+        if preset:
+            output_kwargs["preset"] = preset
+        video_stream = ffmpeg.output(overlaid, str(video_output_path), **output_kwargs)
 
         ffmpeg.run(
             video_stream,
@@ -63,3 +99,40 @@ def generate_waveform_video(
         logger.error("FFmpeg error generating video: %s", stderr)
         raise
     return video_output_path
+
+
+def preview_output_filename(
+    audio_input_path: Path,
+    resolution: str,
+    fg_color: str,
+    bg_color: str,
+    background_key: str | None,
+    start: float,
+    duration: float,
+    style: str = "static",
+    preset: str | None = None,
+) -> str:
+    """Return a deterministic file name for a draft preview render.
+
+    The name is derived from everything that affects the preview's look
+    (including the encoder ``preset``, ``VIDEO_PREVIEW_PRESET`` by default), so
+    re-requesting a preview with unchanged settings hits the cached file.  The
+    audio is identified by path, size and modification time rather than by a
+    full content hash to keep the lookup instant for multi-hour episodes.
+    """
+    stat = audio_input_path.stat()
+    key_parts = [
+        str(audio_input_path),
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+        resolution,
+        fg_color,
+        bg_color,
+        background_key or "",
+        f"{start:.3f}",
+        f"{duration:.3f}",
+        style,
+        preset or settings.VIDEO_PREVIEW_PRESET,
+    ]
+    digest = hashlib.sha256("|".join(key_parts).encode("utf-8")).hexdigest()
+    return f"preview_{digest[:24]}.mp4"
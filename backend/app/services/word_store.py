@@ -0,0 +1,129 @@
+"""Compact, memory-mapped storage of word-level timestamps.
+
+A three hour episode has ~30k words and the archive millions, so words are not
+stored as rows or JSON objects.  Each transcript gets a directory of NumPy
+arrays instead::
+
+    <basename>.words/
+        starts.npy   uint32  word start, milliseconds (sorted)
+        ends.npy     uint32  word end, milliseconds
+        tokens.npy   uint16/uint32  index into the string table
+        strings.bin  UTF-8 bytes of every distinct word, concatenated
+        offsets.npy  uint32  byte offsets into strings.bin (len = table size + 1)
+
+That is 10-12 bytes per word plus the (small) vocabulary.  The per-word arrays
+are opened with ``mmap_mode="r"`` and a time range is located by binary search,
+so reading a five minute window touches a few kB regardless of episode length.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from app.services.transcription import Segment
+from app.utils.storage import ensure_dir_exists
+
+logger = logging.getLogger(__name__)
+
+# Longest word we expect; bounds the backwards search for words overlapping a
+# range start (Whisper aligns words within 30 s windows).
+MAX_WORD_MS = 30_000
+
+
+def words_dir(output_basename: str, transcript_dir: Path) -> Path:
+    """Location of a transcript's word arrays."""
+    return transcript_dir / f"{output_basename}.words"
+
+
+def build_word_arrays(segments: Iterable[Segment]) -> dict[str, np.ndarray]:
+    """Pack the words of ``segments`` into the arrays described in the module docstring."""
+    starts: list[int] = []
+    ends: list[int] = []
+    tokens: list[int] = []
+    table: dict[str, int] = {}
+    for segment in segments:
+        for start, end, word in segment.words or ():
+            starts.append(round(start * 1000))
+            ends.append(round(end * 1000))
+            tokens.append(table.setdefault(word, len(table)))
+
+    starts_arr = np.asarray(starts, dtype=np.uint32)
+    order = np.argsort(starts_arr, kind="stable")
+    encoded = [word.encode("utf-8") for word in table]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return {
+        "starts": starts_arr[order],
+        "ends": np.asarray(ends, dtype=np.uint32)[order],
+        "tokens": np.asarray(tokens, dtype=np.min_scalar_type(max(len(table) - 1, 0)))[order],
+        "offsets": offsets,
+        "strings": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+
+
+def save_words(segments: Iterable[Segment], directory: Path) -> int:
+    """Write the word arrays for ``segments`` to ``directory``; returns the word count.
+
+    The arrays are written to a sibling temp directory which then replaces
+    ``directory``, so readers never see a half-written set.
+    """
+    arrays = build_word_arrays(segments)
+    tmp_dir = directory.with_name(f".{directory.name}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    ensure_dir_exists(tmp_dir)
+    for name in ("starts", "ends", "tokens", "offsets"):
+        np.save(tmp_dir / f"{name}.npy", arrays[name])
+    (tmp_dir / "strings.bin").write_bytes(arrays["strings"].tobytes())
+    if directory.exists():
+        shutil.rmtree(directory)
+    tmp_dir.rename(directory)
+    return len(arrays["starts"])
+
+
+class WordIndex:
+    """Read-only, memory-mapped view of a transcript's words."""
+
+    def __init__(self, directory: Path):
+        if not (directory / "starts.npy").exists():
+            raise FileNotFoundError(f"No word timestamps at {directory}")
+        self.starts = np.load(directory / "starts.npy", mmap_mode="r")
+        self.ends = np.load(directory / "ends.npy", mmap_mode="r")
+        self.tokens = np.load(directory / "tokens.npy", mmap_mode="r")
+        # The vocabulary is small and needed for every lookup: load it eagerly.
+        offsets = np.load(directory / "offsets.npy")
+        strings = (directory / "strings.bin").read_bytes()
+        self.table = [strings[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def range_bounds(self, start: float | None = None, end: float | None = None) -> tuple[int, int]:
+        """Index range ``[lo, hi)`` of the words overlapping ``[start, end)`` seconds.
+
+        Words are sorted by start; ``lo`` skips the leading words of the
+        candidate window that end before ``start``.
+        """
+        hi = len(self.starts) if end is None else int(np.searchsorted(self.starts, round(end * 1000), side="left"))
+        if start is None:
+            return 0, hi
+        start_ms = round(start * 1000)
+        lo = int(np.searchsorted(self.starts, max(0, start_ms - MAX_WORD_MS), side="left"))
+        candidates = np.nonzero(self.ends[lo:hi] > start_ms)[0]
+        return (lo + int(candidates[0]), hi) if len(candidates) else (hi, hi)
+
+    def words(self, start: float | None = None, end: float | None = None, offset: int = 0, limit: int | None = None) -> list[dict]:
+        """Return words overlapping ``[start, end)`` as ``{"start", "end", "word"}`` dicts."""
+        lo, hi = self.range_bounds(start, end)
+        lo = min(lo + offset, hi)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [
+            {"start": s / 1000, "end": e / 1000, "word": self.table[t]}
+            for s, e, t in zip(self.starts[lo:hi].tolist(), self.ends[lo:hi].tolist(), self.tokens[lo:hi].tolist())
+        ]
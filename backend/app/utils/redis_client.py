@@ -0,0 +1,34 @@
+"""Lazily created Redis client shared by a process.
+
+Redis is only used for best-effort coordination and metrics, so callers are
+expected to handle :class:`redis.RedisError` (or ``None`` if the client could
+not be created) and degrade gracefully.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    """Return the process-wide :class:`redis.Redis` client, or ``None`` if unavailable."""
+    global _client
+    if _client is None:
+        try:
+            import redis  # Imported lazily; only needed where coordination is used
+
+            _client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=2,
+                socket_timeout=2,
+            )
+        except Exception as exc:  # pragma: no cover - depends on environment
+            logger.warning("Redis client unavailable (%s): %s", settings.REDIS_URL, exc)
+            return None
+    return _client
@@ -1,5 +1,7 @@
 """Filesystem & object storage helpers."""
 
+import hashlib
+import json
 import os
 from pathlib import Path
 
@@ -21,12 +23,23 @@ UPLOAD_DIR = DATA_ROOT / "uploads"
 PROCESSED_DIR = DATA_ROOT / "processed"
 TRANSCRIPT_DIR = DATA_ROOT / "transcripts"
 OUTPUTS_DIR = DATA_ROOT / "outputs" # <--- Add this line
+BACKGROUNDS_DIR = DATA_ROOT / "backgrounds"  # Pre-scaled show artwork, keyed by content hash
+THUMBNAIL_DIR = DATA_ROOT / "thumbnails"  # Poster frames & waveform images for library browsing
+LLM_INPUT_DIR = DATA_ROOT / "llm_inputs"  # Raw text submitted for background LLM suggestion jobs
 
 def ensure_dir_exists(path: Path) -> Path:
     """Ensure that the given directory exists, creating it if necessary."""
     path.mkdir(parents=True, exist_ok=True)
     return path
 
+def compute_file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA-256 digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def save_transcript_to_files(
     output_basename: str,
     plain_text: str,
@@ -47,3 +60,39 @@ def save_transcript_to_files(
     with open(srt_path, "w", encoding="utf-8") as f:
         f.write(srt_text)
     return txt_path.relative_to(DATA_ROOT), srt_path.relative_to(DATA_ROOT)
+
+def save_speech_map(
+    output_basename: str,
+    speech: list[tuple[float, float]],
+    duration: float,
+    transcript_dir: Path,
+) -> Path:
+    """
+    Persist the VAD speech map (speech spans in seconds) next to the transcript.
+
+    Returns:
+        The path of the ``<basename>.speech.json`` file relative to DATA_ROOT.
+    """
+    ensure_dir_exists(transcript_dir)
+    speech_seconds = sum(end - start for start, end in speech)
+    path = transcript_dir / f"{output_basename}.speech.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "duration": round(duration, 3),
+                "speech_seconds": round(speech_seconds, 3),
+                "skipped_seconds": round(max(0.0, duration - speech_seconds), 3),
+                "speech": [[round(start, 3), round(end, 3)] for start, end in speech],
+            },
+            f,
+        )
+    return path.relative_to(DATA_ROOT)
+
+
+def load_speech_map(output_basename: str, transcript_dir: Path) -> list[tuple[float, float]] | None:
+    """Return the speech spans saved by :func:`save_speech_map`, or ``None`` if absent."""
+    path = transcript_dir / f"{output_basename}.speech.json"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [tuple(span) for span in json.load(f)["speech"]]
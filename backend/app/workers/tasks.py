@@ -1,10 +1,16 @@
 """Celery task definitions."""
 
-from celery import Celery, Task # Import Task for custom base class
+from celery import Celery, Task, chain, chord, group # Import Task for custom base class
 from celery.signals import setup_logging as setup_celery_logging # To potentially customize Celery's own logging
+from celery.exceptions import Retry
+from celery.signals import worker_process_init, worker_process_shutdown
+from datetime import datetime
 from pathlib import Path
 import logging # Python's standard logging
 import os
+import subprocess # For CalledProcessError raised by the NumPy frame renderer
+import tempfile
+import time
 import ffmpeg # For ffmpeg.Error in error handling
 
 # Import settings and services
@@ -12,12 +18,35 @@ from app.config import settings
 from app.db.database import SessionLocal
 from ..models.audio import AudioFile # Import AudioFile model
 from ..models.job import ProcessingJob, JobStatus
+from ..models.llm import LLMSuggestion
+from ..models.pipeline import Pipeline, aggregate_status
 from ..models.transcript import Transcript # Import Transcript model
 from ..services.audio_processing import merge_and_normalize_audio
-from ..services.transcription import transcribe_audio
+from ..services.background_assets import get_prepared_background
+from ..services.frame_renderer import render_animated_video
+from ..services.http_clients import close_worker_loop, run_in_worker_loop
+from ..services.llm import generate_suggestions, prompt_eval_ms, suggestion_key
+from ..services import suggestion_cache
+from ..services.ollama_admission import OllamaBusy, OllamaUnavailable
+from ..services.model_registry import registry as whisper_registry
+from ..services.prompt_budget import job_transcript_text
+from ..services.thumbnails import ensure_thumbnails
+from ..services.chunked_transcription import (
+    Chunk, chunk_state_dir, clear_chunk_state, detect_episode_language, detect_silences, extract_chunk_audio,
+    load_chunk_plan, load_chunk_results, majority_language, merge_chunk_segments, merge_speech, offset_segments,
+    offset_speech, plan_chunks, probe_duration, save_chunk_plan, save_chunk_result,
+)
+from ..services.segment_store import (
+    SegmentWriter, attach_segments, committed_segments, iter_segments, read_segment_log, replace_segments, resume_point, segment_log_path,
+    store_chunk_segments,
+)
+from ..services.transcript_cache import cache_options, find_cached_transcript, transcription_cache_key
+from ..services.word_store import save_words, words_dir
+from ..services.transcription import Segment, render_srt, render_text, transcribe_segments
+from ..services.video_processing import generate_waveform_video
 from ..utils.storage import (
     UPLOAD_DIR, PROCESSED_DIR, TRANSCRIPT_DIR,
-    ensure_dir_exists, DATA_ROOT, save_transcript_to_files
+    ensure_dir_exists, DATA_ROOT, compute_file_hash, load_speech_map, save_speech_map, save_transcript_to_files
 )
 from ..logging_config import setup_logging as setup_app_logging
 
@@ -45,12 +74,32 @@ celery_app = Celery(
     include=['app.workers.tasks'] # Ensures tasks are discoverable
 )
 
+# --- Queues & routing ---
+# One queue per stage so quick audio merges never wait behind hour-long
+# transcriptions.  docker-compose starts one worker per queue, each with its
+# own concurrency, prefetch and child-recycling policy.  Short bookkeeping
+# tasks (chord callbacks, stats) use the default queue served by the audio
+# worker.
+TASK_ROUTES = {
+    "process_audio_task": {"queue": "audio"},
+    "generate_video_task": {"queue": "video"},
+    "transcribe_audio_task": {"queue": "transcription"},
+    "transcribe_chunk_task": {"queue": "transcription"},
+    # Reads the model registry of the process it runs in.
+    "whisper_model_stats_task": {"queue": "transcription"},
+    # Waits on Ollama, not the CPU: its own worker so it never holds a
+    # transcription or render slot.
+    "generate_suggestions_task": {"queue": "llm"},
+}
+
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_default_queue="default",
+    task_routes=TASK_ROUTES,
     # Consider adding:
     # task_track_started=True, # To report 'started' state
     # worker_send_task_events=True, # For monitoring tools like Flower
@@ -67,6 +116,24 @@ celery_app.conf.update(
 # logger.info(f"Celery app configured with broker: {settings.CELERY_BROKER_URL}")
 
 
+# --- Whisper model preloading ---
+# Each prefork child loads the configured models once, before it accepts its
+# first job, so transcriptions never pay the model cold start.
+@worker_process_init.connect
+def preload_whisper_models(**kwargs):
+    keys = settings.whisper_preload_models
+    if keys:
+        logger.info(f"Preloading Whisper models in worker process {os.getpid()}: {keys}")
+        whisper_registry.preload(keys)
+
+
+# Async HTTP calls (Ollama) run on a persistent per-thread loop so pooled
+# connections survive between tasks; close them when the child exits.
+@worker_process_shutdown.connect
+def close_http_clients(**kwargs):
+    close_worker_loop()
+
+
 # --- Base Task with Error Handling & DB Session (Optional but good practice) ---
 class BaseTaskWithDB(Task):
     """Base Celery Task with automatic DB session management and logging."""
@@ -154,13 +221,19 @@ def process_audio_task(job_id: int, input_paths_str: list[str], output_filename:
 
 
 # --- Video Generation Task ---
-@celery_app.task(name="generate_video_task", base=BaseTaskWithDB)
+# Renders take minutes and are idempotent: ack after completion so a lost
+# worker's render is redelivered.
+@celery_app.task(name="generate_video_task", base=BaseTaskWithDB, acks_late=True, reject_on_worker_lost=True)
 def generate_video_task(
     job_id: int, audio_input_path_str: str, output_filename: str, 
     resolution: str, fg_color: str, bg_color: str, 
-    background_image_path_str: str | None = None
+    background_image_path_str: str | None = None,
+    background_asset_hash: str | None = None,
+    style: str = "static",
+    preview: bool = False,
+    preview_start: float = 0.0,
 ):
-    logger.info(f"Starting video generation for job_id: {job_id}. Audio: {audio_input_path_str}, Output: {output_filename}")
+    logger.info(f"Starting video generation for job_id: {job_id}. Audio: {audio_input_path_str}, Output: {output_filename}, Preview: {preview}")
     db = SessionLocal()
     job = None
     try:
@@ -175,13 +248,41 @@ def generate_video_task(
         audio_input_path = DATA_ROOT / Path(audio_input_path_str)
         video_output_path = PROCESSED_DIR / output_filename
         background_image_path = DATA_ROOT / Path(background_image_path_str) if background_image_path_str else None
+        if background_asset_hash:
+            # Prepared assets are already scaled to the output resolution, so
+            # FFmpeg only has to read a ready-made frame.
+            background_image_path = get_prepared_background(background_asset_hash, resolution)
         
         ensure_dir_exists(PROCESSED_DIR)
         logger.debug(f"Video generation params for job {job_id} - audio: {audio_input_path}, video_out: {video_output_path}, bg_img: {background_image_path}")
 
-        generated_video_path = generate_waveform_video(
-            audio_input_path, video_output_path, resolution, fg_color, bg_color, background_image_path
-        )
+        render_kwargs = {}
+        if preview:
+            render_kwargs = {
+                "start": preview_start,
+                "duration": settings.VIDEO_PREVIEW_SECONDS,
+                "preset": settings.VIDEO_PREVIEW_PRESET,
+            }
+
+        if preview and video_output_path.exists():
+            # Preview file names are derived from the render settings, so an
+            # existing file is an identical, already rendered draft.
+            logger.info(f"Preview for job_id: {job_id} already rendered, reusing {video_output_path}")
+            generated_video_path = video_output_path
+        elif style != "static":
+            generated_video_path = render_animated_video(
+                audio_input_path, video_output_path, resolution, fg_color, bg_color,
+                style=style, background_image_path=background_image_path, **render_kwargs
+            )
+        else:
+            generated_video_path = generate_waveform_video(
+                audio_input_path, video_output_path, resolution, fg_color, bg_color, background_image_path,
+                **render_kwargs
+            )
+
+        if not preview:
+            # Small artwork for the library so browsing never pulls the MP4.
+            ensure_thumbnails(job_id, generated_video_path, audio_input_path)
 
         job.status = JobStatus.COMPLETED
         job.output_file_path = str(generated_video_path.relative_to(DATA_ROOT))
@@ -198,6 +299,11 @@ def generate_video_task(
         logger.error(f"FFmpeg error during video generation for job {job_id}: {err_detail}", exc_info=True)
         if job: job.error_message = f"FFmpeg error: {err_detail[:500]}"
         raise
+    except subprocess.CalledProcessError as e:
+        err_detail = e.stderr or str(e)
+        logger.error(f"FFmpeg error during animated video render for job {job_id}: {err_detail}", exc_info=True)
+        if job: job.error_message = f"FFmpeg error: {err_detail[:500]}"
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during video generation for job {job_id}: {e}", exc_info=True)
         if job: job.error_message = f"Unexpected error: {str(e)[:500]}"
@@ -208,9 +314,202 @@ def generate_video_task(
 
 
 # --- Transcription Task ---
-@celery_app.task(name="transcribe_audio_task", base=BaseTaskWithDB)
-def transcribe_audio_task(job_id: int, audio_input_path_str: str, output_basename: str):
+def _store_transcript(
+    db,
+    job,
+    output_basename: str,
+    segments: list[Segment],
+    language: str | None,
+    speech: list[tuple[float, float]] | None = None,
+    duration: float | None = None,
+    word_segments: list[Segment] | None = None,
+    cache_key: str | None = None,
+    cached_from: Transcript | None = None,
+) -> dict:
+    """Write transcript files (and the speech map and word arrays, if any), add
+    the Transcript row and mark ``job`` completed.
+
+    ``cached_from`` is the transcript a cache hit copies; its word arrays are
+    shared rather than rewritten.
+    """
+    plain_text, srt_text = render_text(segments), render_srt(segments)
+    ensure_dir_exists(TRANSCRIPT_DIR) # Ensure transcript dir exists
+    txt_rel_path, srt_rel_path = save_transcript_to_files(
+        output_basename, plain_text, srt_text, TRANSCRIPT_DIR
+    )
+    if speech is not None and duration is not None:
+        # Later stages (language detection, previews, ...) reuse the speech map.
+        speech_rel_path = save_speech_map(output_basename, speech, duration, TRANSCRIPT_DIR)
+        logger.info(f"Speech map for job_id: {job.id} saved to {speech_rel_path}")
+    words_rel_path = cached_from.words_path if cached_from is not None else None
+    if word_segments is not None:
+        target = words_dir(output_basename, TRANSCRIPT_DIR)
+        word_count = save_words(word_segments, target)
+        words_rel_path = str(target.relative_to(DATA_ROOT))
+        logger.info(f"Saved {word_count} word timestamps for job_id: {job.id} to {words_rel_path}")
+
+    # Create and save Transcript record
+    transcript_record = Transcript(
+        processing_job_id=job.id,
+        text_content=plain_text,
+        srt_content=srt_text,
+        language=language,
+        words_path=words_rel_path,
+        cache_key=cache_key,
+        cached_from_id=cached_from.id if cached_from is not None else None,
+        # created_at will use the model's default
+    )
+    db.add(transcript_record)
+    db.flush() # Assigns the transcript id
+    attach_segments(db, job.id, transcript_record.id)
+    # The commit happens in the caller's finally block
+
+    job.status = JobStatus.COMPLETED
+    job.output_file_path = str(srt_rel_path) # Store SRT path as the main output
+    job.error_message = None
+    # Consider storing txt_rel_path in a new field or a JSON structure in job.results if needed.
+    logger.info(f"Transcription successful for job_id: {job.id}. SRT: {srt_rel_path}, TXT: {txt_rel_path}")
+    logger.info(f"Transcript for job_id: {job.id} (language: {language}) saved to database.")
+    return {
+        "job_id": job.id,
+        "srt_path": str(srt_rel_path),
+        "txt_path": str(txt_rel_path),
+        "status": "COMPLETED",
+        "language": language,
+        "metrics": job.get_metrics(),
+        "model_stats": whisper_registry.stats(),
+    }
+
+
+def _start_chunked_transcription(
+    job_id: int,
+    audio_input_path: Path,
+    audio_input_path_str: str,
+    output_basename: str,
+    decode_options: dict,
+    cache_key: str | None = None,
+):
+    """Plan silence-aligned chunks and fan them out as a Celery chord.
+
+    A job that was split before (it is being resumed) reuses its saved plan and
+    only dispatches the chunks without a stored result.
+
+    Returns ``None`` when the recording is too short to be worth splitting.
+    """
+    state_dir = chunk_state_dir(output_basename, TRANSCRIPT_DIR)
+    plan = load_chunk_plan(state_dir)
+    if plan is not None:
+        chunks, decode_options = plan
+    else:
+        duration = probe_duration(audio_input_path)
+        if duration <= 1.5 * settings.TRANSCRIPTION_CHUNK_SECONDS:
+            return None
+        silences = detect_silences(audio_input_path, duration)
+        chunks = plan_chunks(duration, silences)
+        if decode_options.get("language") is None:
+            # Detect once here rather than per chunk, so every chunk decodes with the same language.
+            with tempfile.TemporaryDirectory(prefix=f"language_{job_id}_") as tmp_dir:
+                language, probability = detect_episode_language(
+                    audio_input_path, duration, silences, Path(tmp_dir),
+                    model_size=decode_options.get("model_size"), compute_type=decode_options.get("compute_type"),
+                )
+            logger.info(f"Job {job_id}: detected language '{language}' (Prob: {probability:.2f}) for all chunks")
+            decode_options = {**decode_options, "language": language}
+        save_chunk_plan(state_dir, chunks, decode_options)
+        logger.info(
+            f"Job {job_id}: splitting {duration:.0f}s of audio into {len(chunks)} chunks "
+            f"({len(silences)} silences detected)"
+        )
+
+    finished = load_chunk_results(state_dir)
+    pending = [chunk for chunk in chunks if chunk.index not in finished]
+    if finished:
+        logger.info(f"Job {job_id}: resuming with {len(pending)} of {len(chunks)} chunks left to transcribe")
+    if not pending:
+        return merge_transcript_chunks_task.delay([], job_id, output_basename, cache_key)
+    header = group(
+        transcribe_chunk_task.s(
+            job_id, audio_input_path_str, chunk.to_dict(), output_basename=output_basename, **decode_options
+        )
+        for chunk in pending
+    )
+    callback = merge_transcript_chunks_task.s(job_id, output_basename, cache_key).on_error(
+        transcription_chunks_failed_task.s(job_id)
+    )
+    return chord(header)(callback)
+
+
+def _materialize_cached_transcript(db, job, output_basename: str, source: Transcript, cache_key: str) -> dict:
+    """Complete ``job`` with a copy of ``source`` (a transcript cache hit)."""
+    logger.info(f"Job {job.id}: transcript cache hit, copying transcript {source.id}")
+    segments = list(iter_segments(db, source.id))
+    replace_segments(db, job.id, segments)
+    source_job = db.query(ProcessingJob).filter(ProcessingJob.id == source.processing_job_id).first()
+    speech = None
+    if source_job is not None and source_job.output_file_path:
+        speech = load_speech_map(Path(source_job.output_file_path).stem, TRANSCRIPT_DIR)
+    duration = (source_job.get_metrics().get("transcription") or {}).get("audio_seconds") if source_job else None
+    job.update_metrics(transcription={"cache_hit": True, "cached_from_transcript_id": source.id})
+    return _store_transcript(
+        db, job, output_basename, segments, source.language, speech, duration,
+        cache_key=cache_key, cached_from=source,
+    )
+
+
+# acks_late + reject_on_worker_lost: if the worker dies mid-file the message is
+# redelivered and the task resumes after the last committed segment.
+@celery_app.task(name="transcribe_audio_task", base=BaseTaskWithDB, acks_late=True, reject_on_worker_lost=True)
+def transcribe_audio_task(
+    job_id: int,
+    audio_input_path_str: str,
+    output_basename: str,
+    chunked: bool | None = None,
+    engine: str | None = None,
+    batch_size: int | None = None,
+    beam_size: int | None = None,
+    vad: bool | None = None,
+    word_timestamps: bool | None = None,
+    use_cache: bool | None = None,
+    language: str | None = None,
+    model_size: str | None = None,
+    compute_type: str | None = None,
+):
+    """Transcribe an audio file; with ``chunked`` long files are split at silences
+    and transcribed in parallel (defaults to ``TRANSCRIPTION_CHUNKED``).
+
+    ``model_size``/``compute_type``/``engine``/``batch_size``/``beam_size``/``vad``/
+    ``word_timestamps`` override the WHISPER_* settings.
+    Timing and the realtime factor are recorded in the job's metrics.
+
+    Segments are persisted while decoding (segment log + ``transcript_segments``);
+    running the task again for the same job resumes after the last committed one,
+    or, for a chunked job, re-runs only the chunks that have not finished.
+
+    ``language`` pins the spoken language (default ``WHISPER_LANGUAGE``);
+    without one it is detected once on a short, speech-dense excerpt.
+
+    Unless ``use_cache`` is false (default ``TRANSCRIPT_CACHE_ENABLED``), an
+    earlier transcript of the same audio content with the same decoding
+    options is copied instead of decoding again.
+    """
     logger.info(f"Starting transcription for job_id: {job_id}. Audio: {audio_input_path_str}, Basename: {output_basename}")
+    if chunked is None:
+        chunked = settings.TRANSCRIPTION_CHUNKED
+    if word_timestamps is None:
+        word_timestamps = settings.WHISPER_WORD_TIMESTAMPS
+    if use_cache is None:
+        use_cache = settings.TRANSCRIPT_CACHE_ENABLED
+    language = language or settings.WHISPER_LANGUAGE or None
+    decode_options = {
+        "model_size": model_size,
+        "compute_type": compute_type,
+        "engine": engine,
+        "batch_size": batch_size,
+        "beam_size": beam_size,
+        "vad": vad,
+        "word_timestamps": word_timestamps,
+        "language": language,
+    }
     db = SessionLocal()
     job = None
     try:
@@ -218,47 +517,77 @@ def transcribe_audio_task(job_id: int, audio_input_path_str: str, output_basenam
         if not job:
             logger.error(f"Job {job_id} not found for transcription.")
             raise ValueError(f"Job {job_id} not found.")
+        if job.status == JobStatus.COMPLETED:
+            logger.info(f"Job {job_id} already completed; ignoring redelivered transcription task")
+            return {"job_id": job_id, "status": "COMPLETED"}
 
         job.status = JobStatus.PROCESSING
+        job.error_message = None
         db.commit()
 
         audio_input_path = DATA_ROOT / Path(audio_input_path_str)
         logger.debug(f"Transcription input path for job {job_id}: {audio_input_path}")
-
-        plain_text, srt_text, language = transcribe_audio(audio_input_path)
-        
-        ensure_dir_exists(TRANSCRIPT_DIR) # Ensure transcript dir exists
-        txt_rel_path, srt_rel_path = save_transcript_to_files(
-            output_basename, plain_text, srt_text, TRANSCRIPT_DIR
+        if not audio_input_path.exists():
+            raise FileNotFoundError(f"Audio input file not found: {audio_input_path}")
+
+        start_at = resume_point(db, job_id)
+        # The key is stored with every transcript, so bypassed runs refresh the cache too.
+        cache_key = transcription_cache_key(
+            compute_file_hash(audio_input_path),
+            cache_options(
+                model_size=model_size, compute_type=compute_type, language=language, engine=engine,
+                beam_size=beam_size, vad=vad, word_timestamps=word_timestamps, chunked=chunked,
+            ),
         )
-
-        # Create and save Transcript record
-        transcript_record = Transcript(
-            processing_job_id=job.id,
-            text_content=plain_text,
-            srt_content=srt_text,
-            language=language 
-            # created_at will use the model's default
+        if use_cache and start_at == 0:
+            cached = find_cached_transcript(db, cache_key)
+            if cached is not None:
+                return _materialize_cached_transcript(db, job, output_basename, cached, cache_key)
+            logger.info(f"Job {job_id}: transcript cache miss ({cache_key[:12]})")
+
+        if chunked:
+            result = _start_chunked_transcription(
+                job_id, audio_input_path, audio_input_path_str, output_basename, decode_options, cache_key
+            )
+            if result is not None:
+                # The merge task completes the job once every chunk is done.
+                return {"job_id": job_id, "status": "PROCESSING", "chord_id": result.id}
+            logger.info(f"Job {job_id}: audio shorter than two chunks, transcribing in one pass")
+
+        if start_at > 0:
+            logger.info(f"Job {job_id}: resuming transcription from {start_at:.1f}s")
+        log_path = segment_log_path(output_basename, TRANSCRIPT_DIR)
+        with SegmentWriter(db, job_id, log_path) as writer:
+            result = transcribe_segments(
+                audio_input_path, start_at=start_at, on_segment=writer.append, **decode_options
+            )
+        job.update_metrics(transcription=result.metrics())
+        segments = committed_segments(db, job_id)
+        # Words are not kept in the table; the segment log has them, including
+        # those decoded by an earlier, interrupted attempt.
+        word_segments = read_segment_log(log_path) if word_timestamps else None
+        return _store_transcript(
+            db, job, output_basename, segments, result.language, result.speech, result.duration, word_segments,
+            cache_key=cache_key,
         )
-        db.add(transcript_record)
-        # The commit will happen in the finally block
-
-        job.status = JobStatus.COMPLETED
-        job.output_file_path = str(srt_rel_path) # Store SRT path as the main output
-        job.error_message = None
-        # Consider storing txt_rel_path in a new field or a JSON structure in job.results if needed.
-        logger.info(f"Transcription successful for job_id: {job_id}. SRT: {srt_rel_path}, TXT: {txt_rel_path}")
-        logger.info(f"Transcript for job_id: {job_id} (language: {language}) saved to database.")
-        return {"job_id": job_id, "srt_path": str(srt_rel_path), "txt_path": str(txt_rel_path), "status": "COMPLETED", "language": language}
 
     except FileNotFoundError as e:
         logger.error(f"File not found during transcription for job {job_id}: {e}", exc_info=True)
         if job: job.error_message = f"File not found: {e}"
         raise
-    except RuntimeError as e: # transcribe_audio can raise RuntimeError for model issues
+    except ValueError as e: # unknown engine
+        logger.error(f"Invalid transcription options for job {job_id}: {e}")
+        if job: job.error_message = str(e)
+        raise
+    except RuntimeError as e: # transcribe_segments can raise RuntimeError for model issues
         logger.error(f"Transcription runtime error for job {job_id}: {e}", exc_info=True)
         if job: job.error_message = f"Transcription runtime error: {str(e)[:500]}"
         raise
+    except ffmpeg.Error as e:
+        error_details = e.stderr.decode('utf8') if e.stderr else str(e)
+        logger.error(f"FFmpeg error while splitting audio for job {job_id}: {error_details}", exc_info=True)
+        if job: job.error_message = f"FFmpeg error: {error_details[:500]}"
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during transcription for job {job_id}: {e}", exc_info=True)
         if job: job.error_message = f"Unexpected error: {str(e)[:500]}"
@@ -267,4 +596,341 @@ def transcribe_audio_task(job_id: int, audio_input_path_str: str, output_basenam
         if job: db.commit()
         db.close()
 
+
+@celery_app.task(name="transcribe_chunk_task", acks_late=True, reject_on_worker_lost=True)
+def transcribe_chunk_task(
+    job_id: int,
+    audio_input_path_str: str,
+    chunk_data: dict,
+    engine: str | None = None,
+    batch_size: int | None = None,
+    beam_size: int | None = None,
+    vad: bool | None = None,
+    word_timestamps: bool | None = None,
+    language: str | None = None,
+    model_size: str | None = None,
+    compute_type: str | None = None,
+    output_basename: str | None = None,
+) -> dict:
+    """Transcribe one chunk and return its owned segments and speech spans in episode time.
+
+    With ``output_basename`` the result is also saved with the job's chunk
+    state, so a resumed job does not transcribe this chunk again.
+    """
+    chunk = Chunk.from_dict(chunk_data)
+    audio_input_path = DATA_ROOT / Path(audio_input_path_str)
+    logger.info(f"Job {job_id}: transcribing chunk {chunk.index} ({chunk.start:.1f}s - {chunk.end:.1f}s)")
+    started_at = time.time()
+    with tempfile.TemporaryDirectory(prefix=f"transcribe_{job_id}_") as tmp_dir:
+        chunk_path = extract_chunk_audio(audio_input_path, chunk, Path(tmp_dir) / f"chunk_{chunk.index:04d}.wav")
+        result = transcribe_segments(
+            chunk_path, model_size=model_size, compute_type=compute_type, engine=engine, batch_size=batch_size,
+            beam_size=beam_size, vad=vad, word_timestamps=word_timestamps, language=language,
+        )
+    owned = offset_segments(result.segments, chunk)
+
+    # Commit the chunk right away so the partial transcript grows as chunks finish.
+    db = SessionLocal()
+    try:
+        store_chunk_segments(db, job_id, owned, chunk.keep_start, chunk.keep_end)
+    finally:
+        db.close()
+    chunk_result = {
+        "index": chunk.index,
+        "language": result.language,
+        "seconds": chunk.keep_end - chunk.keep_start,
+        "episode_end": chunk.keep_end,
+        "segments": [s.to_dict() for s in owned],
+        "speech": offset_speech(result.speech, chunk),
+        "metrics": result.metrics(),
+        "started_at": started_at,
+        "finished_at": time.time(),
+    }
+    if output_basename:
+        save_chunk_result(chunk_state_dir(output_basename, TRANSCRIPT_DIR), chunk_result)
+    return chunk_result
+
+
+def _chunked_metrics(chunk_results: list[dict]) -> dict:
+    """Aggregate per-chunk timings: total processing time per audio second and
+    wall-clock time per episode second (the latter shows the parallel speed-up)."""
+    metrics = [r["metrics"] for r in chunk_results]
+    audio_seconds = sum(m["audio_seconds"] for m in metrics)
+    episode_seconds = sum(r["seconds"] for r in chunk_results)
+    processing_seconds = sum(m["processing_seconds"] for m in metrics)
+    wall_seconds = max(r["finished_at"] for r in chunk_results) - min(r["started_at"] for r in chunk_results)
+    return {
+        "engine": ",".join(sorted({m["engine"] for m in metrics})),
+        "beam_size": metrics[0]["beam_size"],
+        "batch_size": metrics[0]["batch_size"],
+        "chunks": len(chunk_results),
+        "audio_seconds": round(audio_seconds, 3),
+        "processing_seconds": round(processing_seconds, 3),
+        "realtime_factor": round(processing_seconds / audio_seconds, 4) if audio_seconds else None,
+        "vad": any(m.get("vad") for m in metrics),
+        "speech_seconds": round(sum(m.get("speech_seconds", 0.0) for m in metrics), 3),
+        "skipped_seconds": round(sum(m.get("skipped_seconds", 0.0) for m in metrics), 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "wall_realtime_factor": round(wall_seconds / episode_seconds, 4) if episode_seconds else None,
+    }
+
+
+@celery_app.task(name="merge_transcript_chunks_task", base=BaseTaskWithDB)
+def merge_transcript_chunks_task(chunk_results: list[dict], job_id: int, output_basename: str, cache_key: str | None = None):
+    """Chord callback: stitch the chunk transcripts and store the result.
+
+    Chunks finished by an earlier attempt of a resumed job are read from the
+    job's chunk state.
+    """
+    db = SessionLocal()
+    job = None
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job:
+            logger.error(f"Job {job_id} not found when merging transcript chunks.")
+            raise ValueError(f"Job {job_id} not found.")
+        state_dir = chunk_state_dir(output_basename, TRANSCRIPT_DIR)
+        by_index = {**load_chunk_results(state_dir), **{r["index"]: r for r in chunk_results}}
+        chunk_results = [by_index[index] for index in sorted(by_index)]
+        segments = merge_chunk_segments(
+            [[Segment.from_dict(s) for s in r["segments"]] for r in chunk_results]
+        )
+        language = majority_language([(r["language"], r["seconds"]) for r in chunk_results])
+        logger.info(f"Job {job_id}: merged {len(chunk_results)} chunks into {len(segments)} segments")
+        job.update_metrics(transcription=_chunked_metrics(chunk_results))
+        replace_segments(db, job_id, segments)
+        speech = merge_speech([r["speech"] for r in chunk_results])
+        duration = max(r["episode_end"] for r in chunk_results)
+        has_words = any(s.words is not None for s in segments)
+        stored = _store_transcript(
+            db, job, output_basename, segments, language, speech, duration, segments if has_words else None,
+            cache_key=cache_key,
+        )
+        clear_chunk_state(state_dir)
+        return stored
+    except Exception as e:
+        logger.error(f"Error merging transcript chunks for job {job_id}: {e}", exc_info=True)
+        if job:
+            job.status = JobStatus.FAILED
+            job.error_message = f"Merging transcript failed: {str(e)[:500]}"
+        raise
+    finally:
+        if job: db.commit()
+        db.close()
+
+
+@celery_app.task(name="transcription_chunks_failed_task")
+def transcription_chunks_failed_task(request, exc, traceback, job_id: int):
+    """Chord error callback: a chunk failed, so the transcription job fails."""
+    logger.error(f"Chunked transcription failed for job {job_id}: {exc}")
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if job:
+            job.status = JobStatus.FAILED
+            job.error_message = f"Chunk transcription failed: {str(exc)[:500]}"
+            db.commit()
+    finally:
+        db.close()
+
+
+@celery_app.task(name="whisper_model_stats_task")
+def whisper_model_stats_task():
+    """Return the Whisper model registry stats of the worker process that runs it."""
+    return whisper_registry.stats()
+
+# --- LLM Suggestions Task ---
+# A chunked transcription task returns before its chunks are merged, so the
+# stages after it poll for the transcript (for up to an hour).
+PIPELINE_WAIT_SECONDS = 15
+PIPELINE_MAX_WAITS = 240
+
+
+@celery_app.task(name="generate_suggestions_task", base=BaseTaskWithDB, bind=True, max_retries=PIPELINE_MAX_WAITS)
+def generate_suggestions_task(self, job_id: int, transcription_job_id: int | None = None, prompt_type: str = "title_summary", force: bool = False):
+    """Generate titles/summary and store them as an LLMSuggestion linked to this job.
+
+    The transcript comes from ``transcription_job_id`` (waited for if it is
+    still running) or, without one, from the job's input file (text submitted
+    to ``/api/llm/suggest/from_text?background=true``).
+    """
+    logger.info(f"Starting LLM suggestions for job_id: {job_id} (transcription job {transcription_job_id}, prompt type {prompt_type})")
+    db = SessionLocal()
+    job = None
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job:
+            logger.error(f"Job {job_id} not found for LLM suggestions.")
+            raise ValueError(f"Job {job_id} not found.")
+        if transcription_job_id is not None:
+            transcription_job = db.query(ProcessingJob).filter(ProcessingJob.id == transcription_job_id).first()
+            if not transcription_job or transcription_job.status == JobStatus.FAILED:
+                raise ValueError(f"Transcription job {transcription_job_id} is missing or failed.")
+            if transcription_job.status != JobStatus.COMPLETED:
+                logger.info(f"Job {job_id}: transcription {transcription_job_id} still running, checking again in {PIPELINE_WAIT_SECONDS}s")
+                raise self.retry(countdown=PIPELINE_WAIT_SECONDS)
+
+        job.status = JobStatus.PROCESSING
+        db.commit()
+
+        if transcription_job_id is not None:
+            transcript = job_transcript_text(db, transcription_job)
+        else:
+            if not job.input_file_path:
+                raise ValueError(f"Job {job_id} has neither a transcription job nor an input file.")
+            transcript = (DATA_ROOT / job.input_file_path).read_text(encoding="utf-8")
+        if not transcript.strip():
+            raise ValueError(f"Transcript for job {job_id} is empty")
+
+        def store(suggestions: dict, generation_usage: dict) -> int:
+            # Stored against the transcription job, like suggestions requested through the API.
+            # Committed, so that identical requests coalesced with this one can load it.
+            key = suggestion_key(transcript, prompt_type)
+            suggestion = LLMSuggestion(
+                job_id=transcription_job_id,
+                llm_job_id=job_id,
+                prompt_type=prompt_type,
+                model_used=key.model,
+                titles=suggestions.get("titles"),
+                suggested_summary=suggestions.get("summary"),
+                transcript_hash=key.transcript_hash,
+                prompt_version=key.prompt_version,
+                prompt_tokens_estimated=generation_usage.get("prompt_tokens_estimated"),
+                prompt_tokens=generation_usage.get("prompt_tokens"),
+                prompt_eval_ms=prompt_eval_ms(generation_usage),
+                backend=generation_usage.get("backend"),
+            )
+            db.add(suggestion)
+            db.commit()
+            suggestion_cache.record_stored(key, suggestion.id)
+            return suggestion.id
+
+        usage = {}
+        try:
+            suggestions = run_in_worker_loop(
+                generate_suggestions(transcript, prompt_type, force=force, db=db, usage=usage, store=store)
+            )
+        except (OllamaBusy, OllamaUnavailable) as e:
+            logger.warning(f"Job {job_id}: {e}; retrying in {e.retry_after}s")
+            job.status = JobStatus.PENDING
+            raise self.retry(countdown=e.retry_after)
+        if suggestions.get("error"):
+            raise RuntimeError(f"Error from LLM service: {suggestions.get('details') or suggestions.get('error')}")
+
+        # The row of a cache hit or of an identical request in flight is reused rather than copied.
+        suggestion = db.get(LLMSuggestion, usage["suggestion_id"]) if usage.get("suggestion_id") is not None else None
+        if suggestion is None or suggestion.job_id != transcription_job_id:
+            suggestion = db.get(LLMSuggestion, store(suggestions, usage))
+        job.status = JobStatus.COMPLETED
+        job.error_message = None
+        job.update_metrics(llm={"suggestion_id": suggestion.id, "prompt_type": prompt_type, **usage})
+        logger.info(f"LLM suggestions for job_id: {job_id} stored as suggestion {suggestion.id}")
+        return {"job_id": job_id, "suggestion_id": suggestion.id, "status": "COMPLETED"}
+
+    except Retry:
+        raise
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Cannot generate suggestions for job {job_id}: {e}")
+        if job: job.error_message = str(e)[:500]
+        raise
+    except Exception as e:
+        logger.error(f"Error generating LLM suggestions for job {job_id}: {e}", exc_info=True)
+        if job: job.error_message = f"LLM suggestions failed: {str(e)[:500]}"
+        raise
+    finally:
+        if job: db.commit()
+        db.close()
+
+
+# --- Episode Pipelines ---
+def build_pipeline_workflow(
+    pipeline: Pipeline,
+    audio_task_kwargs: dict,
+    transcription_task_kwargs: dict | None = None,
+    suggestion_task_kwargs: dict | None = None,
+    video_task_kwargs: dict | None = None,
+):
+    """Return the Celery canvas for ``pipeline``.
+
+    Audio processing runs first; transcription (then suggestions) and the
+    video render run in parallel on their own queues, and a chord callback
+    records the outcome, so an episode takes as long as its critical path.
+    Stage tasks are immutable signatures: each gets its inputs up front.
+    """
+    branches = []
+    if transcription_task_kwargs is not None:
+        transcription = transcribe_audio_task.si(**transcription_task_kwargs)
+        if suggestion_task_kwargs is not None:
+            transcription = chain(transcription, generate_suggestions_task.si(**suggestion_task_kwargs))
+        branches.append(transcription)
+    if video_task_kwargs is not None:
+        branches.append(generate_video_task.si(**video_task_kwargs))
+
+    steps = [process_audio_task.si(**audio_task_kwargs)]
+    if branches:
+        steps.append(group(branches))
+    steps.append(finalize_pipeline_task.si(pipeline.id))
+    return chain(*steps).on_error(pipeline_failed_task.s(pipeline.id))
+
+
+# The stage each pipeline stage needs the output of.
+PIPELINE_STAGE_DEPENDS_ON = {"transcription": "audio", "suggestions": "transcription", "video": "audio"}
+
+
+def _pipeline_stage_jobs(db, pipeline: Pipeline) -> dict[str, ProcessingJob]:
+    job_ids = pipeline.stage_job_ids()
+    jobs = {job.id: job for job in db.query(ProcessingJob).filter(ProcessingJob.id.in_(job_ids.values())).all()}
+    return {stage: jobs[job_id] for stage, job_id in job_ids.items() if job_id in jobs}
+
+
+@celery_app.task(name="finalize_pipeline_task", bind=True, max_retries=PIPELINE_MAX_WAITS)
+def finalize_pipeline_task(self, pipeline_id: int):
+    """Chord callback: record the pipeline's aggregated status once every stage is done."""
+    db = SessionLocal()
+    try:
+        pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
+        if not pipeline:
+            logger.error(f"Pipeline {pipeline_id} not found for finalization.")
+            return None
+        stages = _pipeline_stage_jobs(db, pipeline)
+        status = aggregate_status([job.status for job in stages.values()])
+        if status in (JobStatus.PENDING, JobStatus.PROCESSING):
+            # A chunked transcription without a suggestions stage is completed by its own chord.
+            raise self.retry(countdown=PIPELINE_WAIT_SECONDS)
+        pipeline.status = status
+        pipeline.completed_at = datetime.utcnow()
+        if status == JobStatus.FAILED:
+            failed = [stage for stage, job in stages.items() if job.status == JobStatus.FAILED]
+            pipeline.error_message = f"Failed stages: {', '.join(failed)}"
+        db.commit()
+        logger.info(f"Pipeline {pipeline_id} finished with status {status.value}")
+        return {"pipeline_id": pipeline_id, "status": status.value}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="pipeline_failed_task")
+def pipeline_failed_task(request, exc, traceback, pipeline_id: int):
+    """Error callback: a stage failed, so the stages depending on it will never run.
+
+    Independent branches keep running; the pipeline is marked failed right away.
+    """
+    logger.error(f"Pipeline {pipeline_id} failed: {exc}")
+    db = SessionLocal()
+    try:
+        pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
+        if not pipeline:
+            return
+        stages = _pipeline_stage_jobs(db, pipeline)
+        for stage, job in stages.items():  # in pipeline order, so skips cascade
+            upstream = stages.get(PIPELINE_STAGE_DEPENDS_ON.get(stage))
+            if job.status == JobStatus.PENDING and upstream is not None and upstream.status == JobStatus.FAILED:
+                job.status = JobStatus.FAILED
+                job.error_message = f"Skipped: the {PIPELINE_STAGE_DEPENDS_ON[stage]} stage failed."
+        pipeline.status = JobStatus.FAILED
+        pipeline.error_message = f"Pipeline stage failed: {str(exc)[:500]}"
+        db.commit()
+    finally:
+        db.close()
+
 logger.info("Celery tasks defined and logging configured.")
@@ -40,3 +40,17 @@ def test_get_job(mock_session_local):
     data = response.json()
     assert data["id"] == 5
     assert data["output_file_path"] == "processed/5.mp3"
+
+
+@patch("app.api.routes_jobs.SessionLocal")
+def test_get_job_includes_metrics(mock_session_local):
+    mock_db = MagicMock()
+    mock_session_local.return_value = mock_db
+    mock_job = ProcessingJob(id=6, job_type="transcription", status=JobStatus.COMPLETED, created_at=datetime.utcnow())
+    mock_job.update_metrics(transcription={"engine": "batched", "realtime_factor": 0.12})
+    mock_db.query.return_value.filter.return_value.first.return_value = mock_job
+
+    response = client.get("/api/jobs/6")
+
+    assert response.status_code == 200
+    assert response.json()["metrics"] == {"transcription": {"engine": "batched", "realtime_factor": 0.12}}
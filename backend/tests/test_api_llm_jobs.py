@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.main import app
+from app.models.job import JobStatus, ProcessingJob
+from app.models.llm import LLMSuggestion
+from app.services import suggestion_cache
+from app.workers.tasks import generate_suggestions_task
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(ProcessingJob(id=1, job_type="transcription", status=JobStatus.COMPLETED, created_at=datetime.utcnow()))
+    db.add(ProcessingJob(id=2, job_type="transcription", status=JobStatus.PROCESSING, created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+    with patch("app.api.routes_llm.SessionLocal", factory), \
+            patch("app.api.routes_jobs.SessionLocal", factory), \
+            patch("app.workers.tasks.SessionLocal", factory), \
+            patch("app.api.routes_llm.DATA_ROOT", tmp_path), \
+            patch("app.api.routes_llm.LLM_INPUT_DIR", tmp_path / "llm_inputs"), \
+            patch("app.workers.tasks.DATA_ROOT", tmp_path):
+        yield factory
+
+
+def test_background_suggestion_from_job_is_queued(session_factory):
+    with patch("app.api.routes_llm.generate_suggestions_task") as task:
+        response = client.post("/api/llm/suggest/from_job/1?background=true&force=true")
+        not_ready = client.post("/api/llm/suggest/from_job/2?background=true")
+
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+    task.delay.assert_called_once_with(job_id=job_id, transcription_job_id=1, prompt_type="title_summary", force=True)
+    assert not_ready.status_code == 400
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert (job["job_type"], job["status"]) == ("llm_suggestion", "PENDING")
+
+
+def test_background_suggestion_from_text_runs_in_worker(session_factory):
+    async def fake_generate(transcript, prompt_type, force=False, db=None, usage=None, store=None):
+        assert transcript == "An episode about bees."
+        usage["prompt_tokens"] = 12
+        return {"titles": ["Bees"], "summary": "Bees."}
+
+    with patch("app.api.routes_llm.generate_suggestions_task") as task:
+        response = client.post("/api/llm/suggest/from_text?background=true", content="An episode about bees.")
+    job_id = response.json()["job_id"]
+    assert task.delay.call_args.kwargs["transcription_job_id"] is None
+
+    with patch("app.workers.tasks.generate_suggestions", fake_generate):
+        result = generate_suggestions_task.run(**task.delay.call_args.kwargs)
+
+    db = session_factory()
+    suggestion = db.query(LLMSuggestion).one()
+    job = db.get(ProcessingJob, job_id)
+    assert result["suggestion_id"] == suggestion.id
+    assert (suggestion.llm_job_id, suggestion.job_id, suggestion.prompt_tokens) == (job_id, None, 12)
+    assert job.status == JobStatus.COMPLETED
+    assert job.get_metrics()["llm"]["suggestion_id"] == suggestion.id
+    db.close()
+
+
+def test_repeated_suggestion_reuses_the_stored_row(session_factory):
+    suggestion_cache.memory_cache.clear()
+    reply = MagicMock()
+    reply.json.return_value = {"response": json.dumps({"titles": ["Bees"], "summary": "Bees."})}
+    post = AsyncMock(return_value=reply)
+
+    with patch("httpx.AsyncClient.post", post), patch("app.services.single_flight.get_redis", return_value=None):
+        first = client.post("/api/llm/suggest/from_text", content="An episode about bees.")
+        second = client.post("/api/llm/suggest/from_text", content="An episode about bees.")
+        multi = client.post("/api/llm/suggest/from_text/multi?prompt_types=title_summary", content="An episode about bees.")
+    suggestion_cache.memory_cache.clear()
+
+    post.assert_awaited_once()
+    suggestion_id = first.json()["suggestion_id"]
+    assert second.json()["suggestion_id"] == suggestion_id
+    assert multi.json()["suggestions"][0]["suggestion_id"] == suggestion_id
+    db = session_factory()
+    assert db.query(LLMSuggestion).count() == 1
+    db.close()
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.main import app
+from app.models.job import JobStatus, ProcessingJob
+from app.models.llm import LLMSuggestion
+from app.models.transcript import Transcript
+from app.services.ollama_admission import OllamaBusy
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(ProcessingJob(id=1, job_type="transcription", status=JobStatus.COMPLETED, created_at=datetime.utcnow()))
+    db.add(Transcript(id=1, processing_job_id=1, text_content="An episode about bees.", created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+    with patch("app.api.routes_llm.SessionLocal", factory):
+        yield factory
+
+
+def parse_events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        name, data = frame.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def fake_stream(transcript, prompt_type, force=False, db=None, usage=None):
+    usage.update(prompt_tokens_estimated=30, prompt_tokens=28, first_token_seconds=0.2)
+    yield {"event": "token", "text": '{"titles": ["Bees"], '}
+    yield {"event": "token", "text": '"summary": "Bees."}'}
+    yield {"event": "result", "suggestions": {"titles": ["Bees"], "summary": "Bees."}}
+
+
+def test_stream_from_job_sends_tokens_then_stored_result(session_factory):
+    with patch("app.api.routes_llm.stream_suggestions", fake_stream):
+        response = client.post("/api/llm/suggest/from_job/1/stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["token", "token", "result"]
+    result = events[-1][1]
+    assert result["titles"] == ["Bees"] and result["prompt_tokens"] == 28
+    assert result["first_token_seconds"] == 0.2
+
+    db = session_factory()
+    stored = db.query(LLMSuggestion).one()
+    assert (stored.job_id, stored.suggested_summary, stored.prompt_tokens_estimated) == (1, "Bees.", 30)
+    db.close()
+
+
+def test_stream_rejects_unknown_job_and_prompt_type(session_factory):
+    assert client.post("/api/llm/suggest/from_job/99/stream").status_code == 404
+    assert client.post("/api/llm/suggest/from_text/stream?transcript_text=hi&prompt_type=poem").status_code == 400
+
+
+def test_busy_ollama_is_reported_with_retry_after(session_factory):
+    async def busy(*args, **kwargs):
+        raise OllamaBusy("Ollama is busy", retry_after=42)
+        yield  # pragma: no cover - makes this an async generator
+
+    with patch("app.api.routes_llm.generate_suggestions", side_effect=OllamaBusy("Ollama is busy", retry_after=42)):
+        response = client.post("/api/llm/suggest/from_job/1")
+    with patch("app.api.routes_llm.stream_suggestions", busy):
+        stream = client.post("/api/llm/suggest/from_job/1/stream")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "42"
+    assert parse_events(stream.text) == [("error", {"detail": "Ollama is busy", "retry_after": 42})]
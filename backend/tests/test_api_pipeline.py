@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from unittest.mock import patch
+
+from app.db.base import Base
+from app.main import app
+from app.models.job import JobStatus, ProcessingJob
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    (tmp_path / "uploads" / "session-1").mkdir(parents=True)
+    (tmp_path / "uploads" / "session-1" / "main.wav").write_bytes(b"audio")
+    with patch("app.api.routes_pipeline.SessionLocal", sessionmaker(bind=engine)), \
+            patch("app.api.routes_pipeline.DATA_ROOT", tmp_path), \
+            patch("app.api.routes_pipeline.UPLOAD_DIR", tmp_path / "uploads"), \
+            patch("app.api.routes_pipeline.PROCESSED_DIR", tmp_path / "processed"):
+        yield tmp_path
+
+
+def test_start_pipeline_queues_every_stage(data_root):
+    with patch("app.api.routes_pipeline.build_pipeline_workflow") as build:
+        response = client.post("/api/pipeline/session-1?language=de")
+
+    assert response.status_code == 200
+    jobs = response.json()["jobs"]
+    assert list(jobs) == ["audio", "transcription", "suggestions", "video"]
+    _, audio, transcription, suggestion, video = build.call_args.args
+    assert audio["input_paths_str"] == ["uploads/session-1/main.wav"]
+    assert transcription["audio_input_path_str"] == video["audio_input_path_str"] == f"processed/{jobs['audio']}_processed.mp3"
+    assert transcription["language"] == "de"
+    assert suggestion["transcription_job_id"] == jobs["transcription"]
+    build.return_value.apply_async.assert_called_once()
+
+    pipeline = client.get(f"/api/pipeline/{response.json()['pipeline_id']}").json()
+    assert pipeline["status"] == "PENDING"
+    assert [s["stage"] for s in pipeline["stages"]] == ["audio", "transcription", "suggestions", "video"]
+
+
+def test_start_pipeline_validates_options(data_root):
+    with patch("app.api.routes_pipeline.build_pipeline_workflow") as build:
+        assert client.post("/api/pipeline/missing").status_code == 404
+        assert client.post("/api/pipeline/session-1?transcribe=false").status_code == 400
+        assert client.post("/api/pipeline/session-1?prompt_type=poem").status_code == 400
+        assert client.post("/api/pipeline/session-1?resolution=../1x1").status_code == 400
+        video_only = client.post("/api/pipeline/session-1?transcribe=false&suggestions=false")
+
+    assert list(video_only.json()["jobs"]) == ["audio", "video"]
+    assert build.call_count == 1
@@ -0,0 +1,178 @@
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from unittest.mock import patch
+
+from app.db.base import Base
+from app.main import app
+from app.models.job import ProcessingJob, JobStatus
+from app.models.transcript import Transcript
+from app.models.transcript_segment import TranscriptSegment
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(ProcessingJob(id=1, job_type="transcription", status=JobStatus.COMPLETED, created_at=datetime.utcnow()))
+    db.add(Transcript(id=7, processing_job_id=1, language="en", created_at=datetime.utcnow()))
+    db.add_all(
+        TranscriptSegment(processing_job_id=1, transcript_id=7, start=i * 10.0, end=i * 10.0 + 9.5, text=f"segment {i}")
+        for i in range(25)
+    )
+    db.commit()
+    db.close()
+    with patch("app.api.routes_transcription.SessionLocal", factory):
+        yield factory
+
+
+def test_transcript_info(session_factory):
+    response = client.get("/api/transcription/transcripts/7")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_id"] == 1
+    assert data["segment_count"] == 25
+    assert data["duration"] == 249.5
+
+
+def test_segments_paginate_with_cursor(session_factory):
+    first = client.get("/api/transcription/transcripts/7/segments?limit=10").json()
+    second = client.get(f"/api/transcription/transcripts/7/segments?limit=10&cursor={first['next_cursor']}").json()
+    third = client.get(f"/api/transcription/transcripts/7/segments?limit=10&cursor={second['next_cursor']}").json()
+
+    texts = [s["text"] for page in (first, second, third) for s in page["segments"]]
+    assert texts == [f"segment {i}" for i in range(25)]
+    assert third["next_cursor"] is None
+
+
+def test_segments_time_range(session_factory):
+    response = client.get("/api/transcription/transcripts/7/segments?start=35&end=60")
+
+    assert [s["text"] for s in response.json()["segments"]] == ["segment 3", "segment 4", "segment 5"]
+
+
+def test_export_vtt_streams_time_range(session_factory):
+    response = client.get("/api/transcription/transcripts/7/export.vtt?start=0&end=20")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/vtt")
+    assert response.text == (
+        "WEBVTT\n\n00:00:00.000 --> 00:00:09.500\nsegment 0\n"
+        "\n00:00:10.000 --> 00:00:19.500\nsegment 1\n"
+    )
+
+
+def test_export_unknown_format_and_transcript(session_factory):
+    assert client.get("/api/transcription/transcripts/7/export.docx").status_code == 400
+    assert client.get("/api/transcription/transcripts/99/export.srt").status_code == 404
+
+
+def test_words_endpoint_reads_time_range(session_factory, tmp_path):
+    from app.services.transcription import Segment
+    from app.services.word_store import save_words
+
+    save_words([Segment(0.0, 2.0, "hello there", words=[[0.0, 0.8, "hello"], [1.0, 2.0, "there"]])], tmp_path / "7.words")
+    db = session_factory()
+    db.query(Transcript).filter(Transcript.id == 7).update({Transcript.words_path: "7.words"})
+    db.commit()
+    db.close()
+
+    with patch("app.api.routes_transcription.DATA_ROOT", tmp_path):
+        response = client.get("/api/transcription/transcripts/7/words?start=0.9")
+
+    assert response.status_code == 200
+    assert response.json()["words"] == [{"start": 1.0, "end": 2.0, "word": "there"}]
+
+
+def test_words_endpoint_without_word_timestamps(session_factory):
+    assert client.get("/api/transcription/transcripts/7/words").status_code == 404
+
+
+def test_cache_stats(session_factory):
+    response = client.get("/api/transcription/cache/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {"lookups": 0, "hits": 0, "misses": 0, "hit_rate": None}
+
+
+def test_start_pins_show_default_language(session_factory, tmp_path):
+    from app.models.show import Show
+
+    (tmp_path / "processed").mkdir()
+    (tmp_path / "processed" / "episode.wav").write_bytes(b"audio")
+    db = session_factory()
+    db.add(ProcessingJob(id=2, job_type="audio_processing", status=JobStatus.COMPLETED,
+                         output_file_path="processed/episode.wav", created_at=datetime.utcnow()))
+    db.add(Show(name="Weekly", default_language="de"))
+    db.commit()
+    db.close()
+
+    with patch("app.api.routes_transcription.DATA_ROOT", tmp_path), \
+            patch("app.api.routes_transcription.transcribe_audio_task") as task:
+        response = client.post("/api/transcription/start/2?show=Weekly")
+        explicit = client.post("/api/transcription/start/2?show=Weekly&language=EN")
+        invalid = client.post("/api/transcription/start/2?language=english")
+
+    assert response.status_code == 200 and explicit.status_code == 200
+    assert [c.kwargs["language"] for c in task.delay.call_args_list] == ["de", "en"]
+    assert invalid.status_code == 400
+
+
+def test_start_selects_model_and_compute_type(session_factory, tmp_path):
+    (tmp_path / "processed").mkdir()
+    (tmp_path / "processed" / "episode.wav").write_bytes(b"audio")
+    db = session_factory()
+    db.add(ProcessingJob(id=2, job_type="audio_processing", status=JobStatus.COMPLETED,
+                         output_file_path="processed/episode.wav", created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    with patch("app.api.routes_transcription.DATA_ROOT", tmp_path), \
+            patch("app.api.routes_transcription.transcribe_audio_task") as task:
+        response = client.post("/api/transcription/start/2?model=small.en&compute_type=float32")
+        unknown_model = client.post("/api/transcription/start/2?model=../../weights")
+        unknown_type = client.post("/api/transcription/start/2?compute_type=int3")
+
+    assert response.status_code == 200
+    assert (task.delay.call_args.kwargs["model_size"], task.delay.call_args.kwargs["compute_type"]) == (
+        "small.en", "float32"
+    )
+    assert unknown_model.status_code == 400 and unknown_type.status_code == 400
+    assert task.delay.call_count == 1
+
+
+def test_resume_requeues_with_the_original_options(session_factory, tmp_path):
+    (tmp_path / "processed").mkdir()
+    (tmp_path / "processed" / "episode.wav").write_bytes(b"audio")
+    db = session_factory()
+    db.add(ProcessingJob(id=2, job_type="audio_processing", status=JobStatus.COMPLETED,
+                         output_file_path="processed/episode.wav", created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    with patch("app.api.routes_transcription.DATA_ROOT", tmp_path), \
+            patch("app.api.routes_transcription.transcribe_audio_task") as task:
+        job_id = client.post(
+            "/api/transcription/start/2?chunked=true&engine=batched&beam_size=2&vad=true&model=small.en&language=de"
+        ).json()["job_id"]
+        started = task.delay.call_args.kwargs
+        db = session_factory()
+        db.get(ProcessingJob, job_id).status = JobStatus.FAILED
+        db.commit()
+        db.close()
+        response = client.post(f"/api/transcription/{job_id}/resume")
+
+    assert response.status_code == 200
+    resumed = task.delay.call_args.kwargs
+    assert resumed == started
+    assert (resumed["chunked"], resumed["engine"], resumed["model_size"], resumed["language"]) == (
+        True, "batched", "small.en", "de"
+    )
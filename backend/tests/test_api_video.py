@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from unittest.mock import patch
+
+from app.db.base import Base
+from app.main import app
+from app.models.job import JobStatus, ProcessingJob
+from app.services import background_assets
+
+client = TestClient(app)
+ASSET = "a" * 64
+
+
+@pytest.fixture
+def audio_job(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    job = ProcessingJob(job_type="audio_processing", status=JobStatus.COMPLETED, output_file_path="processed/1.mp3")
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.close()
+    (tmp_path / "backgrounds" / ASSET).mkdir(parents=True)
+    (tmp_path / "backgrounds" / ASSET / "1280x720.png").write_bytes(b"png")
+    with patch("app.api.routes_video.SessionLocal", Session), \
+            patch.object(background_assets, "BACKGROUNDS_DIR", tmp_path / "backgrounds"), \
+            patch("app.api.routes_video.generate_video_task") as task:
+        yield job_id, task, Session
+
+
+def test_process_video_rejects_malformed_background_hash(audio_job):
+    job_id, task, Session = audio_job
+
+    for bad in ("../../etc", "A" * 64, "a" * 63):
+        response = client.post(f"/api/video/process/{job_id}", params={"background_hash": bad})
+        assert response.status_code == 400
+
+    task.delay.assert_not_called()
+
+
+def test_process_video_requires_a_registered_background(audio_job):
+    job_id, task, Session = audio_job
+
+    missing = client.post(f"/api/video/process/{job_id}", params={"background_hash": "b" * 64})
+    assert missing.status_code == 404
+    assert Session().query(ProcessingJob).count() == 1  # no job was created
+
+    found = client.post(f"/api/video/process/{job_id}", params={"background_hash": ASSET})
+    assert found.status_code == 200
+    assert task.delay.call_args.kwargs["background_asset_hash"] == ASSET
+
+
+def test_process_video_validates_resolution(audio_job):
+    job_id, task, Session = audio_job
+
+    for bad in ("1280", "1280x720x3", "-1x720", "8x8", "99999x720", "1281x720"):
+        response = client.post(f"/api/video/process/{job_id}", params={"resolution": bad})
+        assert response.status_code == 400
+
+    assert client.post(f"/api/video/process/{job_id}", params={"resolution": "1920x1080"}).status_code == 200
+    assert task.delay.call_args.kwargs["resolution"] == "1920x1080"
@@ -26,3 +26,16 @@ def test_n8n_settings(monkeypatch):
 
     assert config_module.settings.N8N_WEBHOOK_URL == "http://n8n:5678/webhook/test"
     assert config_module.settings.N8N_API_KEY == "secret"
+
+
+def test_empty_ollama_keep_alive_is_kept(monkeypatch):
+    from importlib import reload
+    from app import config as config_module
+
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "")
+    reload(config_module)
+    assert config_module.settings.OLLAMA_KEEP_ALIVE == ""
+
+    monkeypatch.delenv("OLLAMA_KEEP_ALIVE")
+    reload(config_module)
+    assert config_module.settings.OLLAMA_KEEP_ALIVE == "30m"
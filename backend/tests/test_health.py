@@ -14,3 +14,11 @@ def test_health_endpoint() -> None:
     response = client.get("/api/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_metrics_endpoint() -> None:
+    """``/api/metrics`` reports the outbound HTTP pools per backend."""
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert set(response.json()["http_pools"]) == {"ollama", "n8n"}
@@ -0,0 +1,55 @@
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services import background_assets
+from app.services.background_assets import get_prepared_background, prepare_background
+
+
+@pytest.fixture
+def backgrounds_dir(tmp_path: Path):
+    target = tmp_path / "backgrounds"
+    with patch.object(background_assets, "BACKGROUNDS_DIR", target):
+        yield target
+
+
+@pytest.fixture
+def mock_ffmpeg_run():
+    def fake_run(stream, **kwargs):
+        # The last argument of the compiled command is the output file.
+        Path(stream.get_args()[-1]).write_bytes(b"png")
+
+    with patch("ffmpeg.run", side_effect=fake_run) as mock_run:
+        yield mock_run
+
+
+def test_prepare_background_scales_each_resolution_once(backgrounds_dir: Path, mock_ffmpeg_run, tmp_path: Path):
+    image = tmp_path / "cover.jpg"
+    image.write_bytes(b"artwork")
+
+    content_hash = prepare_background(image, resolutions=["1280x720", "640x360"])
+
+    assert (backgrounds_dir / content_hash / "1280x720.png").exists()
+    assert (backgrounds_dir / content_hash / "640x360.png").exists()
+    assert mock_ffmpeg_run.call_count == 2
+
+    # Same artwork uploaded again (e.g. for the next episode) is not re-scaled.
+    assert prepare_background(image, resolutions=["1280x720", "640x360"]) == content_hash
+    assert mock_ffmpeg_run.call_count == 2
+
+
+def test_get_prepared_background_prepares_missing_resolution(backgrounds_dir: Path, mock_ffmpeg_run, tmp_path: Path):
+    image = tmp_path / "cover.png"
+    image.write_bytes(b"artwork")
+    content_hash = prepare_background(image, resolutions=["1280x720"])
+
+    frame = get_prepared_background(content_hash, "1920x1080")
+
+    assert frame == backgrounds_dir / content_hash / "1920x1080.png"
+    assert frame.exists()
+    assert mock_ffmpeg_run.call_count == 2
+
+
+def test_get_prepared_background_unknown_hash(backgrounds_dir: Path):
+    with pytest.raises(FileNotFoundError):
+        get_prepared_background("0" * 64, "1280x720")
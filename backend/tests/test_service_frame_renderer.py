@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from pathlib import Path
+
+from app.services.frame_renderer import (
+    FrameRenderer,
+    batch_frames_for,
+    pack_rgb,
+    parse_color,
+    render_animated_video,
+)
+
+
+def make_renderer(style: str = "waveform", **kwargs) -> FrameRenderer:
+    return FrameRenderer(64, 32, fps=25, sample_rate=22050, style=style, batch_frames=4, n_fft=256, **kwargs)
+
+
+def test_parse_color():
+    assert parse_color("white") == (255, 255, 255)
+    assert parse_color("#ff8000") == (255, 128, 0)
+    assert parse_color("0x00FF00") == (0, 255, 0)
+    with pytest.raises(ValueError):
+        parse_color("not-a-colour")
+
+
+def test_pack_rgb_matches_rgb0_byte_order():
+    pixel = np.array([pack_rgb((1, 2, 3))], dtype="<u4")
+    assert pixel.view(np.uint8).tolist() == [1, 2, 3, 0]
+
+
+def test_render_silence_draws_centre_line():
+    renderer = make_renderer()
+    samples = np.zeros(renderer.samples_per_frame * 3, dtype=np.float32)
+
+    frames = renderer.render(samples)
+
+    assert frames.shape == (3, 32, 64)
+    assert set(np.unique(frames).tolist()) == {pack_rgb((0, 0, 0)), pack_rgb((255, 255, 255))}
+    # Only the centre row is foreground for silent audio.
+    lit_rows = np.unique(np.nonzero(frames == pack_rgb((255, 255, 255)))[1])
+    assert lit_rows.tolist() == [16]
+
+
+def test_render_reuses_frame_buffer():
+    renderer = make_renderer()
+    samples = np.random.default_rng(0).uniform(-1, 1, renderer.samples_per_frame * 4).astype(np.float32)
+
+    first = renderer.render(samples)
+    second = renderer.render(samples)
+
+    assert np.shares_memory(first, renderer.frames)
+    assert np.shares_memory(second, renderer.frames)
+
+
+def test_batch_size_follows_the_memory_budget():
+    assert batch_frames_for(1920, 1080, budget_mb=64, max_frames=16) == 6
+    assert batch_frames_for(1280, 720, budget_mb=64, max_frames=16) == 14
+    assert batch_frames_for(640, 360, budget_mb=64, max_frames=16) == 16
+    assert batch_frames_for(3840, 2160, budget_mb=1, max_frames=16) == 1
+
+
+def test_spectrum_tone_is_louder_than_silence():
+    renderer = make_renderer(style="spectrum", fg_color="red", bg_color="black")
+    t = np.arange(renderer.samples_per_frame * 4) / renderer.sample_rate
+    tone = (0.8 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+
+    red = pack_rgb((255, 0, 0))
+    lit_tone = (renderer.render(tone) == red).sum()
+    lit_silence = (renderer.render(np.zeros_like(tone)) == red).sum()
+
+    assert lit_tone > lit_silence
+
+
+def test_renderer_rejects_unknown_style():
+    with pytest.raises(ValueError):
+        make_renderer(style="bars")
+
+
+def test_render_animated_video_file_not_found(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        render_animated_video(tmp_path / "missing.mp3", tmp_path / "out.mp4", "640x360", "white", "black")
@@ -0,0 +1,68 @@
+import asyncio
+import functools
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services import http_clients
+
+
+@pytest.fixture(autouse=True)
+def mock_transport():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503 if request.url.path == "/down" else 200, json={"ok": True})
+
+    client_class = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    with patch.object(http_clients, "_clients", {}), \
+            patch.object(http_clients, "_counters", {b: http_clients.Counter() for b in http_clients.BACKENDS}), \
+            patch("app.services.http_clients.httpx.AsyncClient", client_class):
+        yield
+
+
+def test_client_is_shared_within_a_loop():
+    async def both():
+        return http_clients.get_client("ollama"), http_clients.get_client("ollama"), http_clients.get_client("n8n")
+
+    first, again, n8n = http_clients.run_in_worker_loop(both())
+    later, _, _ = http_clients.run_in_worker_loop(both())
+
+    assert first is again is later
+    assert first is not n8n
+    assert http_clients.pool_stats()["ollama"]["clients_created"] == 1
+
+
+def test_each_loop_gets_its_own_client_and_closes_it():
+    async def use_and_close():
+        client = http_clients.get_client("ollama")
+        await http_clients.aclose_clients()
+        return client
+
+    first = asyncio.run(use_and_close())
+    second = asyncio.run(use_and_close())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert http_clients.pool_stats()["ollama"]["clients"] == 0
+
+
+def test_pool_stats_counts_requests():
+    async def calls():
+        client = http_clients.get_client("n8n")
+        await client.post("http://n8n/webhook", json={})
+        await client.get("http://n8n/down")
+        await http_clients.aclose_clients()
+
+    asyncio.run(calls())
+
+    stats = http_clients.pool_stats()["n8n"]
+    assert (stats["requests"], stats["responses"], stats["in_flight"], stats["server_errors"]) == (2, 2, 0, 1)
+    assert stats["max_connections"] == http_clients.settings.HTTP_POOL_MAX_CONNECTIONS
+
+
+def test_unknown_backend():
+    async def unknown():
+        http_clients.get_client("openai")
+
+    with pytest.raises(ValueError):
+        asyncio.run(unknown())
@@ -6,6 +6,13 @@ import json
 # Import the function to test and the settings
 from app.services.llm import generate_suggestions, PROMPT_TEMPLATES
 from app.config import settings
+from app.services import suggestion_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_suggestion_cache():
+    # Tests reuse the same transcript; each must reach the (mocked) Ollama call.
+    suggestion_cache.memory_cache.clear()
 
 # --- Test Cases ---
 
@@ -0,0 +1,113 @@
+import asyncio
+from json import dumps
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.base import Base
+from app.models.llm import LLMPartialSummary
+from app.services import suggestion_cache
+from app.services.llm import generate_suggestions, summarize_chunks
+
+LONG_TRANSCRIPT = "\n\n".join(f"Segment {i}: " + "talking about the topic " * 10 for i in range(40))
+
+
+@pytest.fixture(autouse=True)
+def small_budget():
+    suggestion_cache.memory_cache.clear()
+    with patch.object(settings, "LLM_MAP_REDUCE_THRESHOLD_TOKENS", 500), \
+            patch.object(settings, "LLM_CHUNK_TOKENS", 300), \
+            patch.object(settings, "LLM_MAP_CONCURRENCY", 2):
+        yield
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    session = session_factory()
+    with patch("app.services.llm.SessionLocal", session_factory):
+        yield session
+    session.close()
+
+
+class FakeOllama:
+    """Answers map prompts with a short summary and tracks concurrency."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.prompts = []
+        self.in_flight = self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def post(self, url, json=None, **kwargs):
+        self.prompts.append(json["prompt"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.fail_on and self.fail_on in json["prompt"]:
+            raise RuntimeError("model crashed")
+        response = MagicMock()
+        if "Transcript part" in json["prompt"]:
+            body = {"summary": f"part summary {len(self.prompts)}"}
+        else:
+            body = {"titles": ["Final title"], "summary": "Final summary."}
+        response.json.return_value = {"response": dumps(body), "prompt_eval_count": 42}
+        return response
+
+
+def run(ollama, coro):
+    with patch("app.services.ollama_pool.get_client", return_value=ollama):
+        return asyncio.run(coro)
+
+
+def test_long_transcript_is_mapped_then_reduced(db):
+    ollama = FakeOllama()
+
+    result = run(ollama, generate_suggestions(LONG_TRANSCRIPT, db=db))
+
+    map_calls = [p for p in ollama.prompts if "Transcript part" in p]
+    assert result == {"titles": ["Final title"], "summary": "Final summary."}
+    assert len(map_calls) > 2
+    assert ollama.max_in_flight <= 2
+    assert "part summary" in ollama.prompts[-1] and "Segment 0:" not in ollama.prompts[-1]
+    assert db.query(LLMPartialSummary).count() == len(map_calls)
+
+
+def test_failed_chunk_keeps_finished_partials(db):
+    chunks = ["first chunk", "second chunk", "third chunk"]
+
+    with pytest.raises(RuntimeError):
+        run(FakeOllama(fail_on="second chunk"), summarize_chunks(chunks))
+    assert db.query(LLMPartialSummary).count() == 2
+
+    retry = FakeOllama()
+    summaries = run(retry, summarize_chunks(chunks))
+
+    assert len(retry.prompts) == 1 and "second chunk" in retry.prompts[0]
+    assert len(summaries) == 3
+
+
+def test_short_transcript_is_sent_whole():
+    ollama = FakeOllama()
+
+    run(ollama, generate_suggestions("A short episode.", force=True))
+
+    assert len(ollama.prompts) == 1 and "A short episode." in ollama.prompts[0]
+
+
+def test_usage_records_estimated_and_actual_prompt_tokens():
+    ollama = FakeOllama()
+    usage = {}
+
+    run(ollama, generate_suggestions("Um, a a short episode.", force=True, usage=usage))
+
+    assert "\na short episode.\n" in ollama.prompts[0]
+    assert usage["prompt_tokens_estimated"] == (len(ollama.prompts[0]) + 3) // 4
+    assert usage["prompt_tokens"] == 42
+    assert usage["transcript_tokens_estimated"] == 6
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import llm, suggestion_cache
+from app.services.llm import PROMPT_TEMPLATES, TRANSCRIPT_PREFIX, generate_suggestion_set, suggestion_key
+
+TRANSCRIPT = "Welcome to the show.\nToday we talk about bees."
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    suggestion_cache.memory_cache.clear()
+    monkeypatch.setattr(llm.settings, "OLLAMA_URL", "http://ollama:11434")
+    with patch("app.services.single_flight.get_redis", return_value=None):
+        yield
+    suggestion_cache.memory_cache.clear()
+
+
+def ollama_reply(result, prompt_eval_ms):
+    response = MagicMock()
+    response.json.return_value = {
+        "response": json.dumps(result),
+        "prompt_eval_count": 30,
+        "prompt_eval_duration": prompt_eval_ms * 1_000_000,
+        "load_duration": 0,
+    }
+    return response
+
+
+def test_templates_share_the_transcript_prefix():
+    prefix = TRANSCRIPT_PREFIX.format(transcript=TRANSCRIPT)
+    prompts = [template.format(transcript=TRANSCRIPT) for template in PROMPT_TEMPLATES.values()]
+
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+
+
+def test_payload_carries_keep_alive_and_context_size(monkeypatch):
+    monkeypatch.setattr(llm.settings, "OLLAMA_KEEP_ALIVE", "1h")
+    monkeypatch.setattr(llm.settings, "OLLAMA_NUM_CTX", 12288)
+    assert llm._ollama_payload("p")["keep_alive"] == "1h"
+    assert llm._ollama_payload("p", stream=True)["options"] == {"num_ctx": 12288}
+
+    monkeypatch.setattr(llm.settings, "OLLAMA_KEEP_ALIVE", "")
+    monkeypatch.setattr(llm.settings, "OLLAMA_NUM_CTX", 0)
+    assert "keep_alive" not in llm._ollama_payload("p")
+    assert "options" not in llm._ollama_payload("p")
+
+
+def test_suggestion_set_prepares_the_transcript_once_and_requests_in_order():
+    suggestion_cache.remember(suggestion_key(TRANSCRIPT, "title_summary"), {"titles": ["Cached"], "summary": "Cached."})
+    post = AsyncMock(side_effect=[ollama_reply({"titles": ["Bees"]}, 900), ollama_reply({"summary": "Bees."}, 40)])
+    prepare = AsyncMock(return_value="Today we talk about bees.")
+    usage = {}
+
+    with patch("httpx.AsyncClient.post", post), patch("app.services.llm.prepare_transcript", prepare):
+        results = asyncio.run(generate_suggestion_set(
+            TRANSCRIPT, ["title_summary", "title_only", "summary_only"], usage=usage
+        ))
+
+    assert results == {
+        "title_summary": {"titles": ["Cached"], "summary": "Cached."},
+        "title_only": {"titles": ["Bees"]},
+        "summary_only": {"summary": "Bees."},
+    }
+    prepare.assert_awaited_once()
+    prompts = [c.kwargs["json"]["prompt"] for c in post.await_args_list]
+    assert [p.startswith("Podcast transcript:\nToday we talk about bees.\n") for p in prompts] == [True, True]
+    assert usage["title_summary"]["cached"] is True
+    assert (usage["title_only"]["prompt_eval_seconds"], usage["summary_only"]["prompt_eval_seconds"]) == (0.9, 0.04)
+    assert llm.prompt_eval_ms(usage["summary_only"]) == 40
+
+
+def test_suggestion_set_rejects_unknown_prompt_types():
+    with pytest.raises(ValueError):
+        asyncio.run(generate_suggestion_set(TRANSCRIPT, ["title_only", "haiku"]))
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import suggestion_cache
+from app.services.llm import stream_suggestions
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    suggestion_cache.memory_cache.clear()
+    with patch.object(settings, "OLLAMA_URL", "http://ollama:11434"):
+        yield
+
+
+def ollama_stream(pieces, status_code=200, prompt_eval_count=17):
+    lines = [{"response": p, "done": False} for p in pieces]
+    lines.append({"response": "", "done": True, "prompt_eval_count": prompt_eval_count})
+    body = "".join(json.dumps(line) + "\n" for line in lines)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(status_code, content=body.encode())
+
+    return handler
+
+
+def collect(handler, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch("app.services.ollama_pool.get_client", return_value=client):
+                return [event async for event in stream_suggestions("An episode about bees.", **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_tokens_are_streamed_then_parsed():
+    usage = {}
+    pieces = ['{"titles": ["Bee', 's"], "summ', 'ary": "Bees."}']
+
+    events = collect(ollama_stream(pieces), usage=usage)
+
+    assert [e["text"] for e in events[:-1]] == pieces
+    assert events[-1] == {"event": "result", "suggestions": {"titles": ["Bees"], "summary": "Bees."}}
+    assert usage["prompt_tokens"] == 17 and usage["first_token_seconds"] >= 0
+
+    cached = collect(ollama_stream(["not used"]))
+    assert cached == [events[-1]]
+
+
+def test_unparseable_output_is_an_error_event():
+    events = collect(ollama_stream(['{"titles": [']), force=True)
+
+    assert events[-1]["event"] == "error"
+    assert events[-1]["details"] == '{"titles": ['
+
+
+def test_http_error_is_raised():
+    with pytest.raises(httpx.HTTPStatusError):
+        collect(ollama_stream([], status_code=500), force=True)
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.services.model_registry import WhisperModelRegistry, estimate_model_mb
+
+
+def make_registry(memory_cap_mb: int = 10_000, loader=None) -> WhisperModelRegistry:
+    loader = loader or MagicMock(side_effect=lambda size, device, compute: object())
+    return WhisperModelRegistry(memory_cap_mb, loader=loader, publish=False)
+
+
+def test_get_loads_each_configuration_once():
+    loader = MagicMock(side_effect=lambda size, device, compute: object())
+    registry = make_registry(loader=loader)
+
+    first = registry.get("base.en", "cpu", "int8")
+    second = registry.get("base.en", "cpu", "int8")
+
+    assert first is second
+    loader.assert_called_once_with("base.en", "cpu", "int8")
+    [stats] = registry.stats()["models"]
+    assert stats["size"] == "base.en"
+    assert stats["uses"] == 2
+    assert stats["load_seconds"] >= 0
+    assert stats["resident_mb"] > 0
+
+
+def test_preload_does_not_count_as_use():
+    registry = make_registry()
+
+    registry.preload([("base.en", "cpu", "int8")])
+
+    assert ("base.en", "cpu", "int8") in registry
+    assert registry.stats()["models"][0]["uses"] == 0
+
+
+def test_least_recently_used_model_is_evicted_over_cap():
+    # Budget fits two small int8 models but not three.
+    cap = 2 * estimate_model_mb("small", "int8") + 10
+    registry = make_registry(memory_cap_mb=cap)
+
+    registry.get("small.en", "cpu", "int8")
+    registry.get("small", "cpu", "int8")
+    registry.get("small.en", "cpu", "int8")  # refresh: "small" is now the oldest
+    registry.get("small.en", "cuda", "int8")
+
+    assert ("small", "cpu", "int8") not in registry
+    assert ("small.en", "cpu", "int8") in registry
+    assert ("small.en", "cuda", "int8") in registry
+    assert registry.evictions == 1
+
+
+def test_load_failure_raises_runtime_error():
+    registry = make_registry(loader=MagicMock(side_effect=OSError("no weights")))
+
+    with pytest.raises(RuntimeError):
+        registry.get("tiny", "cpu", "int8")
+    assert registry.stats()["models"] == []
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services import ollama_admission
+from app.services.ollama_admission import AdmissionController, CircuitBreaker, OllamaBusy, OllamaUnavailable
+
+
+def test_requests_beyond_the_limit_wait_and_overflow_is_rejected():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_seconds=5)
+
+    async def scenario():
+        await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.01)
+        with pytest.raises(OllamaBusy) as rejected:
+            await controller.acquire()
+        depth = controller.stats()["queue_depth"]
+        controller.release(held_seconds=2)
+        await waiting
+        return rejected.value, depth
+
+    rejected, depth = asyncio.run(scenario())
+
+    assert depth == 1
+    assert rejected.retry_after >= 1
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["queue_depth"], stats["admitted"], stats["queued"], stats["rejected"]) == (1, 0, 2, 1, 1)
+
+
+def test_wait_times_out():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout_seconds=0.05)
+
+    async def scenario():
+        await controller.acquire()
+        await controller.acquire()
+
+    with pytest.raises(OllamaBusy):
+        asyncio.run(scenario())
+
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["queue_depth"], stats["timed_out"]) == (1, 0, 1)
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_after_a_good_trial():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0.1)
+    controller = AdmissionController(max_in_flight=2, max_queue=0, queue_timeout_seconds=1)
+
+    async def call(error=None):
+        async with ollama_admission.ollama_slot():
+            if error:
+                raise error
+
+    down = httpx.ConnectError("connection refused")
+    with patch.object(ollama_admission, "breaker", breaker), patch.object(ollama_admission, "admission", controller):
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                asyncio.run(call(down))
+        with pytest.raises(OllamaUnavailable) as failed_fast:
+            asyncio.run(call())
+        assert breaker.state == "open"
+        assert failed_fast.value.retry_after == 1
+
+        time.sleep(0.1)
+        breaker.check()  # the trial request
+        with pytest.raises(OllamaUnavailable):
+            breaker.check()
+        breaker.record_success()
+        asyncio.run(call())
+
+    assert (breaker.state, breaker.times_opened) == ("closed", 1)
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30)
+    not_found = httpx.HTTPStatusError(
+        "model not found", request=httpx.Request("POST", "http://ollama"), response=httpx.Response(404)
+    )
+
+    async def call():
+        async with ollama_admission.ollama_slot():
+            raise not_found
+
+    with patch.object(ollama_admission, "breaker", breaker):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(call())
+
+    assert breaker.state == "closed"
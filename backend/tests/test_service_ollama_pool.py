@@ -0,0 +1,136 @@
+import asyncio
+import functools
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services import http_clients, ollama_admission, ollama_pool
+from app.services.ollama_admission import AdmissionController
+from app.services.ollama_pool import OllamaPool
+
+HOSTS = ["http://ollama-a:11434", "http://ollama-b:11434", "http://ollama-c:11434"]
+PAYLOAD = {"model": "llama3", "prompt": "p", "stream": False}
+
+
+@pytest.fixture
+def hosts():
+    """Per-host behaviour of the mock Ollama hosts: "ok", "slow", "down" or a list of models."""
+    behaviour = {host: "ok" for host in HOSTS}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = f"http://{request.url.host}:{request.url.port}"
+        if behaviour[host] == "down":
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path == "/api/tags":
+            models = behaviour[host] if isinstance(behaviour[host], list) else ["llama3:latest"]
+            return httpx.Response(200, json={"models": [{"name": m} for m in models]})
+        if behaviour[host] == "slow":
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"response": host})
+
+    client_class = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    with patch.object(http_clients, "_clients", {}), \
+            patch("app.services.http_clients.httpx.AsyncClient", client_class):
+        yield behaviour
+
+
+def home_host(model="llama3"):
+    """The host a fresh pool prefers for ``model`` (rendezvous hashing)."""
+    pool = OllamaPool(HOSTS)
+    return pool.choose(model).url
+
+
+def test_least_outstanding_with_model_affinity():
+    pool = OllamaPool(HOSTS)
+
+    first, second, third = (pool.choose("llama3") for _ in range(3))
+    assert first.url == home_host()
+    assert {first.url, second.url, third.url} == set(HOSTS)
+
+    for backend in (first, second, third):
+        pool._finish(backend, 1.0, failed=False)
+    assert pool.choose("llama3") is first  # idle again: back to the warm host
+
+
+def test_health_check_tracks_reachability_and_models(hosts):
+    hosts[HOSTS[0]] = ["llama3:latest"]
+    hosts[HOSTS[1]] = ["mistral:7b"]
+    hosts[HOSTS[2]] = "down"
+    pool = OllamaPool(HOSTS)
+
+    asyncio.run(pool.refresh(force=True))
+
+    stats = {s["url"]: s for s in pool.stats()}
+    assert [stats[h]["healthy"] for h in HOSTS] == [True, True, False]
+    assert stats[HOSTS[1]]["models"] == ["mistral:7b"]
+    assert pool.choose("llama3").url == HOSTS[0]
+    assert pool.choose("mistral:7b").url == HOSTS[1]
+
+
+def test_failed_host_is_skipped_and_marked_down(hosts):
+    home = home_host()
+    pool = OllamaPool(HOSTS)
+    asyncio.run(pool.refresh(force=True))
+    hosts[home] = "down"  # goes down between health checks
+
+    response, backend = asyncio.run(pool.generate(PAYLOAD))
+
+    assert backend != home
+    assert response.json() == {"response": backend}
+    stats = {s["url"]: s for s in pool.stats()}
+    assert (stats[home]["healthy"], stats[home]["failures"], stats[home]["outstanding"]) == (False, 1, 0)
+
+
+def test_slow_request_is_hedged_to_another_host(hosts, monkeypatch):
+    monkeypatch.setattr(ollama_pool.settings, "OLLAMA_HEDGE_PERCENTILE", 90)
+    home = home_host()
+    hosts[home] = "slow"
+    pool = OllamaPool(HOSTS)
+    pool._latencies.extend([0.05] * ollama_pool.HEDGE_MIN_SAMPLES)
+
+    controller = AdmissionController(2, 0, 1)
+    controller.in_flight = 1  # the slot of the request itself
+
+    with patch.object(ollama_admission, "admission", controller):
+        response, backend = asyncio.run(pool.generate(PAYLOAD))
+
+    assert backend != home
+    stats = {s["url"]: s for s in pool.stats()}
+    assert stats[backend]["hedged"] == 1
+    assert all(s["outstanding"] == 0 for s in stats.values())
+    assert stats[home]["healthy"]  # a cancelled copy is not a failure
+    assert controller.in_flight == 1  # the hedge's slot was released
+
+
+def test_hedge_is_skipped_without_a_free_slot(hosts, monkeypatch):
+    monkeypatch.setattr(ollama_pool.settings, "OLLAMA_HEDGE_PERCENTILE", 90)
+    home = home_host()
+    hosts[home] = "slow"
+    pool = OllamaPool(HOSTS)
+    pool._latencies.extend([0.05] * ollama_pool.HEDGE_MIN_SAMPLES)
+    controller = AdmissionController(1, 0, 1)
+    controller.in_flight = 1
+
+    with patch.object(ollama_admission, "admission", controller):
+        response, backend = asyncio.run(pool.generate(PAYLOAD))
+
+    assert backend == home
+    assert all(s["hedged"] == 0 for s in pool.stats())
+    assert controller.in_flight == 1
+
+
+def test_background_checks_bring_a_host_back_without_requests(hosts):
+    pool = OllamaPool(HOSTS)
+    pool.backends[0].healthy = False  # marked down by a failed request
+
+    async def run_briefly():
+        task = asyncio.ensure_future(ollama_pool.run_health_checks())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    with patch.object(ollama_pool, "get_pool", return_value=pool):
+        asyncio.run(run_briefly())
+
+    assert all(s["healthy"] for s in pool.stats())
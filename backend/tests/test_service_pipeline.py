@@ -0,0 +1,69 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from celery.canvas import _chord
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.job import JobStatus, ProcessingJob
+from app.models.pipeline import Pipeline, aggregate_status
+from app.workers.tasks import build_pipeline_workflow, pipeline_failed_task
+
+
+def test_aggregate_status():
+    assert aggregate_status([JobStatus.PENDING, JobStatus.PENDING]) == JobStatus.PENDING
+    assert aggregate_status([JobStatus.COMPLETED, JobStatus.PENDING]) == JobStatus.PROCESSING
+    assert aggregate_status([JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.PROCESSING]) == JobStatus.FAILED
+    assert aggregate_status([JobStatus.COMPLETED, JobStatus.COMPLETED]) == JobStatus.COMPLETED
+
+
+def test_workflow_runs_transcription_and_video_in_parallel_after_audio():
+    workflow = build_pipeline_workflow(
+        SimpleNamespace(id=5),
+        {"job_id": 1, "input_paths_str": [], "output_filename": "1_processed.mp3"},
+        {"job_id": 2, "audio_input_path_str": "processed/1_processed.mp3", "output_basename": "2_transcript"},
+        {"job_id": 3, "transcription_job_id": 2},
+        {"job_id": 4, "audio_input_path_str": "processed/1_processed.mp3", "output_filename": "4_waveform.mp4",
+         "resolution": "1280x720", "fg_color": "white", "bg_color": "black"},
+    )
+
+    audio, fan_out = workflow.tasks
+    assert audio.task == "process_audio_task" and audio.immutable
+    assert isinstance(fan_out, _chord)
+    transcription_branch, video = fan_out.tasks
+    assert [t.task for t in transcription_branch.tasks] == ["transcribe_audio_task", "generate_suggestions_task"]
+    assert video.task == "generate_video_task"
+    assert fan_out.body.task == "finalize_pipeline_task" and fan_out.body.args == (5,)
+    assert workflow.options["link_error"][0].task == "pipeline_failed_task"
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with patch("app.workers.tasks.SessionLocal", factory):
+        yield factory
+
+
+def test_failed_stage_skips_only_dependent_stages(session_factory):
+    db = session_factory()
+    db.add_all([
+        ProcessingJob(id=1, job_type="audio_processing", status=JobStatus.COMPLETED),
+        ProcessingJob(id=2, job_type="transcription", status=JobStatus.FAILED),
+        ProcessingJob(id=3, job_type="llm_suggestion", status=JobStatus.PENDING),
+        ProcessingJob(id=4, job_type="video_generation", status=JobStatus.PENDING),
+        Pipeline(id=1, audio_job_id=1, transcription_job_id=2, suggestion_job_id=3, video_job_id=4),
+    ])
+    db.commit()
+
+    pipeline_failed_task(None, RuntimeError("model crashed"), None, 1)
+
+    db.expire_all()
+    assert db.get(ProcessingJob, 3).status == JobStatus.FAILED
+    assert db.get(ProcessingJob, 4).status == JobStatus.PENDING  # the render still runs
+    assert db.get(Pipeline, 1).status == JobStatus.FAILED
+    db.close()
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.job import JobStatus, ProcessingJob
+from app.models.transcript import Transcript
+from app.models.transcript_segment import TranscriptSegment
+from app.services.prompt_budget import (
+    SAMPLE_MARKER,
+    chunk_transcript,
+    compact_transcript,
+    estimate_tokens,
+    job_transcript_text,
+    sample_to_budget,
+    split_segments,
+)
+
+SRT = "".join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i + 1:02d},000\nsentence number {i} of the episode\n\n" for i in range(1, 21))
+
+
+def test_split_segments_on_srt_cues_and_lines():
+    assert len(split_segments(SRT)) == 20
+    assert split_segments("first line\nsecond line\n") == ["first line", "second line"]
+
+
+def test_chunks_respect_budget_and_segment_boundaries():
+    chunks = chunk_transcript(SRT, max_tokens=60)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 60 for c in chunks)
+    assert "\n\n".join(chunks) == "\n\n".join(split_segments(SRT))
+
+
+def test_oversized_segment_is_split_at_words():
+    chunks = chunk_transcript("word " * 200, max_tokens=50)
+
+    assert all(estimate_tokens(c) <= 50 for c in chunks)
+    assert " ".join(chunks).split() == ["word"] * 200
+
+
+def test_compaction_drops_srt_markup_fillers_and_repeats():
+    srt = (
+        "1\n00:00:01,000 --> 00:00:02,500\nUm, so the the show is, uh, about cats.\n\n"
+        "2\n00:00:02,500 --> 00:00:04,000\nHmm, I I think so.\n"
+    )
+
+    assert compact_transcript(srt) == "so the show is, about cats.\nI think so."
+    assert compact_transcript("Plain text stays.") == "Plain text stays."
+
+
+def test_sampling_covers_the_whole_episode():
+    text = "\n".join(f"minute {i} " + "words " * 20 for i in range(120))
+
+    sampled = sample_to_budget(text, max_tokens=400, windows=4)
+
+    assert estimate_tokens(sampled) <= 400
+    assert sampled.count(SAMPLE_MARKER) == 3
+    assert sampled.startswith("minute 0 ") and "minute 90 " in sampled
+    assert sample_to_budget("short", max_tokens=400) == "short"
+
+
+def test_job_transcript_text_prefers_stored_segments(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    job = ProcessingJob(id=1, job_type="transcription", status=JobStatus.COMPLETED,
+                        output_file_path="missing.srt", created_at=datetime.utcnow())
+    db.add(job)
+    db.add(Transcript(id=3, processing_job_id=1, text_content="first second", created_at=datetime.utcnow()))
+    db.commit()
+
+    assert job_transcript_text(db, job) == "first second"
+
+    db.add_all([
+        TranscriptSegment(processing_job_id=1, transcript_id=3, start=0.0, end=1.0, text=" first"),
+        TranscriptSegment(processing_job_id=1, transcript_id=3, start=1.0, end=2.0, text=" second"),
+    ])
+    db.commit()
+
+    assert job_transcript_text(db, job) == "first\nsecond"
+    db.close()
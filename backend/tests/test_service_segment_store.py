@@ -0,0 +1,71 @@
+import pytest
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.job import ProcessingJob, JobStatus
+from app.services.segment_store import (
+    SegmentWriter,
+    committed_segments,
+    read_segment_log,
+    resume_point,
+    store_chunk_segments,
+)
+from app.services.transcription import Segment
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(ProcessingJob(id=1, job_type="transcription", status=JobStatus.PROCESSING))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_writer_commits_in_batches_and_logs_every_segment(db, tmp_path: Path):
+    log_path = tmp_path / "1_transcript.segments.jsonl"
+
+    with SegmentWriter(db, 1, log_path, commit_every=2, commit_seconds=3600) as writer:
+        for i in range(3):
+            writer.append(Segment(float(i), i + 0.9, f"part {i}"))
+        # Two segments reached the batch size; the third is still buffered.
+        assert writer.committed == 2
+        assert len(read_segment_log(log_path)) == 3
+
+    assert writer.committed == 3
+    assert [s.text for s in committed_segments(db, 1)] == ["part 0", "part 1", "part 2"]
+    assert resume_point(db, 1) == pytest.approx(2.9)
+
+
+def test_writer_keeps_progress_when_transcription_fails(db, tmp_path: Path):
+    with pytest.raises(RuntimeError):
+        with SegmentWriter(db, 1, None, commit_every=100, commit_seconds=3600) as writer:
+            writer.append(Segment(0.0, 1.0, "kept"))
+            raise RuntimeError("worker crashed")
+
+    assert resume_point(db, 1) == 1.0
+
+
+def test_read_segment_log_drops_torn_line_and_superseded_entries(tmp_path: Path):
+    log_path = tmp_path / "log.jsonl"
+    log_path.write_text(
+        '{"start": 0.0, "end": 1.0, "text": "a"}\n'
+        '{"start": 1.0, "end": 2.0, "text": "b (lost before commit)"}\n'
+        '{"start": 1.0, "end": 2.1, "text": "b"}\n'
+        '{"start": 2.1, "end": 3.0, "te'
+    )
+
+    assert [s.text for s in read_segment_log(log_path)] == ["a", "b"]
+
+
+def test_store_chunk_segments_replaces_earlier_attempt(db):
+    store_chunk_segments(db, 1, [Segment(10.0, 11.0, "first try")], 10.0, 20.0)
+    store_chunk_segments(db, 1, [Segment(0.0, 1.0, "other chunk")], 0.0, 10.0)
+    store_chunk_segments(db, 1, [Segment(10.0, 11.5, "retry")], 10.0, 20.0)
+
+    assert [s.text for s in committed_segments(db, 1)] == ["other chunk", "retry"]
+    assert [s.text for s in committed_segments(db, 1, after=5.0)] == ["retry"]
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import single_flight, suggestion_cache
+from app.services.llm import generate_suggestions, suggestion_key
+
+TRANSCRIPT = "Welcome to the show. Today we talk about bees."
+RESULT = {"titles": ["Bees"], "summary": "All about bees."}
+
+
+class FakeRedis:
+    """The subset of redis.Redis used for coalescing, in memory."""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    suggestion_cache.memory_cache.clear()
+    monkeypatch.setattr(single_flight, "POLL_SECONDS", 0.01)
+    monkeypatch.setattr(single_flight.settings, "OLLAMA_URL", "http://ollama:11434")
+    yield
+    suggestion_cache.memory_cache.clear()
+
+
+def slow_ollama(delay):
+    async def post(*args, **kwargs):
+        await asyncio.sleep(delay)
+        response = MagicMock()
+        response.json.return_value = {"response": json.dumps(RESULT), "prompt_eval_count": 40}
+        return response
+
+    return AsyncMock(side_effect=post)
+
+
+def redis_key(prefix):
+    return prefix + ":".join(suggestion_key(TRANSCRIPT, "title_summary"))
+
+
+def run_concurrently(post, **kwargs):
+    """Two identical requests, the second one started while the first is in flight."""
+    usages = [{}, {}]
+    results = [None, None]
+
+    def request(i):
+        results[i] = asyncio.run(generate_suggestions(TRANSCRIPT, usage=usages[i], **kwargs))
+
+    # Separate threads and event loops, like Celery worker threads.
+    with patch("app.services.single_flight.get_redis", return_value=None), patch("httpx.AsyncClient.post", post):
+        leader = threading.Thread(target=request, args=(0,))
+        leader.start()
+        while not post.await_count:
+            pass
+        request(1)
+        leader.join()
+    return results, usages
+
+
+def test_concurrent_identical_requests_share_one_generation():
+    post = slow_ollama(0.2)
+    stored = []
+
+    def store(suggestions, usage):
+        stored.append(suggestions)
+        return len(stored)
+
+    results, usages = run_concurrently(post, store=store)
+
+    assert results == [RESULT, RESULT]
+    assert post.await_count == 1
+    assert [u["coalesced"] for u in usages] == [False, True]
+    assert usages[1]["prompt_tokens"] == 40
+    assert stored == [RESULT]  # the follower reuses the leader's row
+    assert [u["suggestion_id"] for u in usages] == [1, 1]
+
+
+def test_forced_requests_are_not_coalesced():
+    post = slow_ollama(0.2)
+
+    results, usages = run_concurrently(post, force=True)
+
+    assert results == [RESULT, RESULT]
+    assert post.await_count == 2
+    assert "coalesced" not in usages[1]
+
+
+def test_local_follower_stops_waiting_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(single_flight.settings, "LLM_SINGLE_FLIGHT_TIMEOUT_SECONDS", 0.05)
+
+    async def slow():
+        await asyncio.sleep(0.3)
+        return "leader"
+
+    async def both():
+        leader = asyncio.ensure_future(single_flight.coalesce("key", slow))
+        await asyncio.sleep(0.01)
+        follower = await single_flight.coalesce("key", AsyncMock(return_value="follower"))
+        return follower, await leader
+
+    with patch("app.services.single_flight.get_redis", return_value=None):
+        follower, leader = asyncio.run(both())
+
+    assert follower == ("follower", False)
+    assert leader == ("leader", False)  # giving up did not cancel the leader
+
+
+def test_follower_receives_result_from_another_worker():
+    redis = FakeRedis()
+    redis.set(redis_key(single_flight.LOCK_PREFIX), "other-worker")
+
+    def other_worker_finishes():
+        redis.set(redis_key(single_flight.RESULT_PREFIX), json.dumps({"suggestions": RESULT, "usage": {}}))
+        redis.delete(redis_key(single_flight.LOCK_PREFIX))
+
+    post = slow_ollama(0)
+    usage = {}
+    with patch("app.services.single_flight.get_redis", return_value=redis), patch("httpx.AsyncClient.post", post):
+        threading.Timer(0.1, other_worker_finishes).start()
+        result = asyncio.run(generate_suggestions(TRANSCRIPT, usage=usage))
+
+    assert result == RESULT
+    assert usage["coalesced"] is True
+    post.assert_not_awaited()
+
+
+def test_follower_takes_over_when_the_leader_fails():
+    redis = FakeRedis()
+    redis.set(redis_key(single_flight.LOCK_PREFIX), "other-worker")
+
+    post = slow_ollama(0)
+    with patch("app.services.single_flight.get_redis", return_value=redis), patch("httpx.AsyncClient.post", post):
+        threading.Timer(0.1, redis.delete, args=(redis_key(single_flight.LOCK_PREFIX),)).start()
+        result = asyncio.run(generate_suggestions(TRANSCRIPT))
+
+    assert result == RESULT
+    post.assert_awaited_once()
+    assert redis_key(single_flight.LOCK_PREFIX) not in redis.values
+    published = json.loads(redis.values[redis_key(single_flight.RESULT_PREFIX)])
+    assert published["suggestions"] == RESULT
+
+
+def test_leader_error_reaches_local_followers():
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise ValueError("Ollama is down")
+
+    async def both():
+        leader = asyncio.ensure_future(single_flight.coalesce("key", failing))
+        await asyncio.sleep(0.01)
+        follower = single_flight.coalesce("key", AsyncMock())
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    with patch("app.services.single_flight.get_redis", return_value=None):
+        errors = asyncio.run(both())
+
+    assert [str(e) for e in errors] == ["Ollama is down", "Ollama is down"]
+    assert single_flight.single_flight_stats()["in_flight"] == 0
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.llm import LLMSuggestion
+from app.services import suggestion_cache
+from app.services.llm import generate_suggestions, suggestion_key
+from app.services.suggestion_cache import SuggestionLRU
+
+TRANSCRIPT = "Welcome to the show. Today we talk about caching."
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    suggestion_cache.memory_cache.clear()
+    yield
+    suggestion_cache.memory_cache.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def ollama_reply(titles, summary):
+    response = MagicMock()
+    response.json.return_value = {"response": json.dumps({"titles": titles, "summary": summary})}
+    return response
+
+
+def test_repeated_request_is_served_from_memory():
+    post = AsyncMock(return_value=ollama_reply(["A title"], "A summary."))
+    with patch("httpx.AsyncClient.post", post):
+        first = asyncio.run(generate_suggestions(TRANSCRIPT))
+        second = asyncio.run(generate_suggestions(TRANSCRIPT))
+        forced = asyncio.run(generate_suggestions(TRANSCRIPT, force=True))
+        other = asyncio.run(generate_suggestions(TRANSCRIPT, prompt_type="summary_only"))
+
+    assert first == second == forced == {"titles": ["A title"], "summary": "A summary."}
+    assert other == first  # different prompt type: not a hit
+    assert post.await_count == 3
+
+
+def test_stored_suggestion_is_found_in_database(db):
+    key = suggestion_key(TRANSCRIPT, "title_only")
+    db.add(LLMSuggestion(prompt_type="title_only", model_used=key.model, titles=["Stored"],
+                         transcript_hash=key.transcript_hash, prompt_version=key.prompt_version))
+    db.add(LLMSuggestion(prompt_type="title_only", model_used=key.model, titles=["Old template"],
+                         transcript_hash=key.transcript_hash, prompt_version="0" * 12))
+    db.commit()
+
+    post = AsyncMock()
+    with patch("httpx.AsyncClient.post", post):
+        result = asyncio.run(generate_suggestions(TRANSCRIPT, prompt_type="title_only", db=db))
+
+    assert result == {"titles": ["Stored"]}
+    post.assert_not_awaited()
+    assert suggestion_cache.memory_cache.get(key) == {"titles": ["Stored"]}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SuggestionLRU(2)
+    keys = [suggestion_key(f"transcript {i}", "title_summary") for i in range(3)]
+    cache.put(keys[0], {"summary": "0"})
+    cache.put(keys[1], {"summary": "1"})
+    cache.get(keys[0])["summary"] = "changed by caller"
+    cache.put(keys[2], {"summary": "2"})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == {"summary": "0"}
+    assert len(cache) == 2
+
+
+def test_prompt_settings_are_part_of_the_key(monkeypatch):
+    key = suggestion_key(TRANSCRIPT, "title_summary")
+    monkeypatch.setattr(suggestion_cache.settings, "LLM_PROMPT_TOKEN_BUDGET", 1000)
+    smaller_budget = suggestion_key(TRANSCRIPT, "title_summary")
+    monkeypatch.setattr(suggestion_cache.settings, "LLM_CHUNK_TOKENS", 500)
+
+    assert smaller_budget.prompt_version != key.prompt_version
+    assert suggestion_key(TRANSCRIPT, "title_summary").prompt_version != smaller_budget.prompt_version
+    assert len(key.prompt_version) == 12
@@ -0,0 +1,55 @@
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+import ffmpeg
+
+from app.services import thumbnails
+from app.services.thumbnails import ensure_thumbnail, ensure_thumbnails, thumbnail_path
+
+
+@pytest.fixture(autouse=True)
+def thumbnail_dir(tmp_path: Path):
+    with patch.object(thumbnails, "THUMBNAIL_DIR", tmp_path / "thumbnails"):
+        yield tmp_path / "thumbnails"
+
+
+@pytest.fixture
+def media(tmp_path: Path) -> tuple[Path, Path]:
+    video = tmp_path / "1_waveform.mp4"
+    audio = tmp_path / "1_processed.mp3"
+    video.write_bytes(b"video")
+    audio.write_bytes(b"audio")
+    return video, audio
+
+
+def fake_run(stream, **kwargs):
+    Path(stream.get_args()[-1]).write_bytes(b"img")
+
+
+def test_ensure_thumbnail_is_cached(media):
+    video, audio = media
+    with patch("ffmpeg.run", side_effect=fake_run) as mock_run:
+        first = ensure_thumbnail(1, "poster", video, audio)
+        second = ensure_thumbnail(1, "poster", video, audio)
+
+    assert first == second == thumbnail_path(1, "poster")
+    assert first.exists()
+    mock_run.assert_called_once()
+
+
+def test_ensure_thumbnails_logs_failures(media):
+    video, audio = media
+    with patch("ffmpeg.run", side_effect=ffmpeg.Error("ffmpeg", b"", b"boom")):
+        assert ensure_thumbnails(1, video, audio) == {}
+
+
+def test_waveform_thumbnail_requires_audio(media):
+    video, _ = media
+    with pytest.raises(FileNotFoundError):
+        ensure_thumbnail(1, "waveform", video, None)
+
+
+def test_unknown_thumbnail_kind():
+    with pytest.raises(ValueError):
+        thumbnail_path(1, "banner")
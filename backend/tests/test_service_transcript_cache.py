@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.job import ProcessingJob, JobStatus
+from app.models.transcript import Transcript
+from app.services.transcript_cache import (
+    cache_options,
+    cache_stats,
+    find_cached_transcript,
+    transcription_cache_key,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(ProcessingJob(id=i, job_type="transcription", status=JobStatus.COMPLETED) for i in (1, 2, 3))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cache_key_depends_on_audio_and_decoding_options():
+    base = transcription_cache_key("abc", cache_options(engine="batched", beam_size=5, vad=True))
+
+    assert base == transcription_cache_key("abc", cache_options(engine="batched", beam_size=5, vad=True))
+    assert base != transcription_cache_key("abd", cache_options(engine="batched", beam_size=5, vad=True))
+    assert base != transcription_cache_key("abc", cache_options(engine="sequential", beam_size=5, vad=True))
+    assert base != transcription_cache_key("abc", cache_options(engine="batched", beam_size=1, vad=True))
+    assert base != transcription_cache_key("abc", cache_options(engine="batched", beam_size=5, vad=False))
+    assert base != transcription_cache_key("abc", cache_options(engine="batched", beam_size=5, vad=True, chunked=True))
+    assert base != transcription_cache_key(
+        "abc", cache_options(model_size="small.en", engine="batched", beam_size=5, vad=True)
+    )
+    assert base != transcription_cache_key(
+        "abc", cache_options(compute_type="float32", engine="batched", beam_size=5, vad=True)
+    )
+
+
+def test_find_cached_transcript_and_hit_rate(db):
+    db.add(Transcript(id=1, processing_job_id=1, language="en", cache_key="k1"))
+    db.add(Transcript(id=2, processing_job_id=2, language="en", cache_key="k1", cached_from_id=1))
+    db.add(Transcript(id=3, processing_job_id=3, language="en"))
+    db.commit()
+
+    assert find_cached_transcript(db, "k1").id == 2
+    assert find_cached_transcript(db, "k2") is None
+    assert cache_stats(db) == {"lookups": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
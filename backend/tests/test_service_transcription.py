@@ -0,0 +1,343 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.job import JobStatus, ProcessingJob
+from app.services import transcription
+from app.services.chunked_transcription import (
+    Chunk,
+    chunk_state_dir,
+    majority_language,
+    merge_chunk_segments,
+    merge_speech,
+    offset_segments,
+    offset_speech,
+    parse_silences,
+    plan_chunks,
+    save_chunk_plan,
+    save_chunk_result,
+)
+from app.services.segment_store import committed_segments
+from app.services.transcription import Segment, render_srt, render_text, transcribe_segments
+
+
+def fake_model_output():
+    info = SimpleNamespace(language="en", language_probability=0.99, duration=120.0)
+    return iter([SimpleNamespace(start=0.0, end=2.0, text=" Hi. ")]), info
+
+
+def fake_model():
+    model = MagicMock()
+    model.transcribe.return_value = fake_model_output()
+    model.detect_language.return_value = ("en", 0.99, [])
+    return model
+
+
+def test_render_srt_numbers_cues_from_one():
+    srt = render_srt([Segment(0.0, 1.5, "Hello."), Segment(2.0, 3.25, "World.")])
+
+    assert srt == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello.\n\n"
+        "2\n00:00:02,000 --> 00:00:03,250\nWorld.\n"
+    )
+    assert render_text([Segment(0, 1, "Hello."), Segment(1, 2, "World.")]) == "Hello. World."
+
+
+def test_parse_silences_handles_trailing_silence():
+    log = (
+        "[silencedetect @ 0x1] silence_start: 10.5\n"
+        "[silencedetect @ 0x1] silence_end: 11.5 | silence_duration: 1\n"
+        "[silencedetect @ 0x1] silence_start: 58\n"
+    )
+
+    assert parse_silences(log, 60.0) == [(10.5, 11.5), (58.0, 60.0)]
+
+
+def test_plan_chunks_cuts_in_nearest_silence():
+    chunks = plan_chunks(250.0, [(95.0, 97.0), (150.0, 151.0), (205.0, 207.0)], target_seconds=100, overlap_seconds=2)
+
+    assert [(c.keep_start, c.keep_end) for c in chunks] == [(0.0, 96.0), (96.0, 206.0), (206.0, 250.0)]
+    assert chunks[0].start == 0.0 and chunks[0].end == 98.0
+    assert chunks[1].start == 94.0 and chunks[1].end == 208.0
+    assert chunks[-1].end == 250.0
+
+
+def test_plan_chunks_short_audio_is_single_chunk():
+    [chunk] = plan_chunks(120.0, [], target_seconds=100, overlap_seconds=2)
+
+    assert (chunk.start, chunk.end, chunk.keep_start, chunk.keep_end) == (0.0, 120.0, 0.0, 120.0)
+
+
+def test_overlapping_chunks_stitch_without_duplicates():
+    first = Chunk(index=0, start=0.0, end=12.0, keep_start=0.0, keep_end=10.0)
+    second = Chunk(index=1, start=8.0, end=20.0, keep_start=10.0, keep_end=20.0)
+    # "Cut" straddles the 10s cut point and is heard by both chunks.
+    first_segments = [Segment(0.0, 5.0, "Intro"), Segment(9.0, 10.8, "Cut")]
+    second_segments = [Segment(1.0, 2.8, "Cut"), Segment(3.0, 8.0, "Rest")]
+
+    merged = merge_chunk_segments([offset_segments(first_segments, first), offset_segments(second_segments, second)])
+
+    assert [s.text for s in merged] == ["Intro", "Cut", "Rest"]
+    assert (merged[2].start, merged[2].end) == (11.0, 16.0)
+    assert majority_language([("en", 10.0), ("de", 2.0), (None, 5.0)]) == "en"
+
+
+def test_batched_engine_records_realtime_factor(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    samples = np.zeros(120 * transcription.SAMPLE_RATE, dtype=np.float32)
+    model = fake_model()
+    pipeline_cls = MagicMock()
+    pipeline_cls.return_value.transcribe.return_value = fake_model_output()
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[]), \
+            patch.dict(sys.modules, {"faster_whisper": MagicMock(BatchedInferencePipeline=pipeline_cls)}):
+        result = transcribe_segments(audio, engine="batched", batch_size=4, beam_size=2, vad=False)
+
+    kwargs = pipeline_cls.return_value.transcribe.call_args.kwargs
+    assert (kwargs["beam_size"], kwargs["batch_size"], kwargs["vad_filter"]) == (2, 4, False)
+    assert len(kwargs["clip_timestamps"]) == 4  # 30 second windows
+    model.transcribe.assert_not_called()
+    assert result.segments == [Segment(0.0, 2.0, "Hi.")]
+    metrics = result.metrics()
+    assert metrics["engine"] == "batched"
+    assert metrics["batch_size"] == 4
+    assert metrics["audio_seconds"] == 120.0
+    assert metrics["realtime_factor"] is not None
+    assert metrics["skipped_seconds"] == 0.0
+
+
+def test_short_clip_falls_back_to_sequential(tmp_path: Path):
+    audio = tmp_path / "sting.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=np.zeros(5 * transcription.SAMPLE_RATE)), \
+            patch.object(transcription, "detect_speech", return_value=[]):
+        result = transcribe_segments(audio, engine="batched", vad=False)
+
+    model.transcribe.assert_called_once()
+    assert result.engine == "sequential"
+    assert result.batch_size is None
+
+
+def test_unknown_engine_is_reported_as_such(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+
+    with patch.object(transcription, "get_whisper_model", return_value=fake_model()), \
+            pytest.raises(ValueError, match="Unknown transcription engine 'turbo'"):
+        transcribe_segments(audio, engine="turbo", vad=False)
+
+
+def test_vad_reports_skipped_audio_and_skips_silent_files(tmp_path: Path):
+    audio = tmp_path / "bed.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+    samples = np.zeros(100 * transcription.SAMPLE_RATE, dtype=np.float32)
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[(10.0, 30.0), (60.0, 70.0)]):
+        result = transcribe_segments(audio, engine="sequential", vad=True)
+
+    assert model.transcribe.call_args.kwargs["vad_filter"] is False
+    assert model.transcribe.call_args.kwargs["clip_timestamps"] == [10.0, 30.0, 60.0, 70.0]
+    assert result.metrics()["speech_seconds"] == 30.0
+    assert result.metrics()["skipped_seconds"] == 70.0
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[]):
+        silent = transcribe_segments(audio, engine="sequential", vad=True)
+
+    assert model.transcribe.call_count == 1  # the model never saw the silent file
+    assert silent.segments == [] and silent.metrics()["skipped_seconds"] == 100.0
+
+
+def test_vad_runs_once_and_batches_only_speech(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+    pipeline_cls = MagicMock()
+    pipeline_cls.return_value.transcribe.return_value = fake_model_output()
+    samples = np.zeros(300 * transcription.SAMPLE_RATE, dtype=np.float32)
+    speech = [(5.0, 10.0), (12.0, 20.0), (100.0, 170.0), (250.0, 260.0)]
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=speech) as detect, \
+            patch.dict(sys.modules, {"faster_whisper": MagicMock(BatchedInferencePipeline=pipeline_cls)}):
+        transcribe_segments(audio, engine="batched", vad=True, start_at=8.0)
+
+    detect.assert_called_once()
+    kwargs = pipeline_cls.return_value.transcribe.call_args.kwargs
+    assert kwargs["vad_filter"] is False and "vad_parameters" not in kwargs
+    rate = transcription.SAMPLE_RATE
+    # Relative to the resume point; nearby spans share a window, long ones are split.
+    assert [(c["start"] / rate, c["end"] / rate) for c in kwargs["clip_timestamps"]] == [
+        (0.0, 12.0), (92.0, 122.0), (122.0, 152.0), (152.0, 162.0), (242.0, 252.0),
+    ]
+
+
+def test_chunk_speech_maps_merge_across_cuts():
+    first = Chunk(index=0, start=0.0, end=12.0, keep_start=0.0, keep_end=10.0)
+    second = Chunk(index=1, start=8.0, end=20.0, keep_start=10.0, keep_end=20.0)
+
+    merged = merge_speech([offset_speech([(1.0, 11.0)], first), offset_speech([(0.5, 4.0), (6.0, 7.0)], second)])
+
+    assert merged == [(1.0, 12.0), (14.0, 15.0)]
+
+
+def test_resume_decodes_remaining_audio_and_streams_segments(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+    samples = np.zeros(100 * transcription.SAMPLE_RATE, dtype=np.float32)
+    streamed = []
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[]):
+        result = transcribe_segments(audio, engine="sequential", vad=False, start_at=40.0, on_segment=streamed.append)
+
+    decoded = model.transcribe.call_args.args[0]
+    assert len(decoded) == 60 * transcription.SAMPLE_RATE
+    assert streamed == result.segments == [Segment(40.0, 42.0, "Hi.")]
+    assert result.metrics()["resumed_from"] == 40.0
+
+
+def test_speech_dense_window_prefers_continuous_speech():
+    speech = [(0.0, 2.0), (50.0, 51.0), (100.0, 125.0), (128.0, 140.0)]
+
+    assert transcription.speech_dense_window(speech, 600.0, 30.0) == (100.0, 130.0)
+    assert transcription.speech_dense_window([(590.0, 600.0)], 600.0, 30.0) == (570.0, 600.0)
+    assert transcription.speech_dense_window([], 20.0, 30.0) == (0.0, 20.0)
+
+
+def test_language_is_detected_once_on_excerpt_and_pinned(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+    model.detect_language.return_value = ("de", 0.97, [])
+    samples = np.zeros(300 * transcription.SAMPLE_RATE, dtype=np.float32)
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[(5.0, 6.0), (200.0, 260.0)]):
+        result = transcribe_segments(audio, engine="sequential", vad=True)
+
+    excerpt = model.detect_language.call_args.kwargs["audio"]
+    assert len(excerpt) == 30 * transcription.SAMPLE_RATE
+    assert model.transcribe.call_args.kwargs["language"] == "de"
+    assert result.language == "de"
+    assert result.metrics()["language_source"] == "detected"
+
+
+def test_language_excerpt_skips_the_intro_without_vad_filtering(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+    samples = np.zeros(300 * transcription.SAMPLE_RATE, dtype=np.float32)
+    samples[90 * transcription.SAMPLE_RATE:] = 1.0  # speech after a 90 second music bed
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=samples), \
+            patch.object(transcription, "detect_speech", return_value=[(90.0, 300.0)]) as detect_speech:
+        result = transcribe_segments(audio, engine="sequential", vad=False)
+
+    detect_speech.assert_called_once()
+    excerpt = model.detect_language.call_args.kwargs["audio"]
+    assert len(excerpt) == 30 * transcription.SAMPLE_RATE and excerpt.min() == 1.0
+    assert "clip_timestamps" not in model.transcribe.call_args.kwargs  # the decode itself is not filtered
+    assert result.speech == [(0.0, 300.0)]
+
+
+def test_requested_language_skips_detection(tmp_path: Path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"audio")
+    model = fake_model()
+
+    with patch.object(transcription, "get_whisper_model", return_value=model), \
+            patch.object(transcription, "load_audio", return_value=np.zeros(100 * transcription.SAMPLE_RATE)):
+        result = transcribe_segments(audio, engine="sequential", vad=False, language="fr")
+
+    model.detect_language.assert_not_called()
+    assert model.transcribe.call_args.kwargs["language"] == "fr"
+    assert result.metrics()["language_source"] == "requested"
+
+
+@pytest.fixture
+def chunked_job(tmp_path: Path):
+    """Transcription job 9, split into three chunks; chunk 1 never finished."""
+    from app.workers import tasks
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(ProcessingJob(id=9, job_type="transcription", status=JobStatus.FAILED))
+    db.commit()
+    db.close()
+
+    chunks = plan_chunks(300.0, [], target_seconds=100, overlap_seconds=2)
+    state_dir = chunk_state_dir("9_transcript", tmp_path / "transcripts")
+    save_chunk_plan(state_dir, chunks, {"language": "de", "beam_size": 2})
+    for chunk in (chunks[0], chunks[2]):
+        save_chunk_result(state_dir, chunk_result(chunk))
+
+    with patch.object(tasks, "SessionLocal", factory), \
+            patch.object(tasks, "TRANSCRIPT_DIR", tmp_path / "transcripts"), \
+            patch.object(tasks, "DATA_ROOT", tmp_path), \
+            patch("app.utils.storage.DATA_ROOT", tmp_path):
+        yield chunks, state_dir, factory
+
+
+def chunk_result(chunk: Chunk) -> dict:
+    return {
+        "index": chunk.index,
+        "language": "de",
+        "seconds": chunk.keep_end - chunk.keep_start,
+        "episode_end": chunk.keep_end,
+        "segments": [Segment(chunk.keep_start + 1.0, chunk.keep_start + 2.0, f"chunk {chunk.index}").to_dict()],
+        "speech": [[chunk.keep_start, chunk.keep_end]],
+        "metrics": {"engine": "sequential", "beam_size": 2, "batch_size": None,
+                    "audio_seconds": chunk.duration, "processing_seconds": 1.0},
+        "started_at": 0.0,
+        "finished_at": 1.0,
+    }
+
+
+def test_resumed_chunked_job_transcribes_only_the_missing_chunk(chunked_job):
+    from app.workers import tasks
+
+    chunks, state_dir, factory = chunked_job
+
+    with patch.object(tasks, "chord") as chord, patch.object(tasks, "probe_duration") as probe:
+        tasks._start_chunked_transcription(9, Path("a.wav"), "processed/a.wav", "9_transcript", {"language": None})
+
+    probe.assert_not_called()  # the saved plan is reused
+    [signature] = chord.call_args.args[0].tasks
+    assert Chunk.from_dict(signature.args[2]) == chunks[1]
+    assert (signature.kwargs["language"], signature.kwargs["beam_size"]) == ("de", 2)
+    assert signature.kwargs["output_basename"] == "9_transcript"
+
+    # The chord delivers only the gap; the merge picks up the chunks finished earlier.
+    result = tasks.merge_transcript_chunks_task([chunk_result(chunks[1])], 9, "9_transcript")
+
+    db = factory()
+    assert [s.text for s in committed_segments(db, 9)] == ["chunk 0", "chunk 1", "chunk 2"]
+    assert db.get(ProcessingJob, 9).status == JobStatus.COMPLETED
+    db.close()
+    assert not state_dir.exists()
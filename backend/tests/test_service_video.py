@@ -3,7 +3,7 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock, ANY
 import ffmpeg
 
-from app.services.video_processing import generate_waveform_video
+from app.services.video_processing import generate_waveform_video, preview_output_filename
 
 
 @pytest.fixture
@@ -48,3 +48,25 @@ def test_generate_waveform_video_file_not_found(tmp_path: Path):
     with pytest.raises(FileNotFoundError):
         generate_waveform_video(input_path, output, "640x360", "white", "black")
 
+
+def test_generate_waveform_video_preview_excerpt(mock_ffmpeg_methods, temp_audio_file: Path, tmp_path: Path):
+    output = tmp_path / "preview.mp4"
+    generate_waveform_video(
+        temp_audio_file, output, "640x360", "white", "black",
+        start=30.0, duration=15.0, preset="ultrafast",
+    )
+
+    mock_ffmpeg_methods["input"].assert_any_call(str(temp_audio_file), ss=30.0, t=15.0)
+    mock_ffmpeg_methods["output"].assert_called_once_with(
+        mock_ffmpeg_methods["overlay"].return_value, str(output),
+        vcodec="libx264", pix_fmt="yuv420p", preset="ultrafast",
+    )
+
+
+def test_preview_output_filename_is_deterministic(temp_audio_file: Path):
+    name = preview_output_filename(temp_audio_file, "640x360", "white", "black", None, 0.0, 15.0)
+
+    assert name == preview_output_filename(temp_audio_file, "640x360", "white", "black", None, 0.0, 15.0)
+    assert name.startswith("preview_") and name.endswith(".mp4")
+    assert name != preview_output_filename(temp_audio_file, "640x360", "red", "black", None, 0.0, 15.0)
+    assert name != preview_output_filename(temp_audio_file, "640x360", "white", "black", None, 0.0, 15.0, preset="medium")
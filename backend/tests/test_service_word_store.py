@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from pathlib import Path
+
+from app.services.transcription import Segment
+from app.services.word_store import WordIndex, build_word_arrays, save_words
+
+
+def make_segments() -> list[Segment]:
+    return [
+        Segment(0.0, 1.2, "the cat", words=[[0.0, 0.4, "the"], [0.5, 1.2, "cat"]]),
+        Segment(1.5, 3.0, "the dog", words=[[1.5, 1.9, "the"], [2.0, 3.0, "dog"]]),
+    ]
+
+
+def test_build_word_arrays_is_compact():
+    arrays = build_word_arrays(make_segments())
+
+    assert arrays["starts"].tolist() == [0, 500, 1500, 2000]
+    assert arrays["starts"].dtype == np.uint32
+    assert arrays["tokens"].dtype == np.uint8  # three distinct words
+    assert arrays["tokens"].tolist() == [0, 1, 0, 2]  # repeated words share a table entry
+    assert arrays["strings"].tobytes() == b"thecatdog"
+
+
+def test_word_index_reads_time_range_from_disk(tmp_path: Path):
+    directory = tmp_path / "1_transcript.words"
+    assert save_words(make_segments(), directory) == 4
+
+    index = WordIndex(directory)
+
+    assert len(index) == 4
+    assert isinstance(index.starts, np.memmap)
+    assert [w["word"] for w in index.words(0.45, 2.0)] == ["cat", "the"]
+    assert index.words(1.0, 1.6) == [{"start": 0.5, "end": 1.2, "word": "cat"}, {"start": 1.5, "end": 1.9, "word": "the"}]
+    assert [w["word"] for w in index.words(offset=1, limit=2)] == ["cat", "the"]
+    assert index.words(10.0, 20.0) == []
+
+
+def test_word_index_missing_directory(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        WordIndex(tmp_path / "missing.words")
@@ -16,6 +16,13 @@ const App = {
         vizFileSelect: null,
         processVizBtn: null,
         vizResponseDiv: null,
+        suggestJobIdInput: null,
+        suggestPromptTypeSelect: null,
+        suggestForceInput: null,
+        suggestBtn: null,
+        suggestResponseDiv: null,
+        suggestStreamPre: null,
+        suggestResultDiv: null,
         jobIdInput: null, // Will be added in HTML
         submitButton: null, // Will be added in HTML
         // Spinners will be handled dynamically
@@ -34,6 +41,13 @@ const App = {
         this.elements.vizFileSelect = document.getElementById('vizFileSelect');
         this.elements.processVizBtn = document.getElementById('processVizBtn');
         this.elements.vizResponseDiv = document.getElementById('vizResponse');
+        this.elements.suggestJobIdInput = document.getElementById('suggestJobId');
+        this.elements.suggestPromptTypeSelect = document.getElementById('suggestPromptType');
+        this.elements.suggestForceInput = document.getElementById('suggestForce');
+        this.elements.suggestBtn = document.getElementById('suggestBtn');
+        this.elements.suggestResponseDiv = document.getElementById('suggestResponse');
+        this.elements.suggestStreamPre = document.getElementById('suggestStream');
+        this.elements.suggestResultDiv = document.getElementById('suggestResult');
         this.elements.jobIdInput = document.getElementById('jobIdInput'); // Assuming this will be added
         this.elements.submitButton = this.elements.uploadForm ? this.elements.uploadForm.querySelector('button[type="submit"]') : null;
 
@@ -59,6 +73,7 @@ const App = {
         const refreshLibraryBtn = document.getElementById('refreshLibraryBtn');
         if (refreshLibraryBtn) refreshLibraryBtn.addEventListener('click', this.fetchLibrary.bind(this));
         if (this.elements.processVizBtn) this.elements.processVizBtn.addEventListener('click', this.handleVisualizationProcess.bind(this));
+        if (this.elements.suggestBtn) this.elements.suggestBtn.addEventListener('click', this.handleSuggest.bind(this));
 
 
         // Tooltip setup (delegated event listener on a parent)
@@ -419,6 +434,17 @@ const App = {
                 downloadLink.target = '_blank';
                 downloadLink.textContent = 'Download';
                 actionsSpan.appendChild(downloadLink);
+                if (item.thumbnail_url) {
+                    // Small cached poster frame – avoids downloading the video to preview it.
+                    const thumb = document.createElement('img');
+                    thumb.className = 'lib-thumbnail';
+                    thumb.src = item.thumbnail_url;
+                    thumb.alt = `Poster frame for job ${item.job_id}`;
+                    thumb.loading = 'lazy';
+                    thumb.width = 160;
+                    thumb.onerror = () => thumb.remove();
+                    li.appendChild(thumb);
+                }
                 li.appendChild(idSpan);
                 li.appendChild(typeSpan);
                 li.appendChild(pathSpan);
@@ -457,6 +483,7 @@ const App = {
         if (!this.elements.vizResponseDiv) return;
         const jobId = this.elements.vizFileSelect ? this.elements.vizFileSelect.value : null;
         const vizWaveform = document.getElementById('vizWaveform')?.checked;
+        const vizPreview = document.getElementById('vizPreview')?.checked;
         this.clearMessage(this.elements.vizResponseDiv);
         if (!jobId) {
             this.displayMessage(this.elements.vizResponseDiv, 'Please select a file to visualize.', 'error');
@@ -468,16 +495,112 @@ const App = {
         }
         this.displayMessage(this.elements.vizResponseDiv, 'Starting visualization...', 'processing');
         try {
-            const res = await fetch(`${this.API_BASE_URL}/video/process/${jobId}`, { method: 'POST' });
+            const query = vizPreview ? '?preview=true' : '';
+            const res = await fetch(`${this.API_BASE_URL}/video/process/${jobId}${query}`, { method: 'POST' });
             const data = await res.json();
             if (!res.ok) throw new Error(data.detail || res.statusText);
-            this.displayMessage(this.elements.vizResponseDiv, `Visualization started! Job ID: ${data.job_id}.`, 'success');
+            if (data.cached) {
+                this.displayMessage(this.elements.vizResponseDiv, `Preview ready (cached)! Job ID: ${data.job_id}.`, 'success');
+            } else {
+                this.displayMessage(this.elements.vizResponseDiv, `Visualization started! Job ID: ${data.job_id}.`, 'success');
+            }
         } catch (error) {
             console.error('Error starting visualization:', error);
             this.displayMessage(this.elements.vizResponseDiv, `Error: ${error.message}`, 'error');
         }
     },
 
+    // Suggestions are streamed as Server-Sent Events: the raw model output is
+    // shown as it arrives, then replaced by the parsed titles and summary.
+    handleSuggest: async function() {
+        const { suggestResponseDiv: responseDiv, suggestStreamPre: streamPre, suggestResultDiv: resultDiv, suggestBtn: button } = this.elements;
+        if (!responseDiv) return;
+        const jobId = this.elements.suggestJobIdInput ? this.elements.suggestJobIdInput.value.trim() : '';
+        this.clearMessage(responseDiv);
+        streamPre.textContent = '';
+        resultDiv.innerHTML = '';
+        if (!jobId) {
+            this.displayMessage(responseDiv, 'Please enter a transcription job ID.', 'error');
+            return;
+        }
+        const params = new URLSearchParams({
+            prompt_type: this.elements.suggestPromptTypeSelect.value,
+            force: this.elements.suggestForceInput.checked ? 'true' : 'false',
+        });
+        button.disabled = true;
+        this.displayMessage(responseDiv, 'Waiting for the model...', 'processing');
+        try {
+            const res = await fetch(`${this.API_BASE_URL}/llm/suggest/from_job/${jobId}/stream?${params}`, { method: 'POST' });
+            if (!res.ok) {
+                const data = await res.json();
+                throw new Error(data.detail || res.statusText);
+            }
+            await this.readEventStream(res, (event, data) => {
+                if (event === 'token') {
+                    if (!streamPre.textContent) this.displayMessage(responseDiv, 'Generating...', 'processing');
+                    streamPre.textContent += data.text;
+                } else if (event === 'result') {
+                    streamPre.textContent = '';
+                    this.renderSuggestion(data);
+                    this.displayMessage(responseDiv, `Suggestions ready (ID: ${data.suggestion_id}).`, 'success');
+                } else if (event === 'error') {
+                    throw new Error(data.detail);
+                }
+            });
+        } catch (error) {
+            console.error('Error generating suggestions:', error);
+            this.displayMessage(responseDiv, `Error: ${error.message}`, 'error');
+        } finally {
+            button.disabled = false;
+        }
+    },
+
+    readEventStream: async function(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    },
+
+    renderSuggestion: function(data) {
+        const resultDiv = this.elements.suggestResultDiv;
+        resultDiv.innerHTML = '';
+        if (data.titles && data.titles.length) {
+            const heading = document.createElement('h3');
+            heading.textContent = 'Titles';
+            const list = document.createElement('ul');
+            data.titles.forEach(title => {
+                const item = document.createElement('li');
+                item.textContent = title;
+                list.appendChild(item);
+            });
+            resultDiv.append(heading, list);
+        }
+        if (data.summary) {
+            const heading = document.createElement('h3');
+            heading.textContent = 'Summary';
+            const summary = document.createElement('p');
+            summary.textContent = data.summary;
+            resultDiv.append(heading, summary);
+        }
+    },
+
     // Tooltip Handling
     handleTooltipMouseOver: function(event) {
         const target = event.target.closest('.tooltip-trigger');